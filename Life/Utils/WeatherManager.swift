@@ -107,7 +107,9 @@ class WeatherManager: NSObject, ObservableObject {
             // 构建OpenWeatherMap API URL
             let lat = location.coordinate.latitude
             let lon = location.coordinate.longitude
-            let urlString = "https://api.openweathermap.org/data/2.5/weather?lat=\(lat)&lon=\(lon)&appid=\(apiKey)&units=metric&lang=zh_cn"
+            // UI测试和截屏运行可通过环境变量指向本地替身服务（mock_openweather.py）
+            let baseURL = ProcessInfo.processInfo.environment["OPENWEATHER_BASE_URL"] ?? "https://api.openweathermap.org"
+            let urlString = "\(baseURL)/data/2.5/weather?lat=\(lat)&lon=\(lon)&appid=\(apiKey)&units=metric&lang=zh_cn"
             
             guard let url = URL(string: urlString) else {
                 throw WeatherError.invalidURL
@@ -0,0 +1,454 @@
+#!/usr/bin/env python3
+"""
+备用应用图标批量渲染
+按 Life/Utils/AppIconDesign.swift 中的六个设计（dots/calendar/chart × 浅色/深色）
+用同一份参数化描述渲染；对角渐变、圆形遮罩和阴影每个尺寸只计算一次，由所有变体共享，
+所有图标集在一个进程池批次中完成
+"""
+
+import os
+import json
+import math
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image, ImageChops, ImageDraw, ImageFilter, ImageFont
+
+from shared_assets import SharedAssetStore, AttachedAssets
+from emoji_atlas import EMOJI_FONTS, EMOJI_BITMAP_SIZES
+
+# 项目根目录（脚本所在目录）
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+LOGO_CATALOG = os.path.join(PROJECT_ROOT, "Life", "Assets.xcassets", "logo")
+
+# SwiftUI 设计稿的坐标系：1024×1024 画布，650 的白色圆
+DESIGN_SIZE = 1024
+CIRCLE_DIAMETER = 650
+CIRCLE_ORIGIN = (DESIGN_SIZE - CIRCLE_DIAMETER) / 2
+# 遮罩超采样倍数（抗锯齿）
+SUPERSAMPLE = 4
+
+# SwiftUI 系统颜色（iOS 浅色模式）
+SWIFT_COLORS = {
+    "blue": (0, 122, 255),
+    "purple": (175, 82, 222),
+    "pink": (255, 45, 85),
+    "orange": (255, 149, 0),
+    "green": (52, 199, 89),
+    "gray": (142, 142, 147),
+    "white": (255, 255, 255),
+}
+
+# 参数化描述：结构相同，浅色/深色只有颜色和不透明度不同
+# background 为 topLeading → bottomTrailing 的三色渐变 (0-1 RGB)
+# circle 为白色圆的不透明度渐变，shadow 为 (不透明度, 模糊半径, y偏移)
+ICON_VARIANTS = {
+    "dots": {
+        "swift": "AppIconDesign",
+        "content": "notebook",
+        "targets": [("AppIcon", "AppIcon.png"), ("dots", "dots.png")],
+        "light": {
+            "background": [(0.6, 0.3, 0.9), (0.3, 0.7, 0.9), (0.2, 0.8, 0.6)],
+            "circle": (0.95, 0.85), "shadow": (0.15, 30, 15),
+            "fill": 0.8, "lines": 0.4, "corner": 0.7,
+        },
+        "dark": {
+            "background": [(0.2, 0.1, 0.4), (0.1, 0.3, 0.5), (0.1, 0.4, 0.3)],
+            "circle": (0.98, 0.9), "shadow": (0.4, 40, 20),
+            "fill": 0.9, "lines": 0.5, "corner": 0.8,
+        },
+    },
+    "calendar": {
+        "swift": "AppIconDesignCalendar",
+        "content": "calendar",
+        "targets": [("Calendar", "Calendar.png")],
+        "light": {
+            "background": [(0.2, 0.6, 0.9), (0.1, 0.8, 0.7), (0.3, 0.7, 0.5)],
+            "circle": (0.95, 0.85), "shadow": (0.15, 30, 15),
+            "header": 0.4, "highlight": 0.8, "cell": 0.3, "corner": 0.6,
+        },
+        "dark": {
+            "background": [(0.1, 0.3, 0.5), (0.05, 0.4, 0.4), (0.1, 0.35, 0.3)],
+            "circle": (0.98, 0.9), "shadow": (0.4, 40, 20),
+            "header": 0.5, "highlight": 0.9, "cell": 0.4, "corner": 0.7,
+        },
+    },
+    "chart": {
+        "swift": "AppIconDesignChart",
+        "content": "chart",
+        "targets": [("Chart", "chart.png")],
+        "light": {
+            "background": [(0.1, 0.5, 0.4), (0.2, 0.7, 0.5), (0.3, 0.6, 0.7)],
+            "circle": (0.95, 0.85), "shadow": (0.15, 30, 15),
+            "bars": (0.8, 0.6), "corner": 0.7,
+        },
+        "dark": {
+            "background": [(0.05, 0.3, 0.25), (0.1, 0.4, 0.3), (0.15, 0.35, 0.4)],
+            "circle": (0.98, 0.9), "shadow": (0.4, 40, 20),
+            "bars": (0.9, 0.7), "corner": 0.8,
+        },
+    },
+}
+APPEARANCES = ["light", "dark"]
+
+
+def gradient_lut(stops):
+    """多色渐变的查找表：返回 R/G/B 三张 256 项的表，stops 为等距分布的 0-1 RGB"""
+    luts = [[], [], []]
+    segments = len(stops) - 1
+    for v in range(256):
+        position = v / 255 * segments
+        index = min(int(position), segments - 1)
+        t = position - index
+        for channel in range(3):
+            a, b = stops[index][channel], stops[index + 1][channel]
+            luts[channel].append(round((a + (b - a) * t) * 255))
+    return luts
+
+
+class IconEngine:
+    """单个尺寸的图标渲染器；cache 可以是共享内存中挂载的图层字典"""
+
+    def __init__(self, size, cache=None):
+        self.size = size
+        self.scale = size / DESIGN_SIZE
+        self.cache = cache if cache is not None else {}
+        self._local = {}
+
+    def _cached(self, key, build):
+        key = (self.size,) + key
+        layer = self.cache.get(key)
+        if layer is None:
+            layer = self._local.get(key)
+        if layer is None:
+            layer = build()
+            self._local[key] = layer
+        return layer
+
+    # ---- 每个尺寸共享的图层 ----
+
+    def diagonal_ramp(self, width, height):
+        """topLeading → bottomTrailing 的 0-255 线性渐变（所有变体共用，用查找表着色）"""
+        def build():
+            vertical = Image.linear_gradient("L").resize((width, height), Image.Resampling.BILINEAR)
+            horizontal = Image.linear_gradient("L").transpose(Image.Transpose.ROTATE_90) \
+                .resize((width, height), Image.Resampling.BILINEAR)
+            return ImageChops.add(vertical, horizontal, scale=2)
+        return self._cached(("ramp", width, height), build)
+
+    def vertical_ramp(self, width, height):
+        return self._cached(("vramp", width, height),
+                            lambda: Image.linear_gradient("L").resize((width, height), Image.Resampling.BILINEAR))
+
+    def shape_mask(self, kind, x, y, width, height, radius=0):
+        """设计坐标中的形状 → (粘贴位置, 抗锯齿遮罩)，相同形状和亚像素偏移只绘制一次"""
+        s = self.scale
+        left, top = x * s, y * s
+        ox, oy = math.floor(left), math.floor(top)
+        fx = round((left - ox) * SUPERSAMPLE)
+        fy = round((top - oy) * SUPERSAMPLE)
+        w = round(width * s * SUPERSAMPLE)
+        h = round(height * s * SUPERSAMPLE)
+        r = round(radius * s * SUPERSAMPLE)
+
+        def build():
+            box_w = math.ceil((fx + w) / SUPERSAMPLE)
+            box_h = math.ceil((fy + h) / SUPERSAMPLE)
+            big = Image.new("L", (max(box_w, 1) * SUPERSAMPLE, max(box_h, 1) * SUPERSAMPLE), 0)
+            draw = ImageDraw.Draw(big)
+            bounds = [fx, fy, fx + max(w, 1) - 1, fy + max(h, 1) - 1]
+            if kind == "ellipse":
+                draw.ellipse(bounds, fill=255)
+            elif r > 0:
+                draw.rounded_rectangle(bounds, radius=r, fill=255)
+            else:
+                draw.rectangle(bounds, fill=255)
+            return big.reduce(SUPERSAMPLE)
+        return (ox, oy), self._cached(("shape", kind, w, h, r, fx, fy), build)
+
+    def circle_mask(self):
+        return self.shape_mask("ellipse", CIRCLE_ORIGIN, CIRCLE_ORIGIN, CIRCLE_DIAMETER, CIRCLE_DIAMETER)
+
+    def circle_shadow(self, radius, offset_y):
+        """白色圆的阴影遮罩（整幅画布大小），SwiftUI 的 shadow radius 约为高斯模糊的两倍标准差"""
+        def build():
+            (ox, oy), mask = self.circle_mask()
+            shadow = Image.new("L", (self.size, self.size), 0)
+            shadow.paste(mask, (ox, oy + round(offset_y * self.scale)))
+            return shadow.filter(ImageFilter.GaussianBlur(radius * self.scale / 2))
+        return self._cached(("shadow", radius, offset_y), build)
+
+    def prepare(self, variants):
+        """预先计算变体共享的图层，返回可发布到共享内存的字典"""
+        self.diagonal_ramp(self.size, self.size)
+        (_, _), mask = self.circle_mask()
+        self.diagonal_ramp(*mask.size)
+        for design in variants.values():
+            for appearance in APPEARANCES:
+                _, radius, offset_y = design[appearance]["shadow"]
+                self.circle_shadow(radius, offset_y)
+        return dict(self._local)
+
+    # ---- 绘制工具 ----
+
+    def fill(self, canvas, color, position, mask, opacity=1.0):
+        if opacity < 1.0:
+            mask = mask.point(lambda v: round(v * opacity))
+        canvas.paste(color, position, mask)
+
+    def fill_shape(self, canvas, kind, x, y, width, height, color, opacity=1.0, radius=0):
+        position, mask = self.shape_mask(kind, x, y, width, height, radius)
+        self.fill(canvas, color, position, mask, opacity)
+
+    def fill_gradient(self, canvas, kind, x, y, width, height, colors, opacities, radius=0, vertical=False):
+        """两色渐变 + 不透明度渐变填充形状（颜色和不透明度都是起点 → 终点）"""
+        position, mask = self.shape_mask(kind, x, y, width, height, radius)
+        ramp = self.vertical_ramp(*mask.size) if vertical else self.diagonal_ramp(*mask.size)
+        stops = [tuple(c / 255 for c in color) for color in colors]
+        fill = Image.merge("RGB", [ramp.point(lut) for lut in gradient_lut(stops)])
+        start, end = opacities
+        alpha = ramp.point([round(255 * (start + (end - start) * v / 255)) for v in range(256)])
+        canvas.paste(fill, position, ImageChops.multiply(mask, alpha))
+
+    # ---- 设计稿 ----
+
+    def render(self, design, appearance):
+        """渲染一个设计的一种外观，返回 RGB 图片（无alpha通道）"""
+        params = design[appearance]
+        ramp = self.diagonal_ramp(self.size, self.size)
+        canvas = Image.merge("RGB", [ramp.point(lut) for lut in gradient_lut(params["background"])])
+
+        shadow_opacity, radius, offset_y = params["shadow"]
+        self.fill(canvas, (0, 0, 0), (0, 0), self.circle_shadow(radius, offset_y), shadow_opacity)
+        self.fill_gradient(canvas, "ellipse", CIRCLE_ORIGIN, CIRCLE_ORIGIN, CIRCLE_DIAMETER, CIRCLE_DIAMETER,
+                           [SWIFT_COLORS["white"]] * 2, params["circle"])
+
+        getattr(self, "draw_" + design["content"])(canvas, params)
+        return canvas
+
+    def draw_dots_row(self, canvas, colors, diameter, spacing, top, opacity=1.0):
+        """水平居中的一行彩色圆点"""
+        left = (DESIGN_SIZE - (len(colors) * diameter + (len(colors) - 1) * spacing)) / 2
+        for i, color in enumerate(colors):
+            self.fill_shape(canvas, "ellipse", left + i * (diameter + spacing), top, diameter, diameter,
+                            SWIFT_COLORS[color], opacity)
+
+    def draw_notebook(self, canvas, params):
+        """dots：笔记本 + 彩色圆点，右上角装饰横条"""
+        # VStack(spacing: 25)：笔记本 280×380 + 圆点行 18
+        top = (DESIGN_SIZE - (380 + 25 + 18)) / 2
+        left = (DESIGN_SIZE - 280) / 2
+        self.fill_gradient(canvas, "rect", left, top, 280, 380,
+                           [SWIFT_COLORS["blue"], SWIFT_COLORS["purple"]], (params["fill"],) * 2, radius=20)
+        # 15 条横线：VStack(spacing: 12) + padding(.horizontal, 30) + padding(.top, 40)，在笔记本中居中
+        stack_height = 40 + 15 * 3 + 14 * 12
+        line_top = top + (380 - stack_height) / 2 + 40
+        for i in range(15):
+            self.fill_shape(canvas, "rect", left + 30, line_top + i * 15, 220, 3,
+                            SWIFT_COLORS["white"], params["lines"])
+        self.draw_dots_row(canvas, ["pink", "orange", "green", "blue"], 18, 20, top + 380 + 25)
+
+        # 右上角：宽 8+4i 高 4 的横条，VStack(spacing: 8) 居中对齐，padding(.trailing, 40)
+        right = CIRCLE_ORIGIN + CIRCLE_DIAMETER - 40
+        for i in range(4):
+            width = 8 + i * 4
+            self.fill_shape(canvas, "rect", right - 10 - width / 2, CIRCLE_ORIGIN + i * 12, width, 4,
+                            SWIFT_COLORS["white"], params["corner"], radius=2)
+
+    def draw_calendar(self, canvas, params):
+        """calendar：4×7 日期圆点网格 + 三个彩色圆点，左下角装饰竖条"""
+        # VStack(spacing: 20)：网格 148 + 圆点行 14
+        top = (DESIGN_SIZE - (148 + 20 + 14)) / 2
+        left = (DESIGN_SIZE - 268) / 2
+        for row in range(4):
+            for col in range(7):
+                if row == 0:
+                    color, opacity = "gray", params["header"]
+                elif col == 3:
+                    color, opacity = "blue", params["highlight"]
+                else:
+                    color, opacity = "blue", params["cell"]
+                self.fill_shape(canvas, "ellipse", left + col * 40, top + row * 40, 28, 28,
+                                SWIFT_COLORS[color], opacity)
+        self.draw_dots_row(canvas, ["pink", "orange", "green"], 14, 16, top + 148 + 20)
+
+        # 左下角：宽 3 高 8+6i 的竖条，VStack(spacing: 6)，padding(.leading, 40)
+        y = CIRCLE_ORIGIN + CIRCLE_DIAMETER - (8 + 14 + 20 + 2 * 6)
+        for i in range(3):
+            height = 8 + i * 6
+            self.fill_shape(canvas, "rect", CIRCLE_ORIGIN + 40, y, 3, height,
+                            SWIFT_COLORS["white"], params["corner"], radius=1.5)
+            y += height + 6
+
+    def draw_chart(self, canvas, params):
+        """chart：📊 + 柱状图 + 彩色圆点，右上角装饰横条"""
+        # VStack(spacing: 25)：emoji 行高 72 + 柱状图 180 + 圆点行 10
+        top = (DESIGN_SIZE - (72 + 25 + 180 + 25 + 10)) / 2
+        self.draw_emoji(canvas, "📊", 60, DESIGN_SIZE / 2, top + 36)
+
+        bottom = top + 72 + 25 + 180
+        left = (DESIGN_SIZE - (4 * 35 + 3 * 18)) / 2
+        colors = ["purple", "blue", "green", "orange"]
+        for i, height in enumerate([120, 180, 150, 90]):
+            color = SWIFT_COLORS[colors[i]]
+            self.fill_gradient(canvas, "rect", left + i * 53, bottom - height, 35, height,
+                               [color, color], params["bars"], radius=6, vertical=True)
+        self.draw_dots_row(canvas, colors, 10, 12, bottom + 25)
+
+        # 右上角：宽 4+2i 高 3 的横条，VStack(spacing: 4)
+        right = CIRCLE_ORIGIN + CIRCLE_DIAMETER - 40
+        for i in range(5):
+            width = 4 + i * 2
+            self.fill_shape(canvas, "rect", right - 6 - width / 2, CIRCLE_ORIGIN + i * 7, width, 3,
+                            SWIFT_COLORS["white"], params["corner"], radius=1.5)
+
+    def draw_emoji(self, canvas, emoji, font_size, center_x, center_y):
+        """彩色 emoji（位图字体只有固定字号，先按原尺寸绘制再缩放）；没有 emoji 字体时跳过"""
+        def build():
+            for path in EMOJI_FONTS:
+                for bitmap_size in EMOJI_BITMAP_SIZES:
+                    try:
+                        font = ImageFont.truetype(path, bitmap_size)
+                    except OSError:
+                        continue
+                    left, top, right, bottom = font.getbbox(emoji)
+                    glyph = Image.new("RGBA", (right - left, bottom - top), (0, 0, 0, 0))
+                    ImageDraw.Draw(glyph).text((-left, -top), emoji, font=font, embedded_color=True)
+                    target = max(round(font_size * self.scale * glyph.width / bitmap_size), 1)
+                    return glyph.resize((target, max(round(glyph.height * target / glyph.width), 1)),
+                                        Image.Resampling.LANCZOS)
+            return Image.new("RGBA", (1, 1), (0, 0, 0, 0))
+        glyph = self._cached(("emoji", emoji, font_size), build)
+        if glyph.width > 1:
+            position = (round(center_x * self.scale - glyph.width / 2),
+                        round(center_y * self.scale - glyph.height / 2))
+            canvas.paste(glyph, position, glyph)
+
+
+def icon_filename(filename, appearance, size):
+    """AppIcon.png → AppIcon-dark.png / AppIcon-180.png"""
+    stem, ext = os.path.splitext(filename)
+    if appearance == "dark":
+        stem += "-dark"
+    if size != DESIGN_SIZE:
+        stem += f"-{size}"
+    return stem + ext
+
+
+# 工作进程内的全局状态（由 initializer 设置）
+_worker_state = {}
+
+
+def _init_worker(manifest):
+    _worker_state["layers"] = AttachedAssets(manifest)
+    _worker_state["engines"] = {}
+
+
+def _render_task(task):
+    """在工作进程中渲染一个 (尺寸, 设计, 外观) 并写入所有目标图标集"""
+    size, name, appearance, outputs = task
+    engines = _worker_state.setdefault("engines", {})
+    engine = engines.get(size)
+    if engine is None:
+        engine = engines[size] = IconEngine(size, _worker_state.get("layers"))
+    icon = engine.render(ICON_VARIANTS[name], appearance)
+    for path in outputs:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        icon.save(path, "PNG")
+    return outputs
+
+
+def build_tasks(names, sizes, output_dir, install):
+    """任务列表：每个 (尺寸, 设计, 外观) 一项，输出到所有对应的图标集"""
+    tasks = []
+    for size in sizes:
+        for name in names:
+            for appearance in APPEARANCES:
+                outputs = []
+                for icon_set, filename in ICON_VARIANTS[name]["targets"]:
+                    base = os.path.join(LOGO_CATALOG if install else output_dir, f"{icon_set}.appiconset")
+                    outputs.append(os.path.join(base, icon_filename(filename, appearance, size)))
+                tasks.append((size, name, appearance, outputs))
+    return tasks
+
+
+def render_batch(tasks, workers=None):
+    """父进程计算各尺寸共享图层并发布到共享内存，所有变体在一个进程池批次中渲染"""
+    sizes = sorted({task[0] for task in tasks})
+    variants = {task[1]: ICON_VARIANTS[task[1]] for task in tasks}
+    shared = {}
+    for size in sizes:
+        shared.update(IconEngine(size).prepare(variants))
+
+    if workers == 1:
+        engines = {size: IconEngine(size, shared) for size in sizes}
+        _worker_state["engines"] = engines
+        return [_render_task(task) for task in tasks]
+
+    with SharedAssetStore() as store:
+        manifest = store.publish(shared)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(manifest,)) as executor:
+            return list(executor.map(_render_task, tasks))
+
+
+def install_dark_appearances(names):
+    """在图标集 Contents.json 中登记深色外观（iOS 18 深色图标）"""
+    for name in names:
+        for icon_set, filename in ICON_VARIANTS[name]["targets"]:
+            contents_path = os.path.join(LOGO_CATALOG, f"{icon_set}.appiconset", "Contents.json")
+            with open(contents_path, "r", encoding="utf-8") as f:
+                contents = json.load(f)
+            dark_name = icon_filename(filename, "dark", DESIGN_SIZE)
+            if any(image.get("filename") == dark_name for image in contents["images"]):
+                continue
+            contents["images"].append({
+                "appearances": [{"appearance": "luminosity", "value": "dark"}],
+                "filename": dark_name,
+                "idiom": "universal",
+                "platform": "ios",
+                "size": "1024x1024",
+            })
+            with open(contents_path, "w", encoding="utf-8") as f:
+                json.dump(contents, f, indent=2, separators=(",", " : "))
+                f.write("\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="按 AppIconDesign 参数化描述批量渲染备用应用图标（浅色/深色）")
+    parser.add_argument("--variants", help=f"逗号分隔的设计列表，默认全部（{', '.join(ICON_VARIANTS)}）")
+    parser.add_argument("--sizes", default=str(DESIGN_SIZE), help="逗号分隔的边长列表，默认 1024")
+    parser.add_argument("--output", default=os.path.join(PROJECT_ROOT, "AppIcons"), help="输出目录")
+    parser.add_argument("--install", action="store_true",
+                        help="直接写入 Life/Assets.xcassets/logo 下的图标集，并登记深色外观")
+    parser.add_argument("--workers", type=int, default=None, help="并行进程数，1 为单进程")
+    args = parser.parse_args()
+
+    names = args.variants.split(",") if args.variants else list(ICON_VARIANTS)
+    unknown = [name for name in names if name not in ICON_VARIANTS]
+    if unknown:
+        parser.error(f"未知设计: {', '.join(unknown)}，可选: {', '.join(ICON_VARIANTS)}")
+    sizes = [int(size) for size in args.sizes.split(",")]
+
+    tasks = build_tasks(names, sizes, args.output, args.install)
+    start = time.perf_counter()
+    results = render_batch(tasks, args.workers)
+    elapsed = time.perf_counter() - start
+    for outputs in results:
+        for path in outputs:
+            print(f"  保存: {path}")
+    if args.install and DESIGN_SIZE in sizes:
+        install_dark_appearances(names)
+        print("📝 已在 Contents.json 中登记深色外观")
+    print(f"🎨 {len(names)} 个设计 × {len(APPEARANCES)} 种外观 × {len(sizes)} 个尺寸，耗时 {elapsed:.2f}s")
+
+    # 图标集只接受 1024 的图标，其它尺寸仅用于预览，不参与校验
+    icons = [path for (size, _, _, _), outputs in zip(tasks, results) if size == DESIGN_SIZE for path in outputs]
+    if icons:
+        from png_validator import validate_paths, print_report
+        print_report(validate_paths(icons))
+
+
+if __name__ == "__main__":
+    main()
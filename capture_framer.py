@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+模拟器真实截屏套框
+把模拟器截取的 ContentView、DailyRecordView、MatterHistoryView 等原始截屏按尺寸匹配设备类型，
+套上预先计算的设备边框、屏幕圆角遮罩和阴影，加上 app_info 中的功能文案，输出可直接上传的截屏；
+每种设备的背景、边框、遮罩和阴影只计算一次，通过共享内存分发给工作进程
+
+用法:
+    python3 capture_framer.py Captures/ [--output AppStoreImages/framed] [--locale en] [--workers 8]
+"""
+
+import os
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image, ImageChops, ImageDraw, ImageFilter
+
+from create_real_image_app_store_images import PROJECT_ROOT, RealImageAppStoreGenerator
+from png_validator import SCREENSHOT_SIZES
+from shared_assets import SharedAssetStore, AttachedAssets
+
+# 设备外观：屏幕圆角和边框宽度为屏幕宽度的比例（竖屏）
+DEVICE_FRAMES = {
+    "iPhone 6.9\"": {"corner": 0.125, "bezel": 0.04},
+    "iPhone 6.5\"": {"corner": 0.11, "bezel": 0.04},
+    "iPhone 6.3\"": {"corner": 0.125, "bezel": 0.04},
+    "iPhone 6.1\"": {"corner": 0.12, "bezel": 0.04},
+    "iPhone 5.5\"": {"corner": 0.0, "bezel": 0.05},
+    "iPad 13\"": {"corner": 0.018, "bezel": 0.035},
+    "iPad 11\"": {"corner": 0.018, "bezel": 0.035},
+}
+FRAME_COLOR = (28, 28, 30)
+FRAME_RIM_COLOR = (72, 72, 76)
+SHADOW_OPACITY = 0.35
+CAPTION_COLOR = (255, 255, 255)
+# 遮罩超采样倍数（圆角抗锯齿）
+SUPERSAMPLE = 3
+
+# 按截屏文件名中的视图名匹配功能文案（app_info.features 的序号）
+# 按顺序匹配，宽泛的关键词放在最后：MatterHistoryView 应匹配 history 而不是 matter
+CAPTION_KEYWORDS = [
+    (("history", "chart", "stats"), 2),
+    (("dailyrecord", "mood", "emotion"), 1),
+    (("weather",), 3),
+    (("widget",), 4),
+    (("contentview", "home", "matter"), 0),
+]
+
+
+def device_class(size):
+    """原始截屏尺寸 → (设备类型, 是否横屏)，无法识别时返回 (None, False)"""
+    width, height = size
+    portrait = (min(width, height), max(width, height))
+    for device, sizes in SCREENSHOT_SIZES.items():
+        if portrait in sizes:
+            return device, width > height
+    return None, False
+
+
+def rounded_mask(size, radius, scale=SUPERSAMPLE):
+    """抗锯齿的圆角矩形遮罩"""
+    width, height = size
+    if radius <= 0:
+        return Image.new("L", size, 255)
+    big = Image.new("L", (width * scale, height * scale), 0)
+    ImageDraw.Draw(big).rounded_rectangle([0, 0, width * scale - 1, height * scale - 1],
+                                          radius=radius * scale, fill=255)
+    return big.reduce(scale)
+
+
+def build_template(generator, device, size):
+    """
+    计算一种 (设备, 截屏尺寸) 的套框模板
+    返回 (几何信息, {图层名: 图片})；图层包括背景、屏幕遮罩、边框和阴影
+    """
+    width, height = size
+    landscape = width > height
+    params = DEVICE_FRAMES[device]
+
+    # 上方留出文案区域，设备缩放到剩余空间内
+    caption_height = int(height * (0.24 if landscape else 0.17))
+    short_side = min(width, height)
+    bezel_ratio = params["bezel"]
+    available_w = width * 0.86
+    available_h = (height - caption_height) * 0.92
+    # 缩放后屏幕 + 两侧边框要放进可用区域
+    scale = min(available_w / (width + 2 * bezel_ratio * short_side),
+                available_h / (height + 2 * bezel_ratio * short_side))
+    screen_w, screen_h = int(width * scale), int(height * scale)
+    bezel = max(int(bezel_ratio * short_side * scale), 4)
+    corner = int(params["corner"] * short_side * scale)
+
+    frame_w, frame_h = screen_w + 2 * bezel, screen_h + 2 * bezel
+    frame_x = (width - frame_w) // 2
+    frame_y = caption_height + (height - caption_height - frame_h) // 2
+    screen_x, screen_y = frame_x + bezel, frame_y + bezel
+
+    background = generator.create_gradient_background(
+        size, generator.hex_to_rgb(generator.colors["primary"]),
+        generator.hex_to_rgb(generator.colors["secondary"]), "horizontal" if landscape else "vertical")
+
+    screen_mask = rounded_mask((screen_w, screen_h), corner)
+    outer_radius = corner + bezel if corner else bezel // 2
+    outer_mask = rounded_mask((frame_w, frame_h), outer_radius)
+
+    # 边框：外圈亮边 + 深色机身，中间挖去屏幕
+    frame = Image.new("RGBA", (frame_w, frame_h), FRAME_RIM_COLOR + (0,))
+    rim = max(bezel // 8, 1)
+    body = Image.new("L", (frame_w, frame_h), 0)
+    body.paste(rounded_mask((frame_w - 2 * rim, frame_h - 2 * rim), max(outer_radius - rim, 0)), (rim, rim))
+    frame.paste(FRAME_COLOR, (0, 0), body)
+    hole = Image.new("L", (frame_w, frame_h), 0)
+    hole.paste(screen_mask, (bezel, bezel))
+    frame.putalpha(ImageChops.subtract(outer_mask, hole))
+
+    # 阴影：在 1/4 分辨率上模糊后放大，边缘本身是平滑的
+    blur = max(frame_w // 30, 4)
+    pad = blur * 3
+    small = Image.new("L", ((frame_w + 2 * pad) // 4, (frame_h + 2 * pad) // 4), 0)
+    small.paste(outer_mask.reduce(4), (pad // 4, pad // 4))
+    small = small.filter(ImageFilter.GaussianBlur(blur / 4)).point(lambda v: round(v * SHADOW_OPACITY))
+    shadow = small.resize((frame_w + 2 * pad, frame_h + 2 * pad), Image.Resampling.BILINEAR)
+
+    geometry = {
+        "size": size,
+        "landscape": landscape,
+        "screen_box": (screen_x, screen_y, screen_w, screen_h),
+        "frame_pos": (frame_x, frame_y),
+        "shadow_pos": (frame_x - pad, frame_y - pad + frame_h // 60),
+        "caption_height": caption_height,
+    }
+    layers = {"background": background.convert("RGBA"), "screen_mask": screen_mask,
+              "frame": frame, "shadow": shadow}
+    return geometry, layers
+
+
+class CaptureFramer:
+    """把原始截屏套进设备模板并写上文案"""
+
+    def __init__(self, generator, captions=None):
+        self.generator = generator
+        # {文件名: {"title": ..., "subtitle": ...}}，优先于按视图名匹配
+        self.captions = captions or {}
+        self.templates = {}
+        self.layers = {}
+
+    def template(self, device, size):
+        """返回 (几何信息, 图层字典)；模板按 (设备, 尺寸) 缓存，也可以来自共享内存"""
+        key = f"{device}|{size[0]}x{size[1]}"
+        if key not in self.templates:
+            geometry, layers = build_template(self.generator, device, size)
+            self.templates[key] = geometry
+            for name, layer in layers.items():
+                self.layers[f"{key}|{name}"] = layer
+        return self.templates[key], {name: self.layers[f"{key}|{name}"]
+                                     for name in ("background", "screen_mask", "frame", "shadow")}
+
+    def caption(self, filename, index):
+        """文案：显式指定 → 按视图名匹配功能 → 按序号轮流使用功能"""
+        if filename in self.captions:
+            caption = self.captions[filename]
+            return caption.get("title", ""), caption.get("subtitle", "")
+        name = filename.lower()
+        features = self.generator.app_info["features"]
+        feature = index % len(features)
+        for keywords, feature_index in CAPTION_KEYWORDS:
+            if any(keyword in name for keyword in keywords) and feature_index < len(features):
+                feature = feature_index
+                break
+        return (self.generator.text(f"features.{feature}.title"),
+                self.generator.text(f"features.{feature}.desc"))
+
+    def frame(self, path, index):
+        """套框一张截屏，返回 (设备类型, 图片)；无法识别尺寸时返回 (None, None)"""
+        with Image.open(path) as capture:
+            device, _ = device_class(capture.size)
+            if device is None:
+                return None, None
+            geometry, layers = self.template(device, capture.size)
+            screen_x, screen_y, screen_w, screen_h = geometry["screen_box"]
+            capture = capture.convert("RGB").resize((screen_w, screen_h), Image.Resampling.LANCZOS,
+                                                    reducing_gap=2.0)
+
+        image = layers["background"].convert("RGB")
+        image.paste((0, 0, 0), geometry["shadow_pos"], layers["shadow"])
+        image.paste(capture, (screen_x, screen_y), layers["screen_mask"])
+        image.paste(layers["frame"], geometry["frame_pos"], layers["frame"])
+
+        width, height = geometry["size"]
+        title, subtitle = self.caption(os.path.basename(path), index)
+        caption_height = geometry["caption_height"]
+        generator = self.generator
+        generator.add_text(image, title, (width // 2, int(caption_height * 0.3)),
+                           int(min(width, height) * 0.075), CAPTION_COLOR, 20)
+        generator.add_text(image, subtitle, (width // 2, int(caption_height * 0.62)),
+                           int(min(width, height) * 0.042), CAPTION_COLOR, 28)
+        return device, image
+
+
+def output_name(device, path, root=None):
+    """
+    设备类型作为子目录：iPhone 6.9" → iPhone_6.9，其下保留截屏相对 root 的子目录，
+    因此 Captures/en/ContentView.png 和 Captures/ja/ContentView.png 不会写到同一个文件
+    """
+    folder = device.replace('"', "").replace(" ", "_")
+    relative = os.path.relpath(path, root) if root else os.path.basename(path)
+    return os.path.join(folder, os.path.splitext(relative)[0] + ".png")
+
+
+def collect_captures(root):
+    """递归收集原始截屏（PNG/JPEG），按路径排序"""
+    captures = []
+    for directory, dirs, names in os.walk(root):
+        dirs.sort()
+        captures.extend(os.path.join(directory, name) for name in sorted(names)
+                        if name.lower().endswith((".png", ".jpg", ".jpeg")))
+    return captures
+
+
+# 工作进程内的全局状态（由 initializer 设置）
+_worker_state = {}
+
+
+def _init_worker(framer, templates, manifest):
+    framer.templates = templates
+    framer.layers = AttachedAssets(manifest)
+    _worker_state["framer"] = framer
+
+
+def _frame_task(task):
+    """在工作进程中套框并保存一张截屏"""
+    index, path, filename, output_path = task
+    framer = _worker_state["framer"]
+    device, image = framer.frame(path, index)
+    if image is None:
+        return path, None
+    target = os.path.join(output_path, filename)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    image.save(target, "PNG")
+    return path, filename
+
+
+def frame_captures(framer, captures, output_path, workers=None, root=None):
+    """
+    父进程为出现的每种 (设备, 尺寸) 预先计算模板并发布到共享内存，再用进程池套框
+    输出文件名相对 root 保留子目录；两张截屏对应同一个输出文件时（如 a.png 和 a.jpg）报错
+    返回 [(原始路径, 输出文件名或 None)]
+    """
+    filenames = {}
+    owners = {}
+    for path in captures:
+        with Image.open(path) as capture:
+            device, _ = device_class(capture.size)
+            if device is None:
+                continue
+            framer.template(device, capture.size)
+        filename = output_name(device, path, root)
+        if filename in owners:
+            raise ValueError(f"{owners[filename]} 和 {path} 会输出到同一个文件 {filename}")
+        owners[filename] = path
+        filenames[path] = filename
+
+    tasks = [(index, path, filenames.get(path), output_path) for index, path in enumerate(captures)]
+    if workers == 1:
+        _worker_state["framer"] = framer
+        return [_frame_task(task) for task in tasks]
+
+    with SharedAssetStore() as store:
+        manifest = store.publish(framer.layers)
+        framer_state = CaptureFramer(framer.generator, framer.captions)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(framer_state, framer.templates, manifest)) as executor:
+            return list(executor.map(_frame_task, tasks, chunksize=4))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="把模拟器原始截屏批量套上设备边框并加上功能文案")
+    parser.add_argument("captures", help="原始截屏目录（按尺寸自动识别设备类型）")
+    parser.add_argument("--output", default=os.path.join(PROJECT_ROOT, "AppStoreImages", "framed"),
+                        help="输出目录，每种设备一个子目录")
+    parser.add_argument("--captions", help="文案JSON：{文件名: {\"title\": ..., \"subtitle\": ...}}")
+    parser.add_argument("--locale", help="使用 locales/<语言>.json 中的功能文案和字体")
+    parser.add_argument("--workers", type=int, default=None, help="并行进程数，1 为单进程")
+    args = parser.parse_args()
+
+    generator = RealImageAppStoreGenerator(output_path=args.output)
+    if args.locale:
+        from localized_screenshots import LocalizedScreenshotRenderer, load_locale
+        LocalizedScreenshotRenderer(generator, {}).apply_locale(load_locale(args.locale))
+    captions = None
+    if args.captions:
+        with open(args.captions, "r", encoding="utf-8") as f:
+            captions = json.load(f)
+
+    captures = collect_captures(args.captures)
+    if not captures:
+        print(f"❌ 没有找到原始截屏: {args.captures}")
+        return
+
+    start = time.perf_counter()
+    framer = CaptureFramer(generator, captions)
+    try:
+        results = frame_captures(framer, captures, args.output, args.workers, root=args.captures)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return
+    elapsed = time.perf_counter() - start
+
+    framed = [filename for _, filename in results if filename]
+    for path, filename in results:
+        if filename is None:
+            print(f"⚠️  跳过（无法识别设备尺寸）: {path}")
+    print(f"🖼️  套框 {len(framed)}/{len(captures)} 张截屏，{len(framer.templates)} 种设备模板，"
+          f"耗时 {elapsed:.2f}s")
+    print(f"所有图片已生成到: {args.output}")
+
+    from png_validator import validate_paths, print_report
+    print_report(validate_paths([os.path.join(args.output, filename) for filename in framed]))
+
+
+if __name__ == "__main__":
+    main()
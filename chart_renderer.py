@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+截屏用的数据驱动图表渲染
+支持任意长度的数据序列（列表或文件），按像素宽度用 LTTB / min-max 降采样后，
+以批量图元绘制柱状图、折线图和面积图
+"""
+
+import os
+import csv
+import json
+
+CHART_STYLES = ["bar", "line", "area"]
+
+
+def load_series(source):
+    """
+    读取数据序列
+    source 可以是数字列表，或文件路径：
+      .json  数字列表，或 {"values": [...]}
+      .csv   取每行最后一个数字列
+      其他   每行一个数字
+    """
+    if isinstance(source, (list, tuple)):
+        return [float(v) for v in source]
+
+    ext = os.path.splitext(source)[1].lower()
+    with open(source, "r", encoding="utf-8") as f:
+        if ext == ".json":
+            data = json.load(f)
+            if isinstance(data, dict):
+                data = data["values"]
+            return [float(v) for v in data]
+
+        values = []
+        if ext == ".csv":
+            for row in csv.reader(f):
+                for cell in reversed(row):
+                    try:
+                        values.append(float(cell))
+                        break
+                    except ValueError:
+                        continue
+        else:
+            for line in f:
+                line = line.strip()
+                if line:
+                    values.append(float(line))
+        return values
+
+
+def lttb(values, threshold):
+    """
+    Largest-Triangle-Three-Buckets 降采样
+    返回 [(索引, 数值), ...]，保留首尾点和视觉上的主要拐点
+    """
+    n = len(values)
+    if threshold >= n or threshold < 3:
+        return list(enumerate(values))
+
+    sampled = [(0, values[0])]
+    bucket_size = (n - 2) / (threshold - 2)
+    a = 0
+
+    for i in range(threshold - 2):
+        # 下一个桶的平均点
+        next_start = int((i + 1) * bucket_size) + 1
+        next_end = min(int((i + 2) * bucket_size) + 1, n)
+        next_count = max(next_end - next_start, 1)
+        avg_x = (next_start + next_end - 1) / 2
+        avg_y = sum(values[next_start:next_end]) / next_count
+
+        # 当前桶中与前一个选中点、下一个桶平均点组成最大三角形的点
+        start = int(i * bucket_size) + 1
+        end = int((i + 1) * bucket_size) + 1
+        ax, ay = a, values[a]
+        max_area = -1
+        chosen = start
+        for j in range(start, end):
+            area = abs((ax - avg_x) * (values[j] - ay) - (ax - j) * (avg_y - ay))
+            if area > max_area:
+                max_area = area
+                chosen = j
+        sampled.append((chosen, values[chosen]))
+        a = chosen
+
+    sampled.append((n - 1, values[-1]))
+    return sampled
+
+
+def min_max_buckets(values, buckets):
+    """把序列分成 buckets 个桶，返回每个桶的 (最小值, 最大值)"""
+    n = len(values)
+    if buckets >= n:
+        return [(v, v) for v in values]
+    result = []
+    for i in range(buckets):
+        chunk = values[i * n // buckets:(i + 1) * n // buckets]
+        result.append((min(chunk), max(chunk)))
+    return result
+
+
+class ChartRenderer:
+    """在给定矩形内绘制图表"""
+
+    def __init__(self, padding=20, bar_gap=10, bar_radius=5, line_width=3):
+        self.padding = padding
+        self.bar_gap = bar_gap
+        self.bar_radius = bar_radius
+        self.line_width = line_width
+
+    def value_scale(self, values, value_range):
+        """返回 (最小值, 最大值)；范围为空（最大值等于最小值）时最大值加 1，避免除零"""
+        if value_range is not None:
+            low, high = value_range
+        else:
+            low = min(0, min(values))
+            high = max(values)
+        return low, high if high != low else low + 1
+
+    def draw(self, draw, box, values, style="bar", color=(102, 126, 234),
+             fill_color=None, value_range=None):
+        """
+        绘制图表
+        box: 卡片区域 (x0, y0, x1, y1)，图表在内部留出 padding
+        fill_color: 面积图的填充色，默认使用 color
+        value_range: 数值范围 (最小值, 最大值)，默认按数据自动计算
+        """
+        if not values:
+            return
+        if style not in CHART_STYLES:
+            raise ValueError(f"未知图表类型: {style}，可选: {', '.join(CHART_STYLES)}")
+
+        if style == "bar":
+            self.draw_bars(draw, box, values, color, value_range)
+        else:
+            self.draw_line(draw, box, values, color, fill_color if style == "area" else None,
+                           value_range, filled=(style == "area"))
+
+    def draw_bars(self, draw, box, values, color, value_range):
+        """柱状图：柱子放不下时按 min-max 桶取最大值降采样；超出指定范围的值截断到图表内"""
+        x0, y0, x1, y1 = box
+        chart_width = x1 - x0
+        chart_height = y1 - y0
+        max_height = chart_height - self.padding * 2
+        bottom = y1 - self.padding
+        low, high = self.value_scale(values, value_range)
+
+        bar_width = chart_width // len(values) - self.bar_gap
+        if bar_width >= self.bar_radius:
+            # 数据较少：圆角柱子，与原来的手工布局一致
+            for i, value in enumerate(values):
+                bar_height = min(max(int(((value - low) / (high - low)) * max_height), 0), max_height)
+                bar_x = x0 + i * (bar_width + self.bar_gap) + self.padding
+                draw.rounded_rectangle([bar_x, bottom - bar_height, bar_x + bar_width, bottom],
+                                       radius=self.bar_radius, fill=color)
+            return
+
+        # 数据较多：每个柱子 2 像素宽、间隔 1 像素，柱数由像素宽度决定
+        inner_width = chart_width - self.padding * 2
+        buckets = min_max_buckets(values, max(inner_width // 3, 1))
+        slot = inner_width / len(buckets)
+        width = max(int(slot) - 1, 1)
+        for i, (_, bucket_max) in enumerate(buckets):
+            bar_height = min(max(int(((bucket_max - low) / (high - low)) * max_height), 0), max_height)
+            bar_x = x0 + self.padding + int(i * slot)
+            draw.rectangle([bar_x, bottom - bar_height, bar_x + width - 1, bottom], fill=color)
+
+    def draw_line(self, draw, box, values, color, fill_color, value_range, filled=False):
+        """折线图/面积图：LTTB 降采样到内部像素宽度后一次性绘制"""
+        x0, y0, x1, y1 = box
+        inner_left = x0 + self.padding
+        inner_width = x1 - x0 - self.padding * 2
+        top = y0 + self.padding
+        bottom = y1 - self.padding
+        max_height = bottom - top
+        low, high = self.value_scale(values, value_range)
+
+        sampled = lttb(values, max(inner_width, 3))
+        last_index = max(len(values) - 1, 1)
+        points = [(inner_left + index * inner_width / last_index,
+                   bottom - ((value - low) / (high - low)) * max_height)
+                  for index, value in sampled]
+
+        if filled:
+            polygon = points + [(points[-1][0], bottom), (points[0][0], bottom)]
+            draw.polygon(polygon, fill=fill_color or color)
+        if len(points) > 1:
+            draw.line(points, fill=color, width=self.line_width, joint="curve")
@@ -7,13 +7,18 @@ import os
 import subprocess
 import sys
 
+from pbxproj_index import swift_files_from_args
+
+# 项目根目录（脚本所在目录）
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+
 def check_swift_syntax(file_path):
     """检查Swift文件语法"""
     try:
         # 使用swiftc检查语法
         result = subprocess.run(['swiftc', '-parse', file_path], 
                               capture_output=True, text=True, 
-                              cwd='/Users/tangxiaojun/Downloads/Life')
+                              cwd=PROJECT_ROOT)
         return result.returncode == 0, result.stderr
     except Exception as e:
         return False, str(e)
@@ -22,18 +27,13 @@ def main():
     print("🔍 检查Swift编译错误")
     print("=" * 40)
     
-    # 检查主要文件
-    files_to_check = [
-        'Life/Views/MatterHistoryView.swift',
-        'Life/Views/OptionConfigView.swift', 
-        'Life/Views/MatterEditView.swift',
-        'Life/LifeApp.swift'
-    ]
-    
+    # 检查 target 实际编译的 Swift 文件（来自 project.pbxproj 索引）
+    files_to_check = swift_files_from_args()
+
     all_good = True
     
     for file_path in files_to_check:
-        full_path = os.path.join('/Users/tangxiaojun/Downloads/Life', file_path)
+        full_path = os.path.join(PROJECT_ROOT, file_path)
         if os.path.exists(full_path):
             print(f"\n📄 检查: {file_path}")
             is_valid, error = check_swift_syntax(full_path)
@@ -5,15 +5,55 @@
 """
 
 import os
+import sys
+import json
+import argparse
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
 from PIL import Image, ImageDraw, ImageFont, ImageFilter
 import textwrap
 import random
 import math
+from collections import namedtuple
+
+from layout_engine import LayoutCache, Node, Row, Column, Text, Spacer, phone_scene
+from emoji_atlas import get_atlas, has_emoji, emoji_clusters, text_size, draw_text
+
+# 项目根目录（脚本所在目录）
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+def peak_rss_mb():
+    """返回 (当前进程峰值RSS, 子进程峰值RSS)，单位MB"""
+    if resource is None:
+        return None, None
+    # macOS 上 ru_maxrss 单位为字节，Linux 上为KB
+    unit = 1024 * 1024 if sys.platform == "darwin" else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / unit
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / unit
+    return own, children
+
+# 字体候选列表，按顺序尝试
+FONT_CANDIDATES = ["/System/Library/Fonts/PingFang.ttc", "/System/Library/Fonts/Helvetica.ttc"]
+
+class LocalizedText(str):
+    """带文案键的文字，分层渲染时按键替换为其他语言"""
+
+    def __new__(cls, value, key):
+        text = super().__new__(cls, value)
+        text.key = key
+        return text
+
+# 分层渲染时记录的文字操作：add_text 的参数，frame_key 为文字所在布局框的键（按框绘制时）
+TextOp = namedtuple("TextOp", "text position font_size color max_width align box_width frame_key")
 
 class RealImageAppStoreGenerator:
-    def __init__(self):
-        self.base_path = "/Users/tangxiaojun/Downloads/Life/Life/Assets.xcassets/image"
-        self.output_path = "/Users/tangxiaojun/Downloads/Life/AppStoreImages"
+    def __init__(self, base_path=None, output_path=None, low_memory=False):
+        self.base_path = base_path or os.path.join(PROJECT_ROOT, "Life", "Assets.xcassets", "image")
+        self.output_path = output_path or os.path.join(PROJECT_ROOT, "AppStoreImages")
+        # 低内存模式：复用同尺寸画布，每个尺寸渲染完后释放缓存
+        self.low_memory = low_memory
         
         # 创建输出目录
         os.makedirs(self.output_path, exist_ok=True)
@@ -51,6 +91,48 @@ class RealImageAppStoreGenerator:
             "accent": "#4CAF50"
         }
 
+        # 截屏中除 app_info 以外的界面文案
+        self.ui_strings = {
+            "status_time": "9:41",
+            "feature_page_title": "📊 数据统计",
+            "feature_page_desc": "查看您的情绪变化趋势",
+            "widget_quick_title": "📝 快速记录",
+            "widget_quick_desc": "点击记录当前心情",
+            "widget_stats_title": "📊 今日统计",
+            "widget_stats_desc": "已记录 5 个事项",
+        }
+
+        # 文字渲染设置：字体候选列表和传给 draw.text 的排版参数（方向、语言）
+        self.font_candidates = FONT_CANDIDATES
+        self.text_options = {}
+        # 彩色 emoji 来源（字体文件或 PNG 图片集目录），None 时自动查找系统 emoji 字体
+        self.emoji_source = None
+        # 不为 None 时 add_text 只记录文字操作，不绘制（用于分层渲染）
+        self._text_ops = None
+
+        # 字体和静态图层缓存，多次渲染之间复用
+        self._font_cache = {}
+        self._gradient_cache = {}
+        self._canvas_cache = {}
+        self._resize_cache = {}
+        # 布局求解结果，按 (截屏类型, 内容) 和尺寸缓存
+        self._layouts = LayoutCache()
+
+    def __copy__(self):
+        """浅复制共享同一组缓存（渲染服务覆盖文案/颜色时使用）；__getstate__ 只在跨进程传递时生效"""
+        clone = object.__new__(type(self))
+        clone.__dict__.update(self.__dict__)
+        return clone
+
+    def __getstate__(self):
+        """传给工作进程时不携带缓存，缓存在各进程内重新建立"""
+        state = self.__dict__.copy()
+        state["_font_cache"] = {}
+        state["_gradient_cache"] = {}
+        state["_canvas_cache"] = {}
+        state["_resize_cache"] = {}
+        return state
+
     def load_real_images(self):
         """加载真实的图片资源"""
         images = {}
@@ -71,18 +153,86 @@ class RealImageAppStoreGenerator:
             
             if os.path.exists(image_path):
                 try:
-                    images[key] = Image.open(image_path)
+                    images[key] = self.open_image(image_path)
                     print(f"成功加载图片: {key} ({images[key].size})")
                 except Exception as e:
                     print(f"加载图片失败 {key}: {e}")
         
         return images
 
+    def open_image(self, image_path):
+        """解码图片后立即关闭文件句柄"""
+        with Image.open(image_path) as image:
+            image.load()
+        # 资源目录中的 PNG 经过无损压缩，可能是调色板/灰度模式，统一还原为 RGB(A) 以便作为粘贴蒙版
+        if image.mode not in ("RGB", "RGBA"):
+            has_alpha = "A" in image.getbands() or "transparency" in image.info
+            image = image.convert("RGBA" if has_alpha else "RGB")
+        return image
+
     def hex_to_rgb(self, hex_color):
         """将十六进制颜色转换为RGB"""
         hex_color = hex_color.lstrip('#')
         return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
 
+    def text(self, key):
+        """按键获取文案：name、subtitle、features.N.title/desc 来自 app_info，其余来自 ui_strings"""
+        parts = key.split(".")
+        if parts[0] == "features":
+            value = self.app_info["features"][int(parts[1])][parts[2]]
+        elif parts[0] in self.app_info:
+            value = self.app_info[parts[0]]
+        else:
+            value = self.ui_strings[key]
+        return LocalizedText(value, key)
+
+    def get_font(self, font_size):
+        """获取指定字号的字体（带缓存）"""
+        key = (tuple(self.font_candidates), font_size)
+        font = self._font_cache.get(key)
+        if font is None:
+            font = ImageFont.load_default()
+            for font_path in self.font_candidates:
+                try:
+                    font = ImageFont.truetype(font_path, font_size)
+                    break
+                except:
+                    continue
+            self._font_cache[key] = font
+        return font
+
+    def get_gradient_background(self, size, color1, color2, direction='vertical'):
+        """获取渐变背景画布，同样参数的渐变只绘制一次；低内存模式下复用同尺寸的画布"""
+        key = (size, color1, color2, direction)
+        gradient = self._gradient_cache.get(key)
+        if gradient is None:
+            gradient = self.create_gradient_background(size, color1, color2, direction)
+            self._gradient_cache[key] = gradient
+        if not self.low_memory:
+            return gradient.copy()
+        canvas = self._canvas_cache.get(size)
+        if canvas is None:
+            canvas = Image.new('RGB', size)
+            self._canvas_cache[size] = canvas
+        canvas.paste(gradient)
+        return canvas
+
+    def release_buffers(self):
+        """释放画布和渐变背景缓存"""
+        for image in list(self._canvas_cache.values()) + list(self._gradient_cache.values()):
+            image.close()
+        self._canvas_cache.clear()
+        self._gradient_cache.clear()
+
+    def resize_image(self, images, key, size):
+        """获取缩放后的图片（带缓存），返回的图片不可修改"""
+        source = images[key]
+        cached = self._resize_cache.get((key, size))
+        if cached is None or cached[0] is not source:
+            cached = (source, source.resize(size, Image.Resampling.LANCZOS))
+            self._resize_cache[(key, size)] = cached
+        return cached[1]
+
     def create_gradient_background(self, size, color1, color2, direction='vertical'):
         """创建渐变背景"""
         width, height = size
@@ -106,27 +256,38 @@ class RealImageAppStoreGenerator:
         
         return image
 
-    def add_text(self, image, text, position, font_size, color, max_width=None, align='center'):
-        """在图片上添加文字"""
+    def add_text(self, image, text, position, font_size, color, max_width=None, align='center', box_width=None):
+        """在图片上添加文字；给出 box_width 时在从 position 起、宽 box_width 的框内按 align 对齐"""
+        if self._text_ops is not None:
+            self._text_ops.append(TextOp(text, position, font_size, color, max_width, align, box_width, None))
+            return
         draw = ImageDraw.Draw(image)
-        
-        try:
-            # 尝试使用系统字体
-            font = ImageFont.truetype("/System/Library/Fonts/PingFang.ttc", font_size)
-        except:
-            try:
-                font = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", font_size)
-            except:
-                font = ImageFont.load_default()
-        
-        if max_width:
+        font = self.get_font(font_size)
+        atlas = self.emoji_atlas()
+        
+        if box_width is not None:
+            # 单行文字在 [x, x + box_width] 内对齐，不换行
+            bbox = draw.textbbox((0, 0), text, font=font, **self.text_options)
+            text_width = bbox[2] - bbox[0]
+            if atlas is not None and has_emoji(text):
+                text_width = text_size(text, font, atlas, **self.text_options)[0]
+            if align == 'center':
+                x = position[0] + box_width // 2 - text_width // 2
+            elif align == 'right':
+                x = position[0] + box_width - text_width
+            else:
+                x = position[0]
+            draw_text(image, (x, position[1]), text, font, color, atlas, **self.text_options)
+        elif max_width:
             # 自动换行
             lines = textwrap.wrap(text, width=max_width)
             y_offset = 0
             for line in lines:
-                bbox = draw.textbbox((0, 0), line, font=font)
+                bbox = draw.textbbox((0, 0), line, font=font, **self.text_options)
                 text_width = bbox[2] - bbox[0]
                 text_height = bbox[3] - bbox[1]
+                if atlas is not None and has_emoji(line):
+                    text_width = text_size(line, font, atlas, **self.text_options)[0]
                 
                 if align == 'center':
                     x = position[0] - text_width // 2 if position[0] > 0 else position[0]
@@ -135,287 +296,219 @@ class RealImageAppStoreGenerator:
                 else:  # right
                     x = position[0] - text_width
                 
-                draw.text((x, position[1] + y_offset), line, font=font, fill=color)
+                draw_text(image, (x, position[1] + y_offset), line, font, color, atlas, **self.text_options)
                 y_offset += text_height + 5
         else:
-            draw.text(position, text, font=font, fill=color)
+            draw_text(image, position, text, font, color, atlas, **self.text_options)
+
+    def measure_text(self, text, font_size):
+        """文字的固有尺寸（布局引擎使用）"""
+        font = self.get_font(font_size)
+        left, top, right, bottom = font.getbbox(text)
+        atlas = self.emoji_atlas()
+        if atlas is not None and has_emoji(text):
+            width, height = text_size(text, font, atlas, **self.text_options)
+            return width, max(bottom, height)
+        return right, bottom
+
+    def emoji_atlas(self):
+        """当前进程的 emoji 图集（不保存在对象上，生成器需要传给工作进程）"""
+        return get_atlas(self.emoji_source)
+
+    def prepare_emoji(self):
+        """一次性把所有文案中的 emoji 渲染进图集，没有 emoji 来源时返回 None"""
+        atlas = self.emoji_atlas()
+        if atlas is not None:
+            texts = [self.app_info["name"], self.app_info["subtitle"], self.app_info["description"]]
+            texts += [value for feature in self.app_info["features"] for value in feature.values()]
+            texts += list(self.ui_strings.values())
+            atlas.ensure(emoji_clusters(texts))
+        return atlas
+
+    def layout_signature(self, images):
+        """影响布局的内容：可用图片、字体和所有文案"""
+        return (tuple(sorted(images)), tuple(self.font_candidates),
+                json.dumps([self.app_info, self.ui_strings], ensure_ascii=False, sort_keys=True))
+
+    def solve_layout(self, screenshot_type, size, images):
+        """按 (截屏类型, 尺寸, 内容) 求解并缓存布局，返回 {键: Frame}"""
+        builders = {
+            "home": self.build_home_scene,
+            "feature": self.build_feature_scene,
+            "widget": self.build_widget_scene,
+        }
+        is_landscape = size[0] > size[1]
+        return self._layouts.get((screenshot_type, self.layout_signature(images)), size,
+                                 lambda: phone_scene(builders[screenshot_type](images), is_landscape,
+                                                     self.text("status_time")),
+                                 self.measure_text)
 
     def create_phone_frame(self, image, is_landscape=False):
         """创建手机框架"""
-        width, height = image.size
-        
-        if is_landscape:
-            phone_width = min(width * 0.7, height * 0.9)
-            phone_height = phone_width * 0.55
-        else:
-            phone_height = min(height * 0.8, width * 0.5)
-            phone_width = phone_height * 0.5
-        
-        # 手机位置居中
-        phone_x = (width - phone_width) // 2
-        phone_y = (height - phone_height) // 2
-        
-        return int(phone_x), int(phone_y), int(phone_width), int(phone_height)
+        phone = self._layouts.get(("phone",), image.size,
+                                  lambda: phone_scene(Node(flex=1), is_landscape), self.measure_text)["phone"]
+        return phone.x, phone.y, phone.width, phone.height
+
+    def build_home_scene(self, images):
+        """主界面：标题卡片 + 4 张功能卡片"""
+        title_text = Column([
+            Text("app_name", self.text("name"), 28, height=30),
+            Text("app_subtitle", self.text("subtitle"), 16),
+        ], flex=1, spacing=0)
+        title_card = Row([
+            Node(key="app_icon", width=40, height=40) if "AppIcon" in images else None,
+            title_text,
+        ], key="title_card", height=80, padding=(10, 20, 20, 0), spacing=10, stack_align="start")
+
+        cards = []
+        for i, feature in enumerate(self.app_info["features"][:4]):
+            cards.append(Row([
+                Node(key=f"card.{i}.icon", width=30, height=30, align="center"),
+                Column([
+                    Text(f"card.{i}.title", self.text(f"features.{i}.title"), 18, height=20),
+                    Text(f"card.{i}.desc", self.text(f"features.{i}.desc"), 14),
+                ], flex=1, justify="center"),
+            ], key=f"card.{i}", height=70, padding=(20, 0, 20, 0), spacing=15))
+        return Column([title_card, Column(cards, spacing=15)],
+                      flex=1, padding=(20, 20, 20, 20), spacing=30)
+
+    def build_feature_scene(self, images):
+        """功能展示：页面标题 + 正方形图表 + 说明"""
+        return Column([
+            Text("page_title", self.text("feature_page_title"), 24, height=40),
+            Node(key="chart", flex=1, aspect=1) if "chart" in images else Spacer(120),
+            Text("page_desc", self.text("feature_page_desc"), 16),
+        ], flex=1, padding=(20, 30, 20, 20), spacing=20)
+
+    def build_widget_scene(self, images):
+        """小组件：快速记录 + 今日统计"""
+        def widget(name, title_key, desc_key, height, padding_top):
+            return Row([
+                Node(key=f"{name}.icon", width=30, height=30),
+                Column([
+                    Text(f"{name}.title", self.text(title_key), 18, height=30),
+                    Text(f"{name}.desc", self.text(desc_key), 14),
+                ], flex=1),
+            ], key=name, height=height, padding=(20, padding_top, 20, 0), spacing=10, stack_align="start")
+
+        return Column([
+            widget("widget_quick", "widget_quick_title", "widget_quick_desc", 100, 20),
+            widget("widget_stats", "widget_stats_title", "widget_stats_desc", 80, 15),
+        ], flex=1, padding=(20, 50, 20, 20), spacing=20)
+
+    @staticmethod
+    def box(frame):
+        """Frame → 绘图用的 [x0, y0, x1, y1]"""
+        return [frame.x, frame.y, frame.x + frame.width, frame.y + frame.height]
+
+    def draw_text_in(self, image, layout, key, text, color, align='left'):
+        """在求解出的文字框 layout[key] 内绘制单行文字，按框宽对齐；分层渲染时记录框的键，重放时可按新布局定位"""
+        frame = layout[key]
+        if self._text_ops is not None:
+            self._text_ops.append(TextOp(text, (frame.x, frame.y), frame.font_size, color, None, align,
+                                         frame.width, key))
+            return
+        self.add_text(image, text, (frame.x, frame.y), frame.font_size, color, align=align, box_width=frame.width)
+
+    def paste_image(self, image, images, key, frame):
+        """把图片缩放到求解出的框内并粘贴"""
+        picture = self.resize_image(images, key, (frame.width, frame.height))
+        image.paste(picture, (frame.x, frame.y), picture if picture.mode == 'RGBA' else None)
+
+    def draw_phone(self, image, draw, layout):
+        """手机外框、屏幕和状态栏"""
+        draw.rounded_rectangle(self.box(layout["phone"]), radius=25, fill=(30, 30, 30))
+        draw.rounded_rectangle(self.box(layout["screen"]), radius=20,
+                               fill=self.hex_to_rgb(self.colors["background"]))
+        draw.rectangle(self.box(layout["status"]), fill=(0, 0, 0))
+        if "status_time" in layout:
+            self.draw_text_in(image, layout, "status_time", self.text("status_time"), (255, 255, 255))
 
     def create_home_screen_with_real_images(self, image, images, is_landscape=False):
         """使用真实图片创建主界面截屏"""
-        width, height = image.size
+        layout = self.solve_layout("home", image.size, images)
         draw = ImageDraw.Draw(image)
-        
-        # 手机框架
-        phone_x, phone_y, phone_width, phone_height = self.create_phone_frame(image, is_landscape)
-        
-        # 绘制手机外框
-        phone_color = (30, 30, 30)
-        draw.rounded_rectangle([phone_x, phone_y, phone_x + phone_width, phone_y + phone_height], 
-                             radius=25, fill=phone_color)
-        
-        # 手机屏幕
-        screen_margin = 15
-        screen_x = phone_x + screen_margin
-        screen_y = phone_y + screen_margin
-        screen_width = phone_width - screen_margin * 2
-        screen_height = phone_height - screen_margin * 2
-        
-        # 屏幕背景
-        screen_bg = self.hex_to_rgb(self.colors["background"])
-        draw.rounded_rectangle([screen_x, screen_y, screen_x + screen_width, screen_y + screen_height], 
-                             radius=20, fill=screen_bg)
-        
-        # 状态栏
-        status_height = 40
-        draw.rectangle([screen_x, screen_y, screen_x + screen_width, screen_y + status_height], 
-                      fill=(0, 0, 0))
-        
-        # 状态栏内容
-        self.add_text(image, "9:41", (screen_x + screen_width - 50, screen_y + 15), 
-                     16, (255, 255, 255))
-        
-        # 应用标题区域
-        title_area_y = screen_y + status_height + 20
-        title_height = 80
-        
+        self.draw_phone(image, draw, layout)
+
         # 标题背景
-        title_bg = self.hex_to_rgb(self.colors["primary"])
-        draw.rounded_rectangle([screen_x + 20, title_area_y, screen_x + screen_width - 20, title_area_y + title_height], 
-                             radius=15, fill=title_bg)
-        
-        # 应用图标（如果存在）
-        if "AppIcon" in images:
-            icon_size = 40
-            icon_x = screen_x + 30
-            icon_y = title_area_y + (title_height - icon_size) // 2
-            
-            # 调整图标大小
-            app_icon = images["AppIcon"].resize((icon_size, icon_size), Image.Resampling.LANCZOS)
-            # 创建圆形遮罩
-            mask = Image.new('L', (icon_size, icon_size), 0)
-            mask_draw = ImageDraw.Draw(mask)
-            mask_draw.ellipse([0, 0, icon_size, icon_size], fill=255)
-            
-            # 应用圆形遮罩
+        draw.rounded_rectangle(self.box(layout["title_card"]), radius=15,
+                               fill=self.hex_to_rgb(self.colors["primary"]))
+
+        # 应用图标（圆形）
+        if "app_icon" in layout:
+            frame = layout["app_icon"]
+            icon_size = (frame.width, frame.height)
+            app_icon = self.resize_image(images, "AppIcon", icon_size).copy()
+            mask = Image.new('L', icon_size, 0)
+            ImageDraw.Draw(mask).ellipse([0, 0, icon_size[0], icon_size[1]], fill=255)
             app_icon.putalpha(mask)
-            image.paste(app_icon, (icon_x, icon_y), app_icon)
-        
-        # 应用名称
-        app_name_x = screen_x + 80 if "AppIcon" in images else screen_x + 20
-        self.add_text(image, self.app_info["name"], 
-                     (app_name_x, title_area_y + 20), 
-                     28, (255, 255, 255), align='left')
-        
-        # 副标题
-        self.add_text(image, self.app_info["subtitle"], 
-                     (app_name_x, title_area_y + 50), 
-                     16, (255, 255, 255, 180), align='left')
-        
-        # 功能卡片区域
-        cards_start_y = title_area_y + title_height + 30
-        card_height = 70
-        card_spacing = 15
-        
+            image.paste(app_icon, (frame.x, frame.y), app_icon)
+            app_icon.close()
+            mask.close()
+
+        self.draw_text_in(image, layout, "app_name", self.text("name"), (255, 255, 255))
+        self.draw_text_in(image, layout, "app_subtitle", self.text("subtitle"), (255, 255, 255, 180))
+
+        # 功能卡片
         for i, feature in enumerate(self.app_info["features"][:4]):
-            card_x = screen_x + 20
-            card_width = screen_width - 40
-            card_y = cards_start_y + i * (card_height + card_spacing)
-            
-            # 卡片背景
-            draw.rounded_rectangle([card_x, card_y, card_x + card_width, card_y + card_height], 
-                                 radius=12, fill=self.hex_to_rgb(self.colors["card_bg"]))
-            
+            card = layout[f"card.{i}"]
+            draw.rounded_rectangle(self.box(card), radius=12, fill=self.hex_to_rgb(self.colors["card_bg"]))
+
             # 卡片阴影效果
             shadow_offset = 2
-            draw.rounded_rectangle([card_x + shadow_offset, card_y + shadow_offset, 
-                                  card_x + card_width + shadow_offset, card_y + card_height + shadow_offset], 
-                                 radius=12, fill=(0, 0, 0, 30))
-            
-            # 功能图标（使用真实图片）
-            icon_size = 30
-            icon_x = card_x + 20
-            icon_y = card_y + (card_height - icon_size) // 2
-            
+            draw.rounded_rectangle([card.x + shadow_offset, card.y + shadow_offset,
+                                    card.x + card.width + shadow_offset, card.y + card.height + shadow_offset],
+                                   radius=12, fill=(0, 0, 0, 30))
+
+            icon = layout[f"card.{i}.icon"]
             if feature["image"] in images:
-                # 使用真实的功能图标
-                feature_icon = images[feature["image"]].resize((icon_size, icon_size), Image.Resampling.LANCZOS)
-                
-                # 图标背景
-                icon_bg = self.hex_to_rgb(self.colors["primary"])
-                draw.rounded_rectangle([icon_x - 5, icon_y - 5, icon_x + icon_size + 5, icon_y + icon_size + 5], 
-                                     radius=8, fill=icon_bg)
-                
-                # 粘贴真实图标
-                image.paste(feature_icon, (icon_x, icon_y), feature_icon if feature_icon.mode == 'RGBA' else None)
+                # 图标背景 + 真实的功能图标
+                draw.rounded_rectangle([icon.x - 5, icon.y - 5, icon.x + icon.width + 5, icon.y + icon.height + 5],
+                                       radius=8, fill=self.hex_to_rgb(self.colors["primary"]))
+                self.paste_image(image, images, feature["image"], icon)
             else:
                 # 使用emoji作为备选
-                self.add_text(image, feature["icon"], (icon_x + icon_size//2, icon_y + icon_size//2), 
-                             20, self.hex_to_rgb(self.colors["primary"]))
-            
-            # 功能文字
-            text_x = icon_x + icon_size + 15
-            text_y = card_y + card_height // 2
-            
-            self.add_text(image, feature["title"], (text_x, text_y - 10), 
-                         18, self.hex_to_rgb(self.colors["text"]), align='left')
-            self.add_text(image, feature["desc"], (text_x, text_y + 10), 
-                         14, self.hex_to_rgb(self.colors["light_text"]), align='left')
+                self.add_text(image, feature["icon"], (icon.x + icon.width // 2, icon.y + icon.height // 2),
+                              20, self.hex_to_rgb(self.colors["primary"]))
+
+            self.draw_text_in(image, layout, f"card.{i}.title", self.text(f"features.{i}.title"),
+                              self.hex_to_rgb(self.colors["text"]))
+            self.draw_text_in(image, layout, f"card.{i}.desc", self.text(f"features.{i}.desc"),
+                              self.hex_to_rgb(self.colors["light_text"]))
 
     def create_feature_screen_with_real_images(self, image, images, is_landscape=False):
         """使用真实图片创建功能展示截屏"""
-        width, height = image.size
+        layout = self.solve_layout("feature", image.size, images)
         draw = ImageDraw.Draw(image)
-        
-        # 手机框架
-        phone_x, phone_y, phone_width, phone_height = self.create_phone_frame(image, is_landscape)
-        
-        # 绘制手机外框
-        phone_color = (30, 30, 30)
-        draw.rounded_rectangle([phone_x, phone_y, phone_x + phone_width, phone_y + phone_height], 
-                             radius=25, fill=phone_color)
-        
-        # 手机屏幕
-        screen_margin = 15
-        screen_x = phone_x + screen_margin
-        screen_y = phone_y + screen_margin
-        screen_width = phone_width - screen_margin * 2
-        screen_height = phone_height - screen_margin * 2
-        
-        # 屏幕背景
-        screen_bg = self.hex_to_rgb(self.colors["background"])
-        draw.rounded_rectangle([screen_x, screen_y, screen_x + screen_width, screen_y + screen_height], 
-                             radius=20, fill=screen_bg)
-        
-        # 状态栏
-        status_height = 40
-        draw.rectangle([screen_x, screen_y, screen_x + screen_width, screen_y + status_height], 
-                      fill=(0, 0, 0))
-        
-        # 页面标题
-        page_title_y = screen_y + status_height + 30
-        self.add_text(image, "📊 数据统计", 
-                     (screen_x + screen_width // 2, page_title_y), 
-                     24, self.hex_to_rgb(self.colors["text"]))
-        
+        self.draw_phone(image, draw, layout)
+
+        self.draw_text_in(image, layout, "page_title", self.text("feature_page_title"),
+                          self.hex_to_rgb(self.colors["text"]), align='center')
+
         # 使用真实的图表图片
-        if "chart" in images:
-            chart_size = min(screen_width - 40, screen_height - 200)
-            chart_x = screen_x + (screen_width - chart_size) // 2
-            chart_y = page_title_y + 60
-            
-            # 调整图表大小
-            chart_image = images["chart"].resize((chart_size, chart_size), Image.Resampling.LANCZOS)
-            
-            # 图表背景
-            draw.rounded_rectangle([chart_x, chart_y, chart_x + chart_size, chart_y + chart_size], 
-                                 radius=15, fill=self.hex_to_rgb(self.colors["card_bg"]))
-            
-            # 粘贴真实图表
-            image.paste(chart_image, (chart_x, chart_y), chart_image if chart_image.mode == 'RGBA' else None)
-        
-        # 功能说明
-        desc_y = page_title_y + 60 + chart_size + 20 if "chart" in images else page_title_y + 200
-        self.add_text(image, "查看您的情绪变化趋势", 
-                     (screen_x + screen_width // 2, desc_y), 
-                     16, self.hex_to_rgb(self.colors["light_text"]))
+        if "chart" in layout:
+            chart = layout["chart"]
+            draw.rounded_rectangle(self.box(chart), radius=15, fill=self.hex_to_rgb(self.colors["card_bg"]))
+            self.paste_image(image, images, "chart", chart)
+
+        self.draw_text_in(image, layout, "page_desc", self.text("feature_page_desc"),
+                          self.hex_to_rgb(self.colors["light_text"]), align='center')
 
     def create_widget_screen_with_real_images(self, image, images, is_landscape=False):
         """使用真实图片创建小组件截屏"""
-        width, height = image.size
+        layout = self.solve_layout("widget", image.size, images)
         draw = ImageDraw.Draw(image)
-        
-        # 手机框架
-        phone_x, phone_y, phone_width, phone_height = self.create_phone_frame(image, is_landscape)
-        
-        # 绘制手机外框
-        phone_color = (30, 30, 30)
-        draw.rounded_rectangle([phone_x, phone_y, phone_x + phone_width, phone_y + phone_height], 
-                             radius=25, fill=phone_color)
-        
-        # 手机屏幕
-        screen_margin = 15
-        screen_x = phone_x + screen_margin
-        screen_y = phone_y + screen_margin
-        screen_width = phone_width - screen_margin * 2
-        screen_height = phone_height - screen_margin * 2
-        
-        # 屏幕背景
-        screen_bg = self.hex_to_rgb(self.colors["background"])
-        draw.rounded_rectangle([screen_x, screen_y, screen_x + screen_width, screen_y + screen_height], 
-                             radius=20, fill=screen_bg)
-        
-        # 状态栏
-        status_height = 40
-        draw.rectangle([screen_x, screen_y, screen_x + screen_width, screen_y + status_height], 
-                      fill=(0, 0, 0))
-        
-        # 小组件展示
-        widget_y = screen_y + status_height + 50
-        
-        # 小组件1 - 快速记录
-        widget1_width = screen_width - 40
-        widget1_height = 100
-        
-        draw.rounded_rectangle([screen_x + 20, widget_y, screen_x + 20 + widget1_width, widget_y + widget1_height], 
-                             radius=15, fill=self.hex_to_rgb(self.colors["card_bg"]))
-        
-        # 使用真实图标
-        if "dots" in images:
-            icon_size = 30
-            icon_x = screen_x + 40
-            icon_y = widget_y + 20
-            
-            dots_icon = images["dots"].resize((icon_size, icon_size), Image.Resampling.LANCZOS)
-            image.paste(dots_icon, (icon_x, icon_y), dots_icon if dots_icon.mode == 'RGBA' else None)
-        
-        self.add_text(image, "📝 快速记录", 
-                     (screen_x + 20 + 60, widget_y + 20), 
-                     18, self.hex_to_rgb(self.colors["text"]), align='left')
-        
-        self.add_text(image, "点击记录当前心情", 
-                     (screen_x + 20 + 60, widget_y + 50), 
-                     14, self.hex_to_rgb(self.colors["light_text"]), align='left')
-        
-        # 小组件2 - 今日统计
-        widget2_y = widget_y + widget1_height + 20
-        widget2_height = 80
-        
-        draw.rounded_rectangle([screen_x + 20, widget2_y, screen_x + 20 + widget1_width, widget2_y + widget2_height], 
-                             radius=15, fill=self.hex_to_rgb(self.colors["card_bg"]))
-        
-        # 使用真实图表图标
-        if "chart" in images:
-            icon_size = 30
-            icon_x = screen_x + 40
-            icon_y = widget2_y + 15
-            
-            chart_icon = images["chart"].resize((icon_size, icon_size), Image.Resampling.LANCZOS)
-            image.paste(chart_icon, (icon_x, icon_y), chart_icon if chart_icon.mode == 'RGBA' else None)
-        
-        self.add_text(image, "📊 今日统计", 
-                     (screen_x + 20 + 60, widget2_y + 15), 
-                     18, self.hex_to_rgb(self.colors["text"]), align='left')
-        
-        self.add_text(image, "已记录 5 个事项", 
-                     (screen_x + 20 + 60, widget2_y + 45), 
-                     14, self.hex_to_rgb(self.colors["light_text"]), align='left')
+        self.draw_phone(image, draw, layout)
+
+        for name, image_key in (("widget_quick", "dots"), ("widget_stats", "chart")):
+            draw.rounded_rectangle(self.box(layout[name]), radius=15,
+                                   fill=self.hex_to_rgb(self.colors["card_bg"]))
+            if image_key in images:
+                self.paste_image(image, images, image_key, layout[f"{name}.icon"])
+            self.draw_text_in(image, layout, f"{name}.title", self.text(f"{name}_title"),
+                              self.hex_to_rgb(self.colors["text"]))
+            self.draw_text_in(image, layout, f"{name}.desc", self.text(f"{name}_desc"),
+                              self.hex_to_rgb(self.colors["light_text"]))
 
     def create_app_screenshot(self, size, images, screenshot_type="home"):
         """创建应用截屏"""
@@ -425,8 +518,8 @@ class RealImageAppStoreGenerator:
         # 创建背景
         bg_color1 = self.hex_to_rgb(self.colors["primary"])
         bg_color2 = self.hex_to_rgb(self.colors["secondary"])
-        image = self.create_gradient_background(size, bg_color1, bg_color2, 
-                                              'horizontal' if is_landscape else 'vertical')
+        image = self.get_gradient_background(size, bg_color1, bg_color2, 
+                                             'horizontal' if is_landscape else 'vertical')
         
         if screenshot_type == "home":
             self.create_home_screen_with_real_images(image, images, is_landscape)
@@ -437,29 +530,41 @@ class RealImageAppStoreGenerator:
         
         return image
 
-    def generate_all_images(self):
-        """生成所有需要的图片"""
+    def generate_all_images(self, workers=1):
+        """生成所有需要的图片，workers 大于1时使用共享内存的多进程渲染"""
         print("开始基于真实图片生成App Store Connect图片...")
         
         # 加载真实图片
         images = self.load_real_images()
         print(f"成功加载了 {len(images)} 张真实图片")
+        if self.prepare_emoji() is None:
+            print("⚠️  未找到彩色 emoji 字体，emoji 按普通文字绘制（可用 --emoji-source 指定）")
         
         # 截屏类型
         screenshot_types = ["home", "feature", "widget"]
         
-        for size_name, size in self.sizes.items():
-            print(f"生成尺寸: {size_name} ({size[0]}x{size[1]})")
+        if workers > 1:
+            from shared_assets import render_matrix
+            tasks = [(f"{size_name}_{screenshot_type}_{i+1}.png", size, screenshot_type)
+                     for size_name, size in self.sizes.items()
+                     for i, screenshot_type in enumerate(screenshot_types)]
+            render_matrix(self, images, tasks, workers)
+        else:
+            for size_name, size in self.sizes.items():
+                print(f"生成尺寸: {size_name} ({size[0]}x{size[1]})")
             
-            for i, screenshot_type in enumerate(screenshot_types):
-                # 创建截屏
-                screenshot = self.create_app_screenshot(size, images, screenshot_type)
+                for i, screenshot_type in enumerate(screenshot_types):
+                    # 创建截屏
+                    screenshot = self.create_app_screenshot(size, images, screenshot_type)
                 
-                # 保存文件
-                filename = f"{size_name}_{screenshot_type}_{i+1}.png"
-                filepath = os.path.join(self.output_path, filename)
-                screenshot.save(filepath, "PNG", quality=95)
-                print(f"  保存: {filename}")
+                    # 保存文件
+                    filename = f"{size_name}_{screenshot_type}_{i+1}.png"
+                    filepath = os.path.join(self.output_path, filename)
+                    screenshot.save(filepath, "PNG", quality=95)
+                    print(f"  保存: {filename}")
+                
+                if self.low_memory:
+                    self.release_buffers()
         
         print(f"\n所有图片已生成到: {self.output_path}")
         print("\n生成的文件:")
@@ -469,9 +574,25 @@ class RealImageAppStoreGenerator:
                 file_size = os.path.getsize(filepath) / 1024 / 1024  # MB
                 print(f"  {file} ({file_size:.1f}MB)")
 
+        # 校验输出是否符合 App Store Connect 要求（只读取PNG块头）
+        from png_validator import validate_paths, print_report
+        print_report(validate_paths([self.output_path]))
+        
+        own_rss, children_rss = peak_rss_mb()
+        if own_rss is not None:
+            print(f"\n📈 峰值内存: 主进程 {own_rss:.1f}MB" +
+                  (f"，单个工作进程最高 {children_rss:.1f}MB" if workers > 1 else ""))
+
 def main():
-    generator = RealImageAppStoreGenerator()
-    generator.generate_all_images()
+    parser = argparse.ArgumentParser(description="生成App Store Connect截屏")
+    parser.add_argument("--low-memory", action="store_true", help="低内存模式：复用画布并及时释放中间图片")
+    parser.add_argument("--workers", type=int, default=1, help="渲染进程数，大于1时通过共享内存分发图片资源")
+    parser.add_argument("--emoji-source", help="彩色 emoji 字体或按码位命名的 PNG 图片集目录，默认自动查找")
+    args = parser.parse_args()
+
+    generator = RealImageAppStoreGenerator(low_memory=args.low_memory)
+    generator.emoji_source = args.emoji_source
+    generator.generate_all_images(workers=args.workers)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+彩色 emoji 图集
+PingFang/Helvetica 没有彩色 emoji 字形，截屏文案中的 📝、😊、🌤️ 会显示成方框或缺失。
+这里从彩色位图字体（Apple Color Emoji / Noto Color Emoji）或按码位命名的 PNG 图片集
+（Twemoji、Noto 的 emoji_u*.png）一次性渲染出用到的 emoji，按字素簇拼成一张图集并缓存到
+.cache/emoji_atlas；绘制时把文字拆成普通文字和 emoji 片段，普通文字照常 draw.text，
+emoji 从图集中取出按字号预缩放（按 (字素簇, 高度) 缓存）的贴图粘贴
+
+用法:
+    python3 emoji_atlas.py "📝 事项记录" "🌤️ 天气信息" --output emoji_preview.png
+    python3 emoji_atlas.py --source ~/twemoji/72x72 "👨‍👩‍👧 家庭"
+"""
+
+import os
+import sys
+import json
+import hashlib
+import argparse
+
+from PIL import Image, ImageDraw, ImageFont, features
+
+# 项目根目录（脚本所在目录）
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(PROJECT_ROOT, ".cache", "emoji_atlas")
+
+# 图集格式变化时递增，使旧缓存失效
+ATLAS_VERSION = 1
+
+EMOJI_FONTS = [
+    "/System/Library/Fonts/Apple Color Emoji.ttc",
+    "/usr/share/fonts/truetype/noto/NotoColorEmoji.ttf",
+    "/usr/share/fonts/noto/NotoColorEmoji.ttf",
+]
+# 彩色位图字体只有固定字号：Apple Color Emoji 为 160/96/64 等，Noto 为 109
+EMOJI_BITMAP_SIZES = (160, 109, 96, 64)
+
+# 图集中每个 emoji 统一缩放到的高度，图集最大宽度
+ATLAS_CELL = 128
+ATLAS_WIDTH = 2048
+
+# emoji 基本字符所在的码位范围；其他字符后跟 U+FE0F 时也按 emoji 处理
+EMOJI_RANGES = [(0x1F000, 0x1FAFF), (0x2600, 0x27BF), (0x2300, 0x23FF), (0x2B00, 0x2BFF),
+                (0x3030, 0x3030), (0x303D, 0x303D), (0x3297, 0x3297), (0x3299, 0x3299)]
+ZWJ = "‍"
+EMOJI_STYLE = "️"
+TEXT_STYLE = "︎"
+KEYCAP = "⃣"
+
+
+def is_emoji_base(char):
+    code = ord(char)
+    return any(low <= code <= high for low, high in EMOJI_RANGES)
+
+
+def is_regional_indicator(char):
+    return 0x1F1E6 <= ord(char) <= 0x1F1FF
+
+
+def is_extender(char):
+    """附在 emoji 后的字符：样式选择符、肤色修饰、标签序列（旗帜子区域）"""
+    code = ord(char)
+    return char == EMOJI_STYLE or 0x1F3FB <= code <= 0x1F3FF or 0xE0020 <= code <= 0xE007F
+
+
+def split_clusters(text):
+    """
+    把文字拆成 [(是否 emoji, 片段)]：相邻普通字符合并为一段，每个 emoji 字素簇单独一段
+    覆盖常见的 emoji 字素簇：样式选择符、肤色、ZWJ 组合、国旗（区域指示符对）、键帽、标签序列
+    """
+    segments = []
+    length = len(text)
+    i = 0
+
+    def push(is_emoji, piece):
+        if not is_emoji and segments and not segments[-1][0]:
+            segments[-1] = (False, segments[-1][1] + piece)
+        else:
+            segments.append((is_emoji, piece))
+
+    while i < length:
+        char = text[i]
+        following = text[i + 1] if i + 1 < length else ""
+        if is_regional_indicator(char) and following and is_regional_indicator(following):
+            push(True, text[i:i + 2])
+            i += 2
+            continue
+        if char in "#*0123456789":
+            end = i + 1
+            if end < length and text[end] == EMOJI_STYLE:
+                end += 1
+            if end < length and text[end] == KEYCAP:
+                push(True, text[i:end + 1])
+                i = end + 1
+                continue
+        if (is_emoji_base(char) and following != TEXT_STYLE) or following == EMOJI_STYLE:
+            end = i + 1
+            while end < length:
+                if is_extender(text[end]):
+                    end += 1
+                elif text[end] == ZWJ and end + 1 < length:
+                    end += 2
+                else:
+                    break
+            push(True, text[i:end])
+            i = end
+            continue
+        push(False, char)
+        i += 1
+    return segments
+
+
+def has_emoji(text):
+    return any(is_emoji for is_emoji, _ in split_clusters(text))
+
+
+def emoji_clusters(texts):
+    """若干段文字中出现的全部 emoji 字素簇"""
+    return {piece for text in texts for is_emoji, piece in split_clusters(text) if is_emoji}
+
+
+def source_stamp(source):
+    """图集来源的标识：路径 + 修改时间 + 大小（目录取其中文件数和最新修改时间）"""
+    stat = os.stat(source)
+    if os.path.isdir(source):
+        names = os.listdir(source)
+        latest = max((os.stat(os.path.join(source, n)).st_mtime_ns for n in names), default=stat.st_mtime_ns)
+        return f"{os.path.abspath(source)}:{len(names)}:{latest}"
+    return f"{os.path.abspath(source)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def find_source():
+    """默认来源：第一个存在的彩色 emoji 字体"""
+    for path in EMOJI_FONTS:
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def image_set_names(cluster):
+    """图片集中该字素簇可能的文件名（Twemoji 的 1f324-fe0f.png / 1f324.png，Noto 的 emoji_u1f324.png）"""
+    codes = [f"{ord(c):x}" for c in cluster]
+    plain = [code for code in codes if code != "fe0f"]
+    noto = "_".join(f"{ord(c):04x}" for c in cluster if c != EMOJI_STYLE)
+    return ["-".join(codes) + ".png", "-".join(plain) + ".png", f"emoji_u{noto}.png"]
+
+
+class EmojiAtlas:
+    """
+    emoji 图集：一张 RGBA 图片 + {字素簇: 矩形}，来源中没有的字素簇记入 missing
+    sprite() 返回按高度预缩放的贴图，缩放结果在进程内缓存
+    """
+
+    def __init__(self, source):
+        self.source = source
+        key = hashlib.sha256(f"{source_stamp(source)}:{ATLAS_VERSION}".encode()).hexdigest()[:16]
+        self.image_path = os.path.join(CACHE_DIR, f"{key}.png")
+        self.index_path = os.path.join(CACHE_DIR, f"{key}.json")
+        self.rects = {}
+        self.missing = set()
+        self.image = None
+        self._scaled = {}
+        self._fonts = None
+        if os.path.exists(self.index_path) and os.path.exists(self.image_path):
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+            self.rects = {cluster: tuple(rect) for cluster, rect in index["clusters"].items()}
+            self.missing = set(index["missing"])
+            self.image = Image.open(self.image_path)
+            self.image.load()
+
+    def render_from_font(self, cluster):
+        """用彩色位图字体的原始字号渲染一个字素簇，失败时返回 None"""
+        if self._fonts is None:
+            self._fonts = []
+            layout = ImageFont.Layout.RAQM if features.check("raqm") else ImageFont.Layout.BASIC
+            for size in EMOJI_BITMAP_SIZES:
+                try:
+                    self._fonts.append(ImageFont.truetype(self.source, size, layout_engine=layout))
+                except OSError:
+                    continue
+        for font in self._fonts:
+            left, top, right, bottom = font.getbbox(cluster)
+            if right <= left or bottom <= top:
+                continue
+            glyph = Image.new("RGBA", (right - left, bottom - top), (0, 0, 0, 0))
+            ImageDraw.Draw(glyph).text((-left, -top), cluster, font=font, embedded_color=True)
+            # 字体中没有该字形时画出的是空白或单色的“豆腐块”
+            if glyph.getchannel("A").getbbox() is None or len(glyph.getcolors(1 << 16) or [None] * 3) <= 2:
+                continue
+            return glyph
+        return None
+
+    def render_from_images(self, cluster):
+        for name in image_set_names(cluster):
+            path = os.path.join(self.source, name)
+            if os.path.exists(path):
+                with Image.open(path) as glyph:
+                    return glyph.convert("RGBA")
+        return None
+
+    def render(self, cluster):
+        """渲染并统一缩放到 ATLAS_CELL 高度"""
+        if os.path.isdir(self.source):
+            glyph = self.render_from_images(cluster)
+        else:
+            glyph = self.render_from_font(cluster)
+        if glyph is None:
+            return None
+        bbox = glyph.getchannel("A").getbbox()
+        if bbox is None:
+            return None
+        width = max(round(glyph.width * ATLAS_CELL / glyph.height), 1)
+        return glyph.resize((width, ATLAS_CELL), Image.Resampling.LANCZOS)
+
+    def ensure(self, clusters):
+        """把尚未在图集中的字素簇渲染进图集（重新排布并写回缓存）"""
+        new = sorted(c for c in clusters if c not in self.rects and c not in self.missing)
+        if not new:
+            return
+        sprites = {cluster: self.image.crop(self.box(cluster)) for cluster in self.rects}
+        for cluster in new:
+            sprite = self.render(cluster)
+            if sprite is None:
+                self.missing.add(cluster)
+            else:
+                sprites[cluster] = sprite
+
+        # 按行排布：每个贴图高度相同，一行放满 ATLAS_WIDTH 换行
+        rects = {}
+        x = y = 0
+        for cluster, sprite in sprites.items():
+            if x + sprite.width > ATLAS_WIDTH and x > 0:
+                x, y = 0, y + ATLAS_CELL
+            rects[cluster] = (x, y, sprite.width, ATLAS_CELL)
+            x += sprite.width
+        atlas = Image.new("RGBA", (ATLAS_WIDTH if y else max(x, 1), y + ATLAS_CELL), (0, 0, 0, 0))
+        for cluster, sprite in sprites.items():
+            atlas.paste(sprite, rects[cluster][:2])
+
+        self.image = atlas
+        self.rects = rects
+        self._scaled.clear()
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        atlas.save(self.image_path)
+        with open(self.index_path, "w", encoding="utf-8") as f:
+            json.dump({"source": self.source, "clusters": rects, "missing": sorted(self.missing)},
+                      f, ensure_ascii=False)
+
+    def box(self, cluster):
+        x, y, width, height = self.rects[cluster]
+        return (x, y, x + width, y + height)
+
+    def sprite(self, cluster, height):
+        """按高度缩放好的贴图；来源中没有该 emoji 时返回 None"""
+        key = (cluster, height)
+        sprite = self._scaled.get(key)
+        if sprite is None:
+            if cluster not in self.rects:
+                self.ensure([cluster])
+                if cluster not in self.rects:
+                    return None
+            cell = self.image.crop(self.box(cluster))
+            width = max(round(cell.width * height / cell.height), 1)
+            sprite = cell.resize((width, height), Image.Resampling.LANCZOS)
+            self._scaled[key] = sprite
+        return sprite
+
+
+# 每个进程每个来源只加载一次图集（生成器对象会被传给工作进程，因此不直接持有图集）
+_atlases = {}
+
+
+def get_atlas(source=None):
+    """返回来源对应的图集；没有可用的 emoji 字体/图片集时返回 None"""
+    source = source or find_source()
+    if source is None or not os.path.exists(source):
+        return None
+    atlas = _atlases.get(source)
+    if atlas is None:
+        atlas = EmojiAtlas(source)
+        _atlases[source] = atlas
+    return atlas
+
+
+def emoji_height(font):
+    """与字号相同高度的 emoji"""
+    return max(int(getattr(font, "size", 0) or sum(font.getmetrics())), 1)
+
+
+def layout_runs(text, font, atlas, options):
+    """文字 → [(是否贴图, 内容, 宽度)]；图集中没有的 emoji 按普通文字处理"""
+    length_options = {k: v for k, v in options.items() if k in ("direction", "language", "features")}
+    height = emoji_height(font)
+    runs = []
+    for is_emoji, piece in split_clusters(text):
+        sprite = atlas.sprite(piece, height) if is_emoji else None
+        if sprite is not None:
+            runs.append((True, sprite, sprite.width))
+        else:
+            runs.append((False, piece, font.getlength(piece, **length_options)))
+    return runs
+
+
+def text_size(text, font, atlas, **options):
+    """含 emoji 文字的 (宽度, 高度)"""
+    ascent, descent = font.getmetrics()
+    runs = layout_runs(text, font, atlas, options)
+    return round(sum(width for _, _, width in runs)), ascent + descent
+
+
+def draw_text(image, position, text, font, fill, atlas, **options):
+    """
+    在 position（文字左上角，与 draw.text 相同）绘制含 emoji 的文字
+    没有图集或文字中没有 emoji 时等同于 draw.text；从右到左排版时片段从右向左排列
+    """
+    draw = ImageDraw.Draw(image)
+    if atlas is None or not has_emoji(text):
+        draw.text(position, text, font=font, fill=fill, **options)
+        return
+
+    ascent, descent = font.getmetrics()
+    runs = layout_runs(text, font, atlas, options)
+    x, y = position
+    cursor = x + sum(width for _, _, width in runs) if options.get("direction") == "rtl" else x
+    for is_sprite, content, width in runs:
+        if options.get("direction") == "rtl":
+            cursor -= width
+            left = cursor
+        else:
+            left = cursor
+            cursor += width
+        if is_sprite:
+            top = y + (ascent + descent - content.height) / 2
+            image.paste(content, (round(left), round(top)), content)
+        else:
+            draw.text((left, y), content, font=font, fill=fill, **options)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="构建彩色 emoji 图集并预览含 emoji 的文字")
+    parser.add_argument("texts", nargs="*", help="要预览的文字，默认使用截屏中的功能文案")
+    parser.add_argument("--source", help="彩色 emoji 字体或按码位命名的 PNG 目录，默认自动查找系统字体")
+    parser.add_argument("--font", help="普通文字的字体文件")
+    parser.add_argument("--size", type=int, default=48, help="预览字号")
+    parser.add_argument("--output", default="emoji_preview.png", help="预览图片路径")
+    args = parser.parse_args()
+
+    atlas = get_atlas(args.source)
+    if atlas is None:
+        print("❌ 未找到彩色 emoji 字体，请用 --source 指定字体文件或 PNG 图片集目录")
+        return 1
+
+    texts = args.texts or ["📝 事项记录", "😊 情绪追踪", "🌤️ 天气信息", "📊 数据统计"]
+    atlas.ensure(emoji_clusters(texts))
+    print(f"🧩 图集: {len(atlas.rects)} 个 emoji，缺失 {len(atlas.missing)} 个"
+          + (f"（{' '.join(sorted(atlas.missing))}）" if atlas.missing else ""))
+    print(f"💾 {os.path.relpath(atlas.image_path, PROJECT_ROOT)}")
+
+    try:
+        font = ImageFont.truetype(args.font, args.size) if args.font else ImageFont.load_default(args.size)
+    except OSError:
+        font = ImageFont.load_default(args.size)
+    line_height = sum(font.getmetrics()) + 10
+    width = max(text_size(text, font, atlas)[0] for text in texts) + 40
+    preview = Image.new("RGB", (width, line_height * len(texts) + 30), (255, 255, 255))
+    for i, text in enumerate(texts):
+        draw_text(preview, (20, 15 + i * line_height), text, font, (40, 40, 40), atlas)
+    preview.save(args.output)
+    print(f"✅ 预览已保存: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,131 +4,151 @@ Git变基撤销脚本
 处理git变基撤销操作
 """
 
-import subprocess
-import os
 import sys
 
-def run_git_command(command):
-    """执行git命令"""
-    try:
-        result = subprocess.run(command, shell=True, capture_output=True, text=True, cwd='/Users/tangxiaojun/Downloads/Life')
-        return result.returncode, result.stdout, result.stderr
-    except Exception as e:
-        return -1, "", str(e)
+from git_state import GitState, format_reflog_entry
+
+REFLOG_PAGE_SIZE = 20
+
+
+def print_reflog_page(state, start, count):
+    """打印一页reflog，返回是否还有更多记录"""
+    entries = state.reflog().page(start, count)
+    for entry in entries:
+        print(format_reflog_entry(entry))
+    return state.reflog().has_more(start + count)
+
+
+def choose_reflog_target(state):
+    """分页浏览reflog并选择重置目标"""
+    start = 0
+    while True:
+        has_more = print_reflog_page(state, start, REFLOG_PAGE_SIZE)
+        if has_more:
+            prompt = "\n请输入要重置到的提交哈希（或reflog编号如HEAD@{2}，n 查看更多）: "
+        else:
+            prompt = "\n请输入要重置到的提交哈希（或reflog编号如HEAD@{2}）: "
+        answer = input(prompt).strip()
+        if answer.lower() == "n" and has_more:
+            start += REFLOG_PAGE_SIZE
+            print()
+            continue
+        return answer
+
+
+def reset_to(state, target):
+    """重置到目标提交"""
+    sha = state.resolve_target(target)
+    if sha is None:
+        print(f"❌ 无法解析：{target}")
+        return
+    changes = state.uncommitted_changes()
+    if changes:
+        print(f"\n⚠️  工作目录有 {len(changes)} 处未提交的更改，reset --hard 会全部丢弃：")
+        for line in changes:
+            print(f"  {line}")
+        if input("确认继续重置？(y/N): ").strip().lower() != "y":
+            print("👋 已取消")
+            return
+    print(f"\n🔄 重置到 {target} ({sha[:7]})...")
+    returncode, stdout, stderr = state.reset_hard(sha)
+    if returncode == 0:
+        print("✅ 成功重置")
+        print(stdout)
+    else:
+        print(f"❌ 重置失败：{stderr}")
+
 
 def main():
     print("🔧 Git变基撤销工具")
     print("=" * 50)
-    
+
     # 检查是否在git仓库中
-    returncode, stdout, stderr = run_git_command("git status")
-    if returncode != 0:
-        print("❌ 错误：不在git仓库中或git命令失败")
-        print(f"错误信息：{stderr}")
+    try:
+        state = GitState(sys.argv[1] if len(sys.argv) > 1 else None)
+    except FileNotFoundError as e:
+        print("❌ 错误：不在git仓库中")
+        print(f"错误信息：{e}")
         return
-    
-    print("✅ 成功连接到git仓库")
-    
+
+    print(f"✅ 成功连接到git仓库: {state.work_tree}")
+
     # 显示当前状态
     print("\n📊 当前git状态：")
-    returncode, stdout, stderr = run_git_command("git status --porcelain")
-    if returncode == 0:
-        if stdout.strip():
-            print("有未提交的更改：")
-            print(stdout)
-        else:
-            print("工作目录干净")
-    
+    if state.rebase_in_progress():
+        print("⚠️  有未完成的变基")
+    else:
+        print("没有进行中的变基")
+    changes = state.uncommitted_changes()
+    if changes:
+        print("有未提交的更改：")
+        print("\n".join(changes))
+    else:
+        print("工作目录干净")
+
     # 显示分支信息
     print("\n🌿 分支信息：")
-    returncode, stdout, stderr = run_git_command("git branch -v")
-    if returncode == 0:
-        print(stdout)
-    
+    current_branch, head_sha = state.head()
+    if current_branch is None:
+        print(f"* (分离HEAD) {state.describe(head_sha)}")
+    for name, sha in state.branches().items():
+        marker = "*" if name == current_branch else " "
+        print(f"{marker} {name} {state.describe(sha)}")
+
     # 显示reflog
     print("\n📝 最近的git操作历史：")
-    returncode, stdout, stderr = run_git_command("git reflog --oneline -10")
-    if returncode == 0:
-        print(stdout)
-    else:
-        print(f"无法获取reflog：{stderr}")
-    
+    print_reflog_page(state, 0, 10)
+
     # 检查ORIG_HEAD
     print("\n🔍 检查ORIG_HEAD：")
-    if os.path.exists('/Users/tangxiaojun/Downloads/Life/.git/ORIG_HEAD'):
-        returncode, stdout, stderr = run_git_command("git log --oneline ORIG_HEAD -1")
-        if returncode == 0:
-            print(f"ORIG_HEAD指向：{stdout.strip()}")
-        else:
-            print("无法读取ORIG_HEAD")
+    orig_head = state.orig_head()
+    if orig_head:
+        print(f"ORIG_HEAD指向：{state.describe(orig_head)}")
     else:
         print("ORIG_HEAD不存在")
-    
+
     print("\n🔄 撤销变基选项：")
     print("1. 使用ORIG_HEAD撤销变基")
     print("2. 使用reflog撤销变基")
     print("3. 手动指定提交哈希")
     print("4. 退出")
-    
+
     choice = input("\n请选择操作 (1-4): ").strip()
-    
+
     if choice == "1":
         # 使用ORIG_HEAD撤销
-        if os.path.exists('/Users/tangxiaojun/Downloads/Life/.git/ORIG_HEAD'):
+        if orig_head:
             print("\n🔄 使用ORIG_HEAD撤销变基...")
-            returncode, stdout, stderr = run_git_command("git reset --hard ORIG_HEAD")
-            if returncode == 0:
-                print("✅ 成功撤销变基")
-                print(stdout)
-            else:
-                print(f"❌ 撤销失败：{stderr}")
+            reset_to(state, "ORIG_HEAD")
         else:
             print("❌ ORIG_HEAD不存在，无法使用此方法")
-    
+
     elif choice == "2":
         # 使用reflog撤销
         print("\n📝 最近的reflog条目：")
-        returncode, stdout, stderr = run_git_command("git reflog --oneline -20")
-        if returncode == 0:
-            print(stdout)
-            commit_hash = input("\n请输入要重置到的提交哈希（或reflog编号如HEAD@{2}）: ").strip()
-            if commit_hash:
-                print(f"\n🔄 重置到 {commit_hash}...")
-                returncode, stdout, stderr = run_git_command(f"git reset --hard {commit_hash}")
-                if returncode == 0:
-                    print("✅ 成功重置")
-                    print(stdout)
-                else:
-                    print(f"❌ 重置失败：{stderr}")
-        else:
-            print(f"❌ 无法获取reflog：{stderr}")
-    
+        commit_hash = choose_reflog_target(state)
+        if commit_hash:
+            reset_to(state, commit_hash)
+
     elif choice == "3":
         # 手动指定提交哈希
         commit_hash = input("\n请输入要重置到的提交哈希: ").strip()
         if commit_hash:
-            print(f"\n🔄 重置到 {commit_hash}...")
-            returncode, stdout, stderr = run_git_command(f"git reset --hard {commit_hash}")
-            if returncode == 0:
-                print("✅ 成功重置")
-                print(stdout)
-            else:
-                print(f"❌ 重置失败：{stderr}")
-    
+            reset_to(state, commit_hash)
+
     elif choice == "4":
         print("👋 退出")
         return
-    
+
     else:
         print("❌ 无效选择")
         return
-    
+
     # 显示最终状态
     print("\n📊 最终状态：")
-    returncode, stdout, stderr = run_git_command("git status")
-    if returncode == 0:
-        print(stdout)
-    
+    branch, sha = state.head()
+    print(f"🌿 {branch or '(分离HEAD)'} {state.describe(sha)}")
+
     print("\n🎉 操作完成！")
 
 if __name__ == "__main__":
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 
 import os
+import shutil
 from PIL import Image
 
 def fix_app_icon_transparency():
@@ -18,9 +19,10 @@ def fix_app_icon_transparency():
         if os.path.exists(icon_path):
             print(f"🖼️ 处理 {icon_path}...")
             
-            # 备份原始文件
-            backup_path = icon_path.replace('.png', '_backup.png')
-            os.system(f"cp '{icon_path}' '{backup_path}'")
+            # 备份原始文件（放在 build/ 下，避免备份进入资源目录被打包和压缩）
+            backup_path = os.path.join("build", "icon_backups", icon_path.replace('.png', '_backup.png'))
+            os.makedirs(os.path.dirname(backup_path), exist_ok=True)
+            shutil.copy2(icon_path, backup_path)
             
             # 打开图像
             img = Image.open(icon_path)
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+大规模测试数据生成器
+按 Matter / MatterOption / MatterRecord 的结构和 TestDataManager 中的加权分布，
+生成多年、多事项的记录，分块流式写入 JSON Lines 或 SQLite，内存占用与数据量无关
+
+用法:
+    python3 generate_test_data.py --days 3650 --matters 50 --format sqlite --output test_data.sqlite
+    python3 generate_test_data.py --days 365 --format jsonl --output test_data.jsonl --seed 7
+
+相同的 --seed、--days、--matters 和 --end-date 生成完全相同的数据；每天的随机数只由种子和
+该天的下标决定，因此 --chunk-days 只影响内存占用，不影响内容。
+安装了 numpy 时使用向量化采样，否则回退到 random 模块（两者生成的数据不同）
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import sqlite3
+import argparse
+from datetime import date, datetime, timedelta, timezone
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Core Data 的时间基准（SwiftData 存储的日期为相对该时间的秒数）
+CORE_DATA_EPOCH = datetime(2001, 1, 1, tzinfo=timezone.utc)
+
+# 与 TestDataManager.createTestMatters 一致的测试事项
+# weights: (工作日权重, 周末权重)
+MATTER_TEMPLATES = [
+    {
+        "title": "心情", "icon": "heart.fill", "color": "#FF3B30",
+        "options": [("😢", "很糟糕"), ("😔", "不太好"), ("😐", "一般"), ("🙂", "还行"),
+                    ("😊", "还不错"), ("😄", "开心"), ("🤩", "非常开心")],
+        "weights": ([0.1, 0.15, 0.2, 0.2, 0.2, 0.1, 0.05], [0.05, 0.1, 0.15, 0.2, 0.25, 0.2, 0.05]),
+    },
+    {
+        "title": "睡眠", "icon": "moon.stars.fill", "color": "#5856D6",
+        "options": [("😴", "很差"), ("😪", "一般"), ("😌", "还行"), ("😊", "很好"), ("✨", "非常好")],
+        "weights": ([0.1, 0.2, 0.3, 0.25, 0.15], [0.05, 0.1, 0.2, 0.35, 0.3]),
+    },
+    {
+        "title": "工作效率", "icon": "briefcase.fill", "color": "#007AFF",
+        "options": [("😫", "很低"), ("😐", "一般"), ("🙂", "不错"), ("😊", "很好"), ("🚀", "高效")],
+        "weights": ([0.05, 0.15, 0.3, 0.35, 0.15], [0.3, 0.4, 0.2, 0.08, 0.02]),
+    },
+    {
+        "title": "运动强度", "icon": "figure.run", "color": "#FF9500",
+        "options": [("😴", "无运动"), ("🚶", "轻度"), ("🏃", "中度"), ("💪", "高强度"), ("🔥", "极限")],
+        "weights": ([0.2, 0.3, 0.25, 0.2, 0.05], [0.2, 0.3, 0.25, 0.2, 0.05]),
+    },
+    {
+        "title": "饮食质量", "icon": "fork.knife", "color": "#AF52DE",
+        "options": [("🍔", "不健康"), ("🍕", "一般"), ("🥗", "还行"), ("🥙", "健康"), ("🥑", "很健康")],
+        "weights": ([0.1, 0.2, 0.3, 0.3, 0.1], [0.1, 0.2, 0.3, 0.3, 0.1]),
+    },
+]
+
+DEFAULT_CHUNK_DAYS = 256
+
+
+def to_core_data_time(moment):
+    """datetime 转为 Core Data 时间戳（秒）"""
+    return (moment - CORE_DATA_EPOCH).total_seconds()
+
+
+def cumulative(weights):
+    """归一化后的累积权重"""
+    total = sum(weights)
+    result, acc = [], 0.0
+    for w in weights:
+        acc += w / total
+        result.append(acc)
+    result[-1] = 1.0
+    return result
+
+
+class TestDataGenerator:
+    """生成事项和记录"""
+
+    def __init__(self, matter_count=5, days=30, end_date=None, seed=42, chunk_days=DEFAULT_CHUNK_DAYS):
+        self.matter_count = matter_count
+        self.days = days
+        self.end_date = end_date or date.today()
+        self.start_date = self.end_date - timedelta(days=days - 1)
+        self.seed = seed
+        self.chunk_days = chunk_days
+        # 事项和 UUID 使用独立的随机源，保证与采样方式无关
+        self.id_random = random.Random(seed)
+        self.matters = self.create_matters()
+
+    def new_uuid(self):
+        """确定性的 UUID4"""
+        return uuid.UUID(int=self.id_random.getrandbits(128), version=4)
+
+    def create_matters(self):
+        """按模板生成事项，超过模板数量时循环使用并加序号"""
+        created_at = datetime.combine(self.start_date, datetime.min.time(), tzinfo=timezone.utc)
+        matters = []
+        for i in range(self.matter_count):
+            template = MATTER_TEMPLATES[i % len(MATTER_TEMPLATES)]
+            round_index = i // len(MATTER_TEMPLATES)
+            title = template["title"] if round_index == 0 else f"{template['title']} {round_index + 1}"
+            matters.append({
+                "id": self.new_uuid(),
+                "title": title,
+                "icon": template["icon"],
+                "type": "single",
+                "options": [{"id": self.new_uuid(), "emoji": emoji, "title": option_title}
+                            for emoji, option_title in template["options"]],
+                "accentColorHex": template["color"],
+                "isBuiltIn": False,
+                "isEnabled": True,
+                "order": i,
+                "createdAt": created_at,
+                "cumulative": (cumulative(template["weights"][0]), cumulative(template["weights"][1])),
+            })
+        return matters
+
+    def day_random(self, day_index):
+        """第 day_index 天（从 start_date 起算）的独立随机源，只由种子和该天的下标决定，与分块无关"""
+        if np is not None:
+            return np.random.default_rng([self.seed, day_index])
+        return random.Random(f"{self.seed}:{day_index}")
+
+    def sample_days(self, first_day, weekend):
+        """为连续若干天采样每个事项的选项下标和记录时间偏移，返回 ([天][事项] 下标, [天][事项] 秒)"""
+        count = len(self.matters)
+        if np is not None:
+            offsets = np.empty((len(weekend), count), dtype=np.int64)
+            draws = np.empty((len(weekend), count))
+            for i in range(len(weekend)):
+                sampler = self.day_random(first_day + i)
+                offsets[i] = sampler.integers(8 * 3600, 23 * 3600, size=count)
+                draws[i] = sampler.random(count)
+            # 按事项向量化查累积权重
+            weekend_mask = np.array(weekend)
+            indices = np.empty((len(weekend), count), dtype=np.int64)
+            for j, matter in enumerate(self.matters):
+                weekday_cum, weekend_cum = matter["cumulative"]
+                column = np.where(weekend_mask,
+                                  np.searchsorted(weekend_cum, draws[:, j], side="right"),
+                                  np.searchsorted(weekday_cum, draws[:, j], side="right"))
+                indices[:, j] = np.minimum(column, len(matter["options"]) - 1)
+            return indices.tolist(), offsets.tolist()
+
+        indices, offsets = [], []
+        for i, is_weekend in enumerate(weekend):
+            sampler = self.day_random(first_day + i)
+            offsets.append([sampler.randrange(8 * 3600, 23 * 3600) for _ in self.matters])
+            indices.append([sampler.choices(range(len(matter["options"])),
+                                            cum_weights=matter["cumulative"][1 if is_weekend else 0])[0]
+                            for matter in self.matters])
+        return indices, offsets
+
+    def iter_record_chunks(self):
+        """按日期分块生成记录，每块为 [记录字典, ...]"""
+        for chunk_start in range(0, self.days, self.chunk_days):
+            chunk_len = min(self.chunk_days, self.days - chunk_start)
+            days = [self.start_date + timedelta(days=chunk_start + i) for i in range(chunk_len)]
+            # 与 Swift 中 weekday == 1 || weekday == 7 一致（周日、周六）
+            weekend = [d.weekday() >= 5 for d in days]
+            per_day, offsets = self.sample_days(chunk_start, weekend)
+
+            records = []
+            for day_index, day in enumerate(days):
+                moment = datetime.combine(day, datetime.min.time(), tzinfo=timezone.utc)
+                for matter_index, matter in enumerate(self.matters):
+                    option = matter["options"][per_day[day_index][matter_index]]
+                    records.append({
+                        "id": self.new_uuid(),
+                        "matterId": matter["id"],
+                        "date": moment,
+                        "singleOptionId": option["id"],
+                        "selectedOptionIds": [],
+                        "createdAt": moment + timedelta(seconds=offsets[day_index][matter_index]),
+                    })
+            yield records
+
+
+class JSONLinesWriter:
+    """JSON Lines 输出：先写事项，再逐块写记录"""
+
+    def __init__(self, path):
+        self.file = open(path, "w", encoding="utf-8")
+
+    def write_matters(self, matters):
+        for matter in matters:
+            self.file.write(json.dumps({
+                "kind": "matter",
+                "id": str(matter["id"]),
+                "title": matter["title"],
+                "icon": matter["icon"],
+                "type": matter["type"],
+                "options": [{"id": str(o["id"]), "emoji": o["emoji"], "title": o["title"]}
+                            for o in matter["options"]],
+                "accentColorHex": matter["accentColorHex"],
+                "isBuiltIn": matter["isBuiltIn"],
+                "isEnabled": matter["isEnabled"],
+                "order": matter["order"],
+                "createdAt": matter["createdAt"].isoformat(),
+            }, ensure_ascii=False) + "\n")
+
+    def write_records(self, records):
+        self.file.write("".join(json.dumps({
+            "kind": "record",
+            "id": str(r["id"]),
+            "matterId": str(r["matterId"]),
+            "date": r["date"].isoformat(),
+            "singleOptionId": str(r["singleOptionId"]) if r["singleOptionId"] else None,
+            "selectedOptionIds": [str(i) for i in r["selectedOptionIds"]],
+            "createdAt": r["createdAt"].isoformat(),
+        }) + "\n" for r in records))
+
+    def close(self):
+        self.file.close()
+
+
+class SQLiteWriter:
+    """
+    SQLite 输出，采用 SwiftData（Core Data）存储的表结构约定：
+    表名 ZMATTER / ZMATTERRECORD，主键 Z_PK，UUID 存为16字节BLOB，
+    日期为相对2001-01-01的秒数，数组和子项存为JSON
+    """
+
+    def __init__(self, path):
+        if os.path.exists(path):
+            os.remove(path)
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=OFF")
+        self.connection.execute("PRAGMA synchronous=OFF")
+        self.connection.executescript("""
+            CREATE TABLE ZMATTER (
+                Z_PK INTEGER PRIMARY KEY, Z_ENT INTEGER, Z_OPT INTEGER,
+                ZID BLOB, ZTITLE VARCHAR, ZICON VARCHAR, ZTYPE VARCHAR, ZOPTIONS BLOB,
+                ZACCENTCOLORHEX VARCHAR, ZISBUILTIN INTEGER, ZISENABLED INTEGER,
+                ZORDER INTEGER, ZCREATEDAT TIMESTAMP
+            );
+            CREATE TABLE ZMATTERRECORD (
+                Z_PK INTEGER PRIMARY KEY, Z_ENT INTEGER, Z_OPT INTEGER,
+                ZID BLOB, ZMATTERID BLOB, ZDATE TIMESTAMP, ZSINGLEOPTIONID BLOB,
+                ZSELECTEDOPTIONIDS BLOB, ZCREATEDAT TIMESTAMP
+            );
+        """)
+
+    def write_matters(self, matters):
+        self.connection.executemany(
+            "INSERT INTO ZMATTER VALUES (?, 1, 1, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(m["order"] + 1, m["id"].bytes, m["title"], m["icon"], m["type"],
+              json.dumps([{"id": str(o["id"]), "emoji": o["emoji"], "title": o["title"]}
+                          for o in m["options"]], ensure_ascii=False).encode("utf-8"),
+              m["accentColorHex"], int(m["isBuiltIn"]), int(m["isEnabled"]), m["order"],
+              to_core_data_time(m["createdAt"])) for m in matters])
+        self.connection.commit()
+
+    def write_records(self, records):
+        self.connection.executemany(
+            "INSERT INTO ZMATTERRECORD (Z_ENT, Z_OPT, ZID, ZMATTERID, ZDATE, ZSINGLEOPTIONID, "
+            "ZSELECTEDOPTIONIDS, ZCREATEDAT) VALUES (2, 1, ?, ?, ?, ?, ?, ?)",
+            [(r["id"].bytes, r["matterId"].bytes, to_core_data_time(r["date"]),
+              r["singleOptionId"].bytes if r["singleOptionId"] else None,
+              json.dumps([str(i) for i in r["selectedOptionIds"]]).encode("utf-8"),
+              to_core_data_time(r["createdAt"])) for r in records])
+        self.connection.commit()
+
+    def close(self):
+        # 与 Core Data 一样在外键和日期上建索引，插入完成后再建更快
+        self.connection.execute("CREATE INDEX ZMATTERRECORD_ZMATTERID_INDEX ON ZMATTERRECORD (ZMATTERID, ZDATE)")
+        self.connection.commit()
+        self.connection.close()
+
+
+WRITERS = {"jsonl": JSONLinesWriter, "sqlite": SQLiteWriter}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成大规模 Matter/MatterRecord 测试数据")
+    parser.add_argument("--days", type=int, default=365, help="生成的天数")
+    parser.add_argument("--matters", type=int, default=len(MATTER_TEMPLATES), help="事项数量")
+    parser.add_argument("--end-date", default=None, help="最后一天 (YYYY-MM-DD)，默认今天")
+    parser.add_argument("--seed", type=int, default=42, help="随机种子")
+    parser.add_argument("--format", choices=sorted(WRITERS), default="jsonl", help="输出格式")
+    parser.add_argument("--output", default=None, help="输出文件，默认 test_data.<格式>")
+    parser.add_argument("--chunk-days", type=int, default=DEFAULT_CHUNK_DAYS, help="每块包含的天数")
+    args = parser.parse_args()
+
+    end_date = date.fromisoformat(args.end_date) if args.end_date else None
+    output = args.output or f"test_data.{args.format}"
+
+    generator = TestDataGenerator(matter_count=args.matters, days=args.days, end_date=end_date,
+                                  seed=args.seed, chunk_days=args.chunk_days)
+    total = args.days * args.matters
+    print(f"🧪 生成 {args.matters} 个事项 × {args.days} 天 = {total} 条记录")
+    print(f"   {generator.start_date} ~ {generator.end_date}，种子 {args.seed}，"
+          f"{'numpy 向量化采样' if np is not None else 'random 采样'}")
+
+    start = time.perf_counter()
+    writer = WRITERS[args.format](output)
+    try:
+        writer.write_matters(generator.matters)
+        written = 0
+        for records in generator.iter_record_chunks():
+            writer.write_records(records)
+            written += len(records)
+            print(f"\r   已写入 {written}/{total}", end="", flush=True)
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"\n✅ 已生成: {output} ({os.path.getsize(output) / 1024 / 1024:.1f}MB, "
+          f"{elapsed:.1f}s, {total / max(elapsed, 1e-9):.0f} 条/秒)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+进程内git状态读取库
+直接读取 .git 目录下的 HEAD、ORIG_HEAD、refs、packed-refs 和 reflog，
+无需为每次查询启动 git 子进程
+"""
+
+import os
+import sys
+import zlib
+from collections import namedtuple
+
+# reflog 条目: index 对应 HEAD@{index}
+ReflogEntry = namedtuple("ReflogEntry", ["index", "old", "new", "author", "timestamp", "tz", "message"])
+
+ZERO_SHA = "0" * 40
+HEX_DIGITS = set("0123456789abcdef")
+# .git 顶层只有这些文件是引用，其它（config、index、description 等）不能当作引用读取
+TOP_LEVEL_REFS = ("HEAD", "ORIG_HEAD")
+
+
+def find_git_dir(start=None):
+    """从 start 目录向上查找 .git，返回 (git_dir, work_tree)"""
+    path = os.path.abspath(start or os.getcwd())
+    while True:
+        candidate = os.path.join(path, ".git")
+        if os.path.isdir(candidate):
+            return candidate, path
+        if os.path.isfile(candidate):
+            # worktree/submodule 的 .git 文件: "gitdir: <path>"
+            with open(candidate, "r") as f:
+                content = f.read().strip()
+            if content.startswith("gitdir:"):
+                git_dir = content[len("gitdir:"):].strip()
+                if not os.path.isabs(git_dir):
+                    git_dir = os.path.normpath(os.path.join(path, git_dir))
+                return git_dir, path
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None, None
+        path = parent
+
+
+def is_sha(value):
+    """是否为完整的提交哈希（SHA-1 或 SHA-256）"""
+    return len(value) in (40, 64) and set(value) <= HEX_DIGITS
+
+
+def is_ref_name(name):
+    """是否为可以直接读取的引用名：HEAD、ORIG_HEAD 或 refs/ 下不含 .. 的路径"""
+    if name in TOP_LEVEL_REFS:
+        return True
+    parts = name.split("/")
+    return parts[0] == "refs" and len(parts) > 1 and all(part not in ("", ".", "..") for part in parts)
+
+
+class ReflogReader:
+    """从文件末尾向前惰性解析 reflog，已解析的条目会被缓存用于翻页"""
+
+    def __init__(self, path, block_size=8192):
+        self.path = path
+        self.block_size = block_size
+        self._entries = []
+        self._iterator = None
+        self._exhausted = False
+
+    def _reverse_lines(self):
+        """按块从文件末尾倒序读取各行"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            position = f.tell()
+            remainder = b""
+            while position > 0:
+                read_size = min(self.block_size, position)
+                position -= read_size
+                f.seek(position)
+                chunk = f.read(read_size) + remainder
+                lines = chunk.split(b"\n")
+                # 第一段可能是不完整的行，留到下一个块拼接
+                remainder = lines.pop(0)
+                for line in reversed(lines):
+                    if line:
+                        yield line
+            if remainder:
+                yield remainder
+
+    def _parse(self, index, raw):
+        """解析一行 reflog"""
+        line = raw.decode("utf-8", errors="replace")
+        header, _, message = line.partition("\t")
+        parts = header.split(" ")
+        old, new = parts[0], parts[1]
+        # 作者字段中可能包含空格，时间戳和时区固定在末尾
+        timestamp, tz = parts[-2], parts[-1]
+        author = " ".join(parts[2:-2])
+        try:
+            timestamp = int(timestamp)
+        except ValueError:
+            timestamp = 0
+        return ReflogEntry(index, old, new, author, timestamp, tz, message)
+
+    def _fill(self, count):
+        """确保至少解析了 count 条记录（或读完文件）"""
+        if self._iterator is None:
+            self._iterator = self._reverse_lines()
+        while len(self._entries) < count and not self._exhausted:
+            try:
+                raw = next(self._iterator)
+            except StopIteration:
+                self._exhausted = True
+                break
+            self._entries.append(self._parse(len(self._entries), raw))
+
+    def page(self, start=0, count=10):
+        """返回 HEAD@{start} 起的 count 条记录"""
+        self._fill(start + count)
+        return self._entries[start:start + count]
+
+    def get(self, index):
+        """返回 HEAD@{index}，不存在时返回 None"""
+        self._fill(index + 1)
+        if index < len(self._entries):
+            return self._entries[index]
+        return None
+
+    def has_more(self, start):
+        """检查 start 之后是否还有记录"""
+        self._fill(start + 1)
+        return start < len(self._entries)
+
+
+class GitState:
+    """git仓库状态读取器"""
+
+    def __init__(self, path=None):
+        self.git_dir, self.work_tree = find_git_dir(path)
+        if self.git_dir is None:
+            raise FileNotFoundError(f"不在git仓库中: {os.path.abspath(path or os.getcwd())}")
+        self.common_dir = self._read_common_dir()
+        self._packed_refs = None
+        self._reflogs = {}
+
+    def _read_common_dir(self):
+        """worktree 的共享目录（refs、objects 所在位置）"""
+        commondir_file = os.path.join(self.git_dir, "commondir")
+        if os.path.exists(commondir_file):
+            with open(commondir_file, "r") as f:
+                common = f.read().strip()
+            return os.path.normpath(os.path.join(self.git_dir, common))
+        return self.git_dir
+
+    def _read_file(self, *parts):
+        """读取 git 目录中的文本文件，不存在时返回 None"""
+        for base in (self.git_dir, self.common_dir):
+            path = os.path.join(base, *parts)
+            if os.path.isfile(path):
+                try:
+                    with open(path, "r") as f:
+                        return f.read().strip()
+                except UnicodeDecodeError:
+                    return None
+        return None
+
+    def packed_refs(self):
+        """解析 packed-refs（只读取一次）"""
+        if self._packed_refs is None:
+            self._packed_refs = {}
+            content = self._read_file("packed-refs")
+            if content:
+                for line in content.splitlines():
+                    if not line or line.startswith("#") or line.startswith("^"):
+                        continue
+                    sha, _, name = line.partition(" ")
+                    self._packed_refs[name.strip()] = sha
+        return self._packed_refs
+
+    def resolve_ref(self, name, depth=0):
+        """解析引用名（HEAD、ORIG_HEAD 或 refs/ 下的名字）为提交哈希，支持符号引用"""
+        if depth > 5 or not is_ref_name(name):
+            return None
+        value = self._read_file(*name.split("/"))
+        if value is None:
+            value = self.packed_refs().get(name)
+        if value is None:
+            return None
+        if value.startswith("ref:"):
+            return self.resolve_ref(value[4:].strip(), depth + 1)
+        return value if is_sha(value) else None
+
+    def head(self):
+        """返回 (分支名或None, 提交哈希)"""
+        value = self._read_file("HEAD")
+        if value and value.startswith("ref:"):
+            ref = value[4:].strip()
+            branch = ref[len("refs/heads/"):] if ref.startswith("refs/heads/") else ref
+            return branch, self.resolve_ref(ref)
+        return None, value
+
+    def orig_head(self):
+        """返回 ORIG_HEAD 指向的提交，不存在时返回 None"""
+        return self._read_file("ORIG_HEAD")
+
+    def branches(self):
+        """列出本地分支 {名称: 提交哈希}"""
+        result = {}
+        for name, sha in self.packed_refs().items():
+            if name.startswith("refs/heads/"):
+                result[name[len("refs/heads/"):]] = sha
+        heads_dir = os.path.join(self.common_dir, "refs", "heads")
+        for root, _, files in os.walk(heads_dir):
+            for filename in files:
+                path = os.path.join(root, filename)
+                name = os.path.relpath(path, heads_dir).replace(os.sep, "/")
+                with open(path, "r") as f:
+                    result[name] = f.read().strip()
+        return dict(sorted(result.items()))
+
+    def rebase_in_progress(self):
+        """检查是否有未完成的变基"""
+        return any(os.path.isdir(os.path.join(self.git_dir, d)) for d in ("rebase-merge", "rebase-apply"))
+
+    def reflog(self, ref="HEAD"):
+        """返回指定引用的 reflog 读取器（同一引用复用缓存）"""
+        if ref not in self._reflogs:
+            base = self.git_dir if ref == "HEAD" else self.common_dir
+            self._reflogs[ref] = ReflogReader(os.path.join(base, "logs", *ref.split("/")))
+        return self._reflogs[ref]
+
+    def commit_subject(self, sha):
+        """读取松散对象中的提交标题，打包对象返回 None"""
+        if not sha or len(sha) != 40:
+            return None
+        path = os.path.join(self.common_dir, "objects", sha[:2], sha[2:])
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "rb") as f:
+                data = zlib.decompress(f.read())
+        except (OSError, zlib.error):
+            return None
+        _, _, body = data.partition(b"\x00")
+        _, _, message = body.partition(b"\n\n")
+        lines = message.decode("utf-8", errors="replace").strip().splitlines()
+        return lines[0] if lines else ""
+
+    def describe(self, sha):
+        """生成 "短哈希 标题" 形式的单行描述"""
+        if not sha:
+            return "(无)"
+        subject = self.commit_subject(sha)
+        if subject is None:
+            # 打包对象：尝试从 reflog 的提交记录中找到对应的标题
+            for entry in self.reflog().page(0, 50):
+                if entry.new == sha and entry.message.startswith("commit"):
+                    subject = entry.message.partition(": ")[2]
+                    break
+        return f"{sha[:7]} {subject}" if subject else sha[:7]
+
+    def resolve_target(self, target):
+        """解析重置目标：HEAD@{n}、ORIG_HEAD、分支名或哈希"""
+        target = target.strip()
+        if target.startswith("HEAD@{") and target.endswith("}"):
+            try:
+                entry = self.reflog().get(int(target[6:-1]))
+            except ValueError:
+                return None
+            return entry.new if entry else None
+        if target == "ORIG_HEAD":
+            return self.orig_head()
+        for name in (target, f"refs/heads/{target}", f"refs/tags/{target}"):
+            # resolve_ref 只接受 HEAD 和 refs/ 下的名字，分支名不会被当作 .git 中的文件读取
+            sha = self.resolve_ref(name)
+            if sha:
+                return sha
+        # 原样交给 git 解析（短哈希等）
+        return target
+
+    def uncommitted_changes(self):
+        """git status --porcelain 的输出行；比较索引和工作区需要 git 本身，因此启动一次 git"""
+        import subprocess
+        result = subprocess.run(["git", "status", "--porcelain"],
+                                capture_output=True, text=True, cwd=self.work_tree)
+        return [line for line in result.stdout.splitlines() if line.strip()]
+
+    def reset_hard(self, target):
+        """执行 git reset --hard（会丢弃未提交的更改）"""
+        import subprocess
+        result = subprocess.run(["git", "reset", "--hard", target],
+                                capture_output=True, text=True, cwd=self.work_tree)
+        return result.returncode, result.stdout, result.stderr
+
+
+def format_reflog_entry(entry):
+    """按 git reflog --oneline 的格式输出"""
+    return f"{entry.new[:7]} HEAD@{{{entry.index}}}: {entry.message}"
+
+
+def main():
+    state = GitState(sys.argv[1] if len(sys.argv) > 1 else None)
+    branch, sha = state.head()
+    print(f"📁 仓库: {state.work_tree}")
+    print(f"🌿 当前分支: {branch or '(分离HEAD)'} {state.describe(sha)}")
+    print(f"🔍 ORIG_HEAD: {state.describe(state.orig_head())}")
+    print("\n📝 最近的git操作历史：")
+    for entry in state.reflog().page(0, 10):
+        print(format_reflog_entry(entry))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+截屏布局引擎
+用行、列、内边距、对齐和文字固有尺寸描述界面，一次求解出所有元素的矩形；
+结果按 (场景, 尺寸, 内容) 缓存，绘制时只需按键取出矩形。
+空间不足时固定尺寸的子元素按比例缩小、文字缩小字号，因此任何尺寸都不会溢出父容器
+"""
+
+from collections import namedtuple
+
+# 求解结果：位置和尺寸（像素，整数），文字节点另有适配后的字号
+Frame = namedtuple("Frame", "x y width height font_size")
+
+
+def normalize_padding(padding):
+    """内边距 → (左, 上, 右, 下)；支持单个数值、(水平, 垂直) 和四元组"""
+    if isinstance(padding, (int, float)):
+        return (padding,) * 4
+    if len(padding) == 2:
+        return (padding[0], padding[1], padding[0], padding[1])
+    return tuple(padding)
+
+
+class Node:
+    """
+    布局节点
+    width/height: 固定尺寸；width_ratio/height_ratio: 占父容器可用空间的比例
+    flex: 分配剩余空间的权重；aspect: 宽高比，在分配到的空间内等比适配并居中
+    align: 在父容器交叉轴上的对齐方式（start/center/end/stretch），默认跟随父容器
+    children: 叠放的子节点（与父节点同一区域，按 align 对齐）
+    """
+
+    def __init__(self, key=None, width=None, height=None, width_ratio=None, height_ratio=None,
+                 flex=0, aspect=None, padding=0, align=None, children=None):
+        self.key = key
+        self.width = width
+        self.height = height
+        self.width_ratio = width_ratio
+        self.height_ratio = height_ratio
+        self.flex = flex
+        self.aspect = aspect
+        self.padding = normalize_padding(padding)
+        self.align = align
+        self.children = [child for child in (children or []) if child is not None]
+
+    def preferred(self, axis, available):
+        """主动指定的尺寸（固定值或比例），没有时返回 None"""
+        fixed = self.width if axis == 0 else self.height
+        if fixed is not None:
+            return fixed
+        ratio = self.width_ratio if axis == 0 else self.height_ratio
+        if ratio is not None:
+            return available * ratio
+        return None
+
+    def content_size(self, measure):
+        """不含内边距的内容固有尺寸"""
+        sizes = [child.intrinsic(measure) for child in self.children]
+        return (max((w for w, _ in sizes), default=0), max((h for _, h in sizes), default=0))
+
+    def intrinsic(self, measure):
+        """固有尺寸：主动指定的尺寸优先，否则为内容尺寸加内边距"""
+        left, top, right, bottom = self.padding
+        width, height = self.content_size(measure)
+        return (self.width if self.width is not None else width + left + right,
+                self.height if self.height is not None else height + top + bottom)
+
+    def max_main(self, axis, cross):
+        """按宽高比在主轴上最多需要的尺寸（用于限制弹性分配）"""
+        if self.aspect is None:
+            return None
+        return cross * self.aspect if axis == 0 else cross / self.aspect
+
+    def place(self, x, y, width, height, measure, out):
+        """在给定矩形内放置自身和子节点，结果写入 out"""
+        if self.aspect is not None:
+            fitted_w = min(width, height * self.aspect)
+            fitted_h = fitted_w / self.aspect
+            x += (width - fitted_w) / 2
+            y += (height - fitted_h) / 2
+            width, height = fitted_w, fitted_h
+        self.record(x, y, width, height, measure, out)
+
+        left, top, right, bottom = self.padding
+        inner = (x + left, y + top, max(width - left - right, 0), max(height - top - bottom, 0))
+        self.place_children(inner, measure, out)
+
+    def record(self, x, y, width, height, measure, out):
+        if self.key is not None:
+            out[self.key] = Frame(round(x), round(y), round(width), round(height), None)
+
+    def place_children(self, inner, measure, out):
+        x, y, width, height = inner
+        for child in self.children:
+            align = child.align or "center"
+            child_w = self.cross_size(child, 0, width, align, measure)
+            child_h = self.cross_size(child, 1, height, align, measure)
+            child.place(x + align_offset(align, width - child_w), y + align_offset(align, height - child_h),
+                        child_w, child_h, measure, out)
+
+    @staticmethod
+    def cross_size(child, axis, available, align, measure):
+        size = child.preferred(axis, available)
+        if size is None:
+            size = available if align == "stretch" or child.aspect is not None \
+                else child.intrinsic(measure)[axis]
+        return min(size, available)
+
+
+def align_offset(align, free):
+    if align == "center":
+        return free / 2
+    if align == "end":
+        return free
+    return 0
+
+
+class Stack(Node):
+    """沿一个方向排列子节点；axis 0 为行，1 为列"""
+
+    axis = 0
+
+    def __init__(self, children, spacing=0, justify="start", stack_align="stretch", **kwargs):
+        super().__init__(children=children, **kwargs)
+        self.spacing = spacing
+        self.justify = justify
+        self.stack_align = stack_align
+
+    def content_size(self, measure):
+        sizes = [child.intrinsic(measure) for child in self.children]
+        main = sum(size[self.axis] for size in sizes) + self.spacing * max(len(sizes) - 1, 0)
+        cross = max((size[1 - self.axis] for size in sizes), default=0)
+        return (main, cross) if self.axis == 0 else (cross, main)
+
+    def place_children(self, inner, measure, out):
+        axis = self.axis
+        x, y, width, height = inner
+        main_available = (width, height)[axis]
+        cross_available = (width, height)[1 - axis]
+        children = self.children
+        spacing_total = self.spacing * max(len(children) - 1, 0)
+
+        # 固定尺寸（或固有尺寸）的子节点先占位，放不下时按比例缩小
+        sizes = []
+        for child in children:
+            size = child.preferred(axis, main_available)
+            if size is None and not child.flex:
+                size = child.intrinsic(measure)[axis]
+            sizes.append(None if child.flex else size)
+        fixed_total = sum(size for size in sizes if size is not None)
+        free = main_available - spacing_total - fixed_total
+        if free < 0:
+            shrink = max(main_available - spacing_total, 0) / fixed_total if fixed_total else 0
+            sizes = [None if size is None else size * shrink for size in sizes]
+            free = 0
+
+        # 弹性子节点按权重分配剩余空间，有宽高比的子节点不超过等比需要的尺寸
+        flexible = [i for i, child in enumerate(children) if child.flex]
+        remaining = free
+        while flexible:
+            weights = sum(children[i].flex for i in flexible)
+            capped = []
+            for i in flexible:
+                child = children[i]
+                cross = child.preferred(1 - axis, cross_available) or cross_available
+                limit = child.max_main(axis, min(cross, cross_available))
+                if limit is not None and limit < remaining * child.flex / weights:
+                    sizes[i] = limit
+                    capped.append(i)
+            if not capped:
+                for i in flexible:
+                    sizes[i] = remaining * children[i].flex / weights
+                remaining = 0
+                break
+            remaining -= sum(sizes[i] for i in capped)
+            flexible = [i for i in flexible if i not in capped]
+
+        gap = self.spacing
+        offset = 0
+        if remaining > 0:
+            if self.justify == "center":
+                offset = remaining / 2
+            elif self.justify == "end":
+                offset = remaining
+            elif self.justify == "space-between" and len(children) > 1:
+                gap += remaining / (len(children) - 1)
+
+        position = (x, y)[axis] + offset
+        cross_origin = (x, y)[1 - axis]
+        for child, size in zip(children, sizes):
+            align = child.align or self.stack_align
+            cross = self.cross_size(child, 1 - axis, cross_available, align, measure)
+            cross_position = cross_origin + align_offset(align, cross_available - cross)
+            if axis == 0:
+                child.place(position, cross_position, size, cross, measure, out)
+            else:
+                child.place(cross_position, position, cross, size, measure, out)
+            position += size + gap
+
+
+class Row(Stack):
+    axis = 0
+
+
+class Column(Stack):
+    axis = 1
+
+
+class Text(Node):
+    """单行文字：固有尺寸由字体测量；宽度不够时缩小字号（不小于 min_font_size）"""
+
+    def __init__(self, key, text, font_size, min_font_size=8, **kwargs):
+        super().__init__(key=key, **kwargs)
+        self.text = text
+        self.font_size = font_size
+        self.min_font_size = min_font_size
+
+    def content_size(self, measure):
+        return measure(self.text, self.font_size)
+
+    def record(self, x, y, width, height, measure, out):
+        font_size = self.font_size
+        text_width = measure(self.text, font_size)[0]
+        if text_width > width > 0:
+            font_size = max(int(font_size * width / text_width), self.min_font_size)
+        out[self.key] = Frame(round(x), round(y), round(width), round(height), font_size)
+
+
+class Spacer(Node):
+    """占位：固定尺寸或弹性空白"""
+
+    def __init__(self, size=None, flex=0):
+        super().__init__(width=size, height=size, flex=flex if size is None else 0)
+
+
+def solve(root, size, measure):
+    """求解整棵布局树，返回 {键: Frame}"""
+    out = {}
+    root.place(0, 0, size[0], size[1], measure, out)
+    return out
+
+
+class LayoutCache:
+    """按 (场景, 尺寸, 内容签名) 缓存求解结果，命中时不再构建布局树"""
+
+    def __init__(self, store=None):
+        # store 为提供 get 和下标赋值的映射，常驻服务传入有上限的缓存
+        self._layouts = {} if store is None else store
+        self.stats = {"hits": 0, "misses": 0}
+
+    def get(self, key, size, build, measure):
+        """build() 返回布局树，只在未命中时调用"""
+        cache_key = (key, tuple(size))
+        layout = self._layouts.get(cache_key)
+        if layout is None:
+            self.stats["misses"] += 1
+            layout = solve(build(), size, measure)
+            self._layouts[cache_key] = layout
+        else:
+            self.stats["hits"] += 1
+        return layout
+
+    def clear(self):
+        self._layouts.clear()
+
+
+def phone_scene(content, is_landscape, status_text=None, status_font_size=16):
+    """
+    截屏的公共结构：画布中居中的手机（竖屏宽高比 0.5，横屏 1/0.55）、15px 边框、
+    屏幕顶部 40px 状态栏，content 为状态栏下方的界面
+    键: phone, screen, status, status_time
+    """
+    if is_landscape:
+        phone = dict(aspect=1 / 0.55, width_ratio=0.7, height_ratio=0.495)
+    else:
+        phone = dict(aspect=0.5, width_ratio=0.25, height_ratio=0.8)
+    status = Row([Text("status_time", status_text, status_font_size)] if status_text else [],
+                 key="status", height=40, padding=(0, 0, 20, 0), justify="end", stack_align="center")
+    screen = Column([status, content], key="screen", align="stretch")
+    return Node(children=[Node(key="phone", padding=15, children=[screen], **phone)])
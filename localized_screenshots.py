@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+多语言截屏矩阵生成器
+每个 (尺寸, 截屏类型) 只渲染一次不含文字的基础图层，并记录文字操作；
+各语言按自己的文案重新求解布局，复制基础图层后在新的文字框中重放文字（从右到左的语言镜像对齐），
+文案、字体和排版方向取自 locales/ 下的语言包；文案改变了非文字元素的位置时该语言单独渲染基础图层
+"""
+
+import os
+import json
+import time
+import argparse
+
+from PIL import features
+
+from create_real_image_app_store_images import (
+    PROJECT_ROOT, FONT_CANDIDATES, LocalizedText, RealImageAppStoreGenerator, peak_rss_mb)
+
+LOCALES_DIR = os.path.join(PROJECT_ROOT, "locales")
+SCREENSHOT_TYPES = ["home", "feature", "widget"]
+
+
+def available_locales(locales_dir=LOCALES_DIR):
+    """列出语言包目录中的所有语言"""
+    return sorted(os.path.splitext(name)[0] for name in os.listdir(locales_dir)
+                  if name.endswith(".json"))
+
+
+def load_locale(code, locales_dir=LOCALES_DIR):
+    """读取语言包 locales/<code>.json"""
+    path = os.path.join(locales_dir, f"{code}.json")
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"找不到语言包: {path}")
+    with open(path, "r", encoding="utf-8") as f:
+        bundle = json.load(f)
+    bundle.setdefault("locale", code)
+    bundle.setdefault("direction", "ltr")
+    bundle.setdefault("fonts", [])
+    bundle.setdefault("app_info", {})
+    bundle.setdefault("strings", {})
+    return bundle
+
+
+class LocalizedScreenshotRenderer:
+    """基础图层按 (尺寸, 类型) 渲染一次，文字按语言逐个叠加"""
+
+    def __init__(self, generator, images):
+        self.generator = generator
+        self.images = images
+        self.base_app_info = generator.app_info
+        self.base_ui_strings = generator.ui_strings
+        # 复杂文字排版（阿拉伯语连写、从右到左）依赖 libraqm
+        self.has_raqm = features.check("raqm")
+        self.direction = "ltr"
+
+    def render_base(self, size, screenshot_type):
+        """渲染不含文字的基础图层，返回 (图片, 文字操作列表)"""
+        generator = self.generator
+        generator._text_ops = []
+        try:
+            image = generator.create_app_screenshot(size, self.images, screenshot_type)
+            ops = generator._text_ops
+        finally:
+            generator._text_ops = None
+        return image, ops
+
+    def apply_locale(self, bundle):
+        """把语言包的文案、字体和排版参数设置到生成器上，缺失的文案保留原文"""
+        generator = self.generator
+        app_info = dict(self.base_app_info)
+        for key in ("name", "subtitle", "description"):
+            if key in bundle["app_info"]:
+                app_info[key] = bundle["app_info"][key]
+        localized_features = bundle["app_info"].get("features", [])
+        app_info["features"] = [
+            {**feature, **(localized_features[i] if i < len(localized_features) else {})}
+            for i, feature in enumerate(self.base_app_info["features"])
+        ]
+        generator.app_info = app_info
+        generator.ui_strings = {**self.base_ui_strings, **bundle["strings"]}
+        generator.font_candidates = bundle["fonts"] + FONT_CANDIDATES
+        self.direction = bundle["direction"]
+
+        generator.text_options = {}
+        if self.has_raqm:
+            generator.text_options["direction"] = bundle["direction"]
+            if bundle.get("language"):
+                generator.text_options["language"] = bundle["language"]
+
+    def restore(self):
+        """恢复生成器的默认文案和字体"""
+        generator = self.generator
+        generator.app_info = self.base_app_info
+        generator.ui_strings = self.base_ui_strings
+        generator.font_candidates = FONT_CANDIDATES
+        generator.text_options = {}
+        self.direction = "ltr"
+
+    @staticmethod
+    def same_geometry(layout, other):
+        """两个布局中非文字元素（卡片、图标、图表）的位置是否相同，相同时可以共用基础图层"""
+        return all(other.get(key) == frame for key, frame in layout.items() if frame.font_size is None)
+
+    def render_text(self, base, ops, layout):
+        """在基础图层的副本上重放文字操作：文案取当前语言，按框绘制的文字改用该语言布局中的框"""
+        generator = self.generator
+        mirror = {"left": "right", "right": "left"} if self.direction == "rtl" else {}
+        image = base.copy()
+        for op in ops:
+            text = op.text
+            if isinstance(text, LocalizedText):
+                text = generator.text(text.key)
+            position, font_size, box_width = op.position, op.font_size, op.box_width
+            if op.frame_key is not None:
+                frame = layout[op.frame_key]
+                position, font_size, box_width = (frame.x, frame.y), frame.font_size, frame.width
+            generator.add_text(image, text, position, font_size, op.color, op.max_width,
+                               mirror.get(op.align, op.align), box_width)
+        return image
+
+    def render_locale(self, base, ops, base_layout, size, screenshot_type):
+        """按当前语言生成一张截屏"""
+        layout = self.generator.solve_layout(screenshot_type, size, self.images)
+        if not self.same_geometry(base_layout, layout):
+            base, ops = self.render_base(size, screenshot_type)
+        return self.render_text(base, ops, layout)
+
+    def generate(self, bundles, sizes, output_path):
+        """生成 语言 × 尺寸 × 类型 的截屏矩阵，返回耗时统计"""
+        timings = {"base": 0.0, "text": 0.0, "save": 0.0, "count": 0}
+        for bundle in bundles:
+            os.makedirs(os.path.join(output_path, bundle["locale"]), exist_ok=True)
+
+        try:
+            for size_name, size in sizes.items():
+                print(f"生成尺寸: {size_name} ({size[0]}x{size[1]})")
+                for i, screenshot_type in enumerate(SCREENSHOT_TYPES):
+                    start = time.perf_counter()
+                    base, ops = self.render_base(size, screenshot_type)
+                    base_layout = self.generator.solve_layout(screenshot_type, size, self.images)
+                    timings["base"] += time.perf_counter() - start
+
+                    filename = f"{size_name}_{screenshot_type}_{i+1}.png"
+                    for bundle in bundles:
+                        start = time.perf_counter()
+                        self.apply_locale(bundle)
+                        screenshot = self.render_locale(base, ops, base_layout, size, screenshot_type)
+                        timings["text"] += time.perf_counter() - start
+
+                        start = time.perf_counter()
+                        screenshot.save(os.path.join(output_path, bundle["locale"], filename), "PNG")
+                        timings["save"] += time.perf_counter() - start
+                        timings["count"] += 1
+                    print(f"  保存: {filename} × {len(bundles)} 种语言")
+                if self.generator.low_memory:
+                    self.generator.release_buffers()
+        finally:
+            self.restore()
+        return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成多语言App Store截屏矩阵")
+    parser.add_argument("--locales", help="逗号分隔的语言列表，默认为 locales/ 下的全部语言")
+    parser.add_argument("--output", help="输出目录，默认为 AppStoreImages，每种语言一个子目录")
+    parser.add_argument("--sizes", help="逗号分隔的尺寸名称，默认全部尺寸")
+    parser.add_argument("--low-memory", action="store_true", help="低内存模式：每个尺寸渲染完后释放缓存")
+    args = parser.parse_args()
+
+    codes = args.locales.split(",") if args.locales else available_locales()
+    bundles = [load_locale(code.strip()) for code in codes if code.strip()]
+
+    generator = RealImageAppStoreGenerator(output_path=args.output, low_memory=args.low_memory)
+    sizes = generator.sizes
+    if args.sizes:
+        names = [name.strip() for name in args.sizes.split(",")]
+        unknown = [name for name in names if name not in sizes]
+        if unknown:
+            parser.error(f"未知尺寸: {', '.join(unknown)}，可选: {', '.join(sizes)}")
+        sizes = {name: sizes[name] for name in names}
+
+    images = generator.load_real_images()
+    print(f"成功加载了 {len(images)} 张真实图片")
+    print(f"🌐 语言: {', '.join(bundle['locale'] for bundle in bundles)}")
+
+    renderer = LocalizedScreenshotRenderer(generator, images)
+    if not renderer.has_raqm and any(bundle["direction"] != "ltr" for bundle in bundles):
+        print("⚠️  PIL 未启用 libraqm，从右到左的文字不会被正确连写和排序")
+
+    start = time.perf_counter()
+    timings = renderer.generate(bundles, sizes, generator.output_path)
+    total = time.perf_counter() - start
+
+    base_count = len(sizes) * len(SCREENSHOT_TYPES)
+    print(f"\n所有图片已生成到: {generator.output_path}")
+    print(f"⏱️  共 {timings['count']} 张截屏，耗时 {total:.2f}s")
+    print(f"  基础图层: {base_count} 次，{timings['base']:.2f}s")
+    print(f"  文字叠加: {timings['count']} 次，{timings['text']:.2f}s")
+    print(f"  PNG 编码: {timings['save']:.2f}s")
+
+    own_rss, _ = peak_rss_mb()
+    if own_rss is not None:
+        print(f"📈 峰值内存: {own_rss:.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
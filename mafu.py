@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+马夫项目工具统一入口
+用法: python3 mafu.py <子命令> [参数...]
+
+各子命令对应的模块只在执行该子命令时才导入，
+因此 lint、git-recover 等轻量命令不会加载 PIL 等重量级依赖
+"""
+
+import os
+import sys
+
+# 项目根目录（脚本所在目录）
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# 子命令 -> (模块名, 入口函数, 说明)
+# 入口函数无参数，子命令的其余参数通过 sys.argv 传给模块自行解析
+COMMANDS = {
+    "screenshots": ("create_real_image_app_store_images", "main", "生成App Store截屏（基于真实图片）"),
+    "icon": ("create_new_icon", "replace_app_icons", "生成新的应用图标"),
+    "alt-icons": ("app_icon_engine", "main", "按 AppIconDesign 批量渲染备用图标（浅色/深色）"),
+    "emoji-atlas": ("emoji_atlas", "main", "构建截屏文字用的彩色emoji图集并预览"),
+    "optimize-assets": ("png_optimizer", "main", "资源目录PNG无损压缩（像素校验 + 内容哈希缓存）"),
+    "fix-alpha": ("fix_icon_python", "fix_app_icon_transparency", "去除应用图标的alpha通道"),
+    "lint": ("manual_swift_check", "main", "手动检查Swift常见错误"),
+    "parse": ("check_swift_errors", "main", "使用swiftc检查Swift语法"),
+    "targets": ("pbxproj_index", "main", "查询project.pbxproj中的target成员、孤立文件和重复引用"),
+    "typecheck-cost": ("swift_typecheck_cost", "main", "静态预测SwiftUI声明的类型检查耗时并排名"),
+    "git-recover": ("fix_git_rebase", "main", "撤销git变基"),
+    "release": ("release_pipeline", "main", "按依赖关系并发执行发布流水线（输入无变化的步骤跳过）"),
+    "render-server": ("render_server", "main", "启动常驻截屏渲染服务"),
+    "themes": ("theme_variants", "main", "查找表换色生成深色/季节主题截屏"),
+    "promo": ("tiled_renderer", "main", "分块流式渲染8K/16K宣传图"),
+    "frame-captures": ("capture_framer", "main", "模拟器真实截屏批量套设备边框并加文案"),
+    "validate": ("png_validator", "main", "校验截屏和图标是否符合App Store要求"),
+    "upload-screenshots": ("screenshot_uploader", "main", "并发上传截屏到App Store Connect（支持断点续传）"),
+    "mock-asc": ("mock_app_store_connect", "main", "启动本地App Store Connect截屏接口模拟服务"),
+    "mock-weather": ("mock_openweather", "main", "启动本地 OpenWeather 天气接口替身服务"),
+    "visual-diff": ("visual_diff", "main", "分块对比两次截屏生成结果的视觉差异"),
+    "startup-check": ("mafu", "startup_check", "用 -X importtime 测量各子命令的冷启动耗时"),
+}
+
+# 轻量子命令：冷启动预算（毫秒）以及不允许导入的模块
+LIGHT_COMMANDS = ["lint", "parse", "typecheck-cost", "targets", "git-recover", "validate"]
+STARTUP_BUDGET_MS = 50
+HEAVY_MODULES = ["PIL", "numpy"]
+
+
+def load_command(name):
+    """导入子命令所在模块并返回入口函数"""
+    import importlib
+
+    module_name, function_name, _ = COMMANDS[name]
+    if PROJECT_ROOT not in sys.path:
+        sys.path.insert(0, PROJECT_ROOT)
+    module = importlib.import_module(module_name)
+    return getattr(module, function_name)
+
+
+def split_profile_args(args):
+    """
+    取出所有子命令通用的性能分析参数：--profile[=sampling|cprofile]、--profile-interval[=]毫秒
+    返回 (其余参数, 分析器参数或 None)；间隔不是正数时抛出 ValueError
+    """
+    rest = []
+    profile = None
+    interval = None
+    args = iter(args)
+    for arg in args:
+        if arg == "--profile" or arg.startswith("--profile="):
+            profile = {"mode": arg.partition("=")[2] or "auto"}
+        elif arg == "--profile-interval" or arg.startswith("--profile-interval="):
+            value = arg.partition("=")[2] if "=" in arg else next(args, "")
+            try:
+                interval = float(value)
+            except ValueError:
+                interval = None
+            if interval is None or not 0 < interval < float("inf"):
+                raise ValueError(f"无效的采样间隔: {value!r}（应为大于0的毫秒数）")
+        else:
+            rest.append(arg)
+    if profile is not None and interval is not None:
+        profile["interval_ms"] = interval
+    return rest, profile
+
+
+def print_usage():
+    """打印用法"""
+    print("用法: python3 mafu.py <子命令> [参数...]")
+    print("所有子命令都支持 --profile[=cprofile]：采样分析耗时并导出火焰图到 build/profiles")
+    print("\n可用子命令:")
+    width = max(len(name) for name in COMMANDS)
+    for name, (_, _, description) in COMMANDS.items():
+        print(f"  {name.ljust(width)}  {description}")
+
+
+def measure_import(command):
+    """在新进程中以 -X importtime 导入子命令，返回 (总耗时毫秒, 导入的顶层模块集合)"""
+    import subprocess
+
+    code = f"import sys; sys.path.insert(0, {PROJECT_ROOT!r}); import mafu; mafu.load_command({command!r})"
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            capture_output=True, text=True, cwd=PROJECT_ROOT)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "导入失败")
+
+    total_us = 0
+    modules = set()
+    for line in result.stderr.splitlines():
+        # 格式: "import time: self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3:
+            continue
+        total_us += int(fields[0].strip())
+        modules.add(fields[2].strip().split(".")[0])
+    return total_us / 1000, modules
+
+
+def startup_check():
+    """检查轻量子命令的冷启动时间和依赖"""
+    print("⏱️  子命令冷启动检查 (-X importtime)")
+    print("=" * 40)
+
+    all_good = True
+    for command in COMMANDS:
+        if command == "startup-check":
+            continue
+        try:
+            import_ms, modules = measure_import(command)
+        except RuntimeError as e:
+            print(f"⚠️  {command}: 无法导入 ({e})")
+            if command in LIGHT_COMMANDS:
+                all_good = False
+            continue
+
+        heavy = sorted(m for m in HEAVY_MODULES if m in modules)
+        line = f"{command}: {import_ms:.1f}ms"
+        if heavy:
+            line += f" (导入了 {', '.join(heavy)})"
+
+        if command in LIGHT_COMMANDS and (heavy or import_ms > STARTUP_BUDGET_MS):
+            print(f"❌ {line}，超出轻量命令预算 {STARTUP_BUDGET_MS}ms / 不允许导入重量级模块")
+            all_good = False
+        else:
+            print(f"✅ {line}")
+
+    print("\n" + "=" * 40)
+    if all_good:
+        print("🎉 轻量子命令启动检查通过！")
+    else:
+        print("⚠️  轻量子命令启动过慢或导入了重量级依赖")
+    return 0 if all_good else 1
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] in ("-h", "--help", "help"):
+        print_usage()
+        return 0
+
+    command = sys.argv[1]
+    if command not in COMMANDS:
+        print(f"❌ 未知子命令: {command}")
+        print_usage()
+        return 2
+
+    # 让模块看到的 argv 与直接运行脚本时一致
+    module_name = COMMANDS[command][0]
+    try:
+        args, profile = split_profile_args(sys.argv[2:])
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 2
+    sys.argv = [f"{module_name}.py"] + args
+    if profile is None:
+        result = load_command(command)()
+    else:
+        # 分析器也在子命令需要时才导入；模块导入耗时计入结果
+        from sampling_profiler import MODES, profile_call
+        if profile["mode"] not in MODES:
+            print(f"❌ 未知的分析模式: {profile['mode']}（可选 {', '.join(MODES)}）")
+            return 2
+        result = profile_call(lambda: load_command(command)(), command, **profile)
+    return result if isinstance(result, int) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,6 +6,11 @@
 import os
 import re
 
+from pbxproj_index import swift_files_from_args
+
+# 项目根目录（脚本所在目录）
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+
 def check_swift_file(file_path):
     """检查Swift文件中的常见错误"""
     errors = []
@@ -35,7 +40,12 @@ def check_swift_file(file_path):
                 errors.append(f"第{i}行: import语句格式错误")
             
             if 'func' in line and '(' in line and ')' not in line:
-                errors.append(f"第{i}行: 函数定义不完整")
+                # 参数列表可以跨行，到函数体开始前括号仍未闭合才算不完整
+                signature = '\n'.join(lines[i - 1:])
+                body_start = signature.find('{')
+                head = signature if body_start < 0 else signature[:body_start]
+                if head.count('(') != head.count(')'):
+                    errors.append(f"第{i}行: 函数定义不完整")
             
             if 'struct' in line and '{' not in line:
                 errors.append(f"第{i}行: struct定义不完整")
@@ -49,18 +59,13 @@ def main():
     print("🔍 手动检查Swift编译错误")
     print("=" * 40)
     
-    # 检查主要文件
-    files_to_check = [
-        'Life/Views/MatterHistoryView.swift',
-        'Life/Views/OptionConfigView.swift', 
-        'Life/Views/MatterEditView.swift',
-        'Life/LifeApp.swift'
-    ]
-    
+    # 检查 target 实际编译的 Swift 文件（来自 project.pbxproj 索引）
+    files_to_check = swift_files_from_args()
+
     all_good = True
     
     for file_path in files_to_check:
-        full_path = os.path.join('/Users/tangxiaojun/Downloads/Life', file_path)
+        full_path = os.path.join(PROJECT_ROOT, file_path)
         if os.path.exists(full_path):
             print(f"\n📄 检查: {file_path}")
             errors = check_swift_file(full_path)
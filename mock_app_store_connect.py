@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+本地 App Store Connect 截屏接口模拟服务
+用于离线测试截屏上传的吞吐量、重试和断点续传，支持注入延迟、随机失败和限流
+
+用法:
+    python3 mock_app_store_connect.py [--port 8790] [--latency-ms 20] [--failure-rate 0.1]
+
+接口（与 App Store Connect API 的对应接口格式一致）:
+    GET   /v1/appStoreVersionLocalizations/{id}/appScreenshotSets
+    PATCH /v1/appStoreVersionLocalizations/{id}          更新描述、关键词等元数据
+    POST  /v1/appScreenshotSets
+    POST  /v1/appScreenshots                             预约上传，返回分块 uploadOperations
+    PUT   /upload/{截屏id}/{分块序号}                     上传分块
+    PATCH /v1/appScreenshots/{id}                        提交（uploaded + sourceFileChecksum）
+    GET   /v1/appScreenshots/{id}
+    DELETE /v1/appScreenshots/{id}                       删除截屏（从截屏组中移除）
+    GET   /_stats                                        模拟服务统计（非 App Store Connect 接口）
+"""
+
+import re
+import sys
+import json
+import time
+import uuid
+import random
+import hashlib
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8790
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+class MockAppStoreConnect:
+    """模拟服务的内存状态"""
+
+    def __init__(self, chunk_size=DEFAULT_CHUNK_SIZE, latency_ms=0, failure_rate=0.0,
+                 rate_limit=0, seed=None):
+        self.chunk_size = chunk_size
+        self.latency_ms = latency_ms
+        self.failure_rate = failure_rate
+        # 每秒允许的请求数，0 表示不限流
+        self.rate_limit = rate_limit
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.base_url = ""
+
+        self.localizations = {}
+        self.screenshot_sets = {}
+        self.screenshots = {}
+        self.stats = {"requests": 0, "injected_failures": 0, "rate_limited": 0,
+                      "bytes_received": 0, "committed": 0}
+        self._window = (0, 0)
+
+    def admit(self):
+        """统计请求并决定是否注入失败；返回 None 或 (状态码, 附加响应头)"""
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        with self.lock:
+            self.stats["requests"] += 1
+            if self.rate_limit:
+                second = int(time.time())
+                start, count = self._window
+                count = count + 1 if start == second else 1
+                self._window = (second, count)
+                if count > self.rate_limit:
+                    self.stats["rate_limited"] += 1
+                    return 429, {"Retry-After": "1"}
+            if self.failure_rate and self.random.random() < self.failure_rate:
+                self.stats["injected_failures"] += 1
+                return self.random.choice([500, 502, 503]), {}
+        return None
+
+    def localization(self, localization_id):
+        return self.localizations.setdefault(localization_id, {"attributes": {}, "sets": []})
+
+    def list_sets(self, localization_id):
+        with self.lock:
+            sets = [self.screenshot_sets[set_id] for set_id in self.localization(localization_id)["sets"]]
+            return {"data": [{"type": "appScreenshotSets", "id": s["id"],
+                              "attributes": {"screenshotDisplayType": s["display_type"]}} for s in sets]}
+
+    def create_set(self, payload):
+        data = payload["data"]
+        display_type = data["attributes"]["screenshotDisplayType"]
+        localization_id = data["relationships"]["appStoreVersionLocalization"]["data"]["id"]
+        with self.lock:
+            localization = self.localization(localization_id)
+            for set_id in localization["sets"]:
+                if self.screenshot_sets[set_id]["display_type"] == display_type:
+                    raise ConflictError(f"{display_type} 截屏组已存在")
+            set_id = str(uuid.uuid4())
+            self.screenshot_sets[set_id] = {"id": set_id, "display_type": display_type, "screenshots": []}
+            localization["sets"].append(set_id)
+        return {"data": {"type": "appScreenshotSets", "id": set_id,
+                         "attributes": {"screenshotDisplayType": display_type}}}
+
+    def reserve(self, payload):
+        data = payload["data"]
+        file_name = data["attributes"]["fileName"]
+        file_size = int(data["attributes"]["fileSize"])
+        set_id = data["relationships"]["appScreenshotSet"]["data"]["id"]
+        with self.lock:
+            if set_id not in self.screenshot_sets:
+                raise NotFoundError(f"截屏组不存在: {set_id}")
+            screenshot_id = str(uuid.uuid4())
+            operations = []
+            for index, offset in enumerate(range(0, max(file_size, 1), self.chunk_size)):
+                length = min(self.chunk_size, file_size - offset)
+                operations.append({
+                    "method": "PUT",
+                    "url": f"{self.base_url}/upload/{screenshot_id}/{index}",
+                    "length": length,
+                    "offset": offset,
+                    "requestHeaders": [{"name": "Content-Type", "value": "image/png"}],
+                })
+            self.screenshots[screenshot_id] = {
+                "id": screenshot_id, "file_name": file_name, "file_size": file_size, "set_id": set_id,
+                "operations": operations, "chunks": {}, "state": "AWAITING_UPLOAD",
+            }
+            self.screenshot_sets[set_id]["screenshots"].append(screenshot_id)
+        return self.screenshot_resource(screenshot_id)
+
+    def put_chunk(self, screenshot_id, index, body):
+        with self.lock:
+            screenshot = self.screenshots.get(screenshot_id)
+            if screenshot is None:
+                raise NotFoundError(f"上传预约不存在: {screenshot_id}")
+            operation = screenshot["operations"][index]
+            if len(body) != operation["length"]:
+                raise ValueError(f"分块长度 {len(body)} 与预约的 {operation['length']} 不一致")
+            screenshot["chunks"][index] = body
+            self.stats["bytes_received"] += len(body)
+
+    def commit(self, screenshot_id, payload):
+        attributes = payload["data"]["attributes"]
+        with self.lock:
+            screenshot = self.screenshots.get(screenshot_id)
+            if screenshot is None:
+                raise NotFoundError(f"截屏不存在: {screenshot_id}")
+            if attributes.get("uploaded"):
+                missing = [i for i in range(len(screenshot["operations"])) if i not in screenshot["chunks"]]
+                content = b"".join(screenshot["chunks"][i] for i in sorted(screenshot["chunks"]))
+                checksum = hashlib.md5(content).hexdigest()
+                if missing:
+                    screenshot["state"] = "FAILED"
+                    screenshot["error"] = f"缺少分块: {missing}"
+                elif attributes.get("sourceFileChecksum") not in (None, checksum):
+                    screenshot["state"] = "FAILED"
+                    screenshot["error"] = "校验和不一致"
+                else:
+                    screenshot["state"] = "COMPLETE"
+                    screenshot["checksum"] = checksum
+                    self.stats["committed"] += 1
+        return self.screenshot_resource(screenshot_id)
+
+    def delete_screenshot(self, screenshot_id):
+        with self.lock:
+            screenshot = self.screenshots.pop(screenshot_id, None)
+            if screenshot is None:
+                raise NotFoundError(f"截屏不存在: {screenshot_id}")
+            self.screenshot_sets[screenshot["set_id"]]["screenshots"].remove(screenshot_id)
+
+    def screenshot_resource(self, screenshot_id):
+        screenshot = self.screenshots.get(screenshot_id)
+        if screenshot is None:
+            raise NotFoundError(f"截屏不存在: {screenshot_id}")
+        state = {"state": screenshot["state"]}
+        if "error" in screenshot:
+            state["errors"] = [{"code": "MOCK_ERROR", "description": screenshot["error"]}]
+        return {"data": {"type": "appScreenshots", "id": screenshot_id, "attributes": {
+            "fileName": screenshot["file_name"],
+            "fileSize": screenshot["file_size"],
+            "sourceFileChecksum": screenshot.get("checksum"),
+            "uploadOperations": screenshot["operations"] if screenshot["state"] == "AWAITING_UPLOAD" else None,
+            "assetDeliveryState": state,
+        }}}
+
+    def update_localization(self, localization_id, payload):
+        with self.lock:
+            localization = self.localization(localization_id)
+            localization["attributes"].update(payload["data"].get("attributes", {}))
+            return {"data": {"type": "appStoreVersionLocalizations", "id": localization_id,
+                             "attributes": dict(localization["attributes"])}}
+
+
+class NotFoundError(Exception):
+    pass
+
+
+class ConflictError(Exception):
+    pass
+
+
+class MockRequestHandler(BaseHTTPRequestHandler):
+    """HTTP请求处理，使用 HTTP/1.1 以支持连接复用"""
+
+    protocol_version = "HTTP/1.1"
+    service = None
+    quiet = True
+
+    def send_json(self, status, payload, headers=None):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_error_json(self, status, detail, headers=None):
+        self.send_json(status, {"errors": [{"status": str(status), "detail": detail}]}, headers)
+
+    def read_body(self):
+        length = int(self.headers.get("Content-Length", 0))
+        return self.rfile.read(length) if length else b""
+
+    def handle_request(self, method):
+        body = self.read_body()
+        if self.path == "/_stats":
+            with self.service.lock:
+                self.send_json(200, dict(self.service.stats))
+            return
+        if not self.headers.get("Authorization", "").startswith("Bearer ") and \
+                not self.path.startswith("/upload/"):
+            self.send_error_json(401, "缺少 Bearer 令牌")
+            return
+
+        failure = self.service.admit()
+        if failure:
+            status, headers = failure
+            self.send_error_json(status, "模拟失败", headers)
+            return
+
+        try:
+            result = self.route(method, self.path, body)
+        except NotFoundError as e:
+            self.send_error_json(404, str(e))
+        except ConflictError as e:
+            self.send_error_json(409, str(e))
+        except (ValueError, KeyError, TypeError) as e:
+            self.send_error_json(400, f"请求格式错误: {e}")
+        else:
+            if result is None:
+                self.send_response(200)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+            else:
+                status, payload = result
+                self.send_json(status, payload)
+
+    def route(self, method, path, body):
+        service = self.service
+        match = re.fullmatch(r"/upload/([\w-]+)/(\d+)", path)
+        if match and method == "PUT":
+            service.put_chunk(match.group(1), int(match.group(2)), body)
+            return None
+
+        match = re.fullmatch(r"/v1/appStoreVersionLocalizations/([\w-]+)(/appScreenshotSets)?", path)
+        if match:
+            if method == "GET" and match.group(2):
+                return 200, service.list_sets(match.group(1))
+            if method == "PATCH" and not match.group(2):
+                return 200, service.update_localization(match.group(1), json.loads(body))
+
+        if path == "/v1/appScreenshotSets" and method == "POST":
+            return 201, service.create_set(json.loads(body))
+        if path == "/v1/appScreenshots" and method == "POST":
+            return 201, service.reserve(json.loads(body))
+
+        match = re.fullmatch(r"/v1/appScreenshots/([\w-]+)", path)
+        if match:
+            if method == "GET":
+                return 200, service.screenshot_resource(match.group(1))
+            if method == "PATCH":
+                return 200, service.commit(match.group(1), json.loads(body))
+            if method == "DELETE":
+                service.delete_screenshot(match.group(1))
+                return None
+
+        raise NotFoundError(f"未知接口: {method} {path}")
+
+    def do_GET(self):
+        self.handle_request("GET")
+
+    def do_POST(self):
+        self.handle_request("POST")
+
+    def do_PUT(self):
+        self.handle_request("PUT")
+
+    def do_PATCH(self):
+        self.handle_request("PATCH")
+
+    def do_DELETE(self):
+        self.handle_request("DELETE")
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            print(f"  {self.address_string()} {format % args}")
+
+
+def start_server(service, host=DEFAULT_HOST, port=0):
+    """在后台线程启动模拟服务，返回 (server, base_url)；port 为0时自动分配端口"""
+    handler = type("Handler", (MockRequestHandler,), {"service": service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    service.base_url = f"http://{host}:{server.server_address[1]}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, service.base_url
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地 App Store Connect 截屏接口模拟服务")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="监听地址")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="监听端口")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="上传分块大小（字节）")
+    parser.add_argument("--latency-ms", type=float, default=0, help="每个请求的额外延迟")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="随机返回 5xx 的概率")
+    parser.add_argument("--rate-limit", type=int, default=0, help="每秒请求数上限，超出返回429")
+    parser.add_argument("--verbose", action="store_true", help="打印每个请求")
+    args = parser.parse_args()
+
+    service = MockAppStoreConnect(args.chunk_size, args.latency_ms, args.failure_rate, args.rate_limit)
+    handler = type("Handler", (MockRequestHandler,), {"service": service, "quiet": not args.verbose})
+    server = ThreadingHTTPServer((args.host, args.port), handler)
+    service.base_url = f"http://{args.host}:{args.port}"
+    print(f"✅ App Store Connect 模拟服务已启动: {service.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 退出")
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
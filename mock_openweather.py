@@ -0,0 +1,519 @@
+#!/usr/bin/env python3
+"""
+本地 OpenWeather 天气接口替身服务
+为 UI 自动化和截屏运行提供 /data/2.5/weather 接口：按坐标返回录制的或合成的响应，
+同一坐标的结果是确定的；完整的 HTTP 响应预先生成并缓存，支持注入延迟、随机失败和限流
+
+用法:
+    python3 mock_openweather.py [--port 8791] [--condition rain] [--pin 39.90,116.40=10n]
+    python3 mock_openweather.py --benchmark 20000 --concurrency 64
+
+App 端：在 Xcode scheme 或 UI 测试的 launchEnvironment 中设置
+    OPENWEATHER_BASE_URL=http://127.0.0.1:8791
+（Info.plist 需要允许本地网络的 ATS 例外 NSAllowsLocalNetworking）
+
+接口:
+    GET /data/2.5/weather?lat=&lon=&appid=&units=metric&lang=zh_cn
+        额外参数（真实接口没有）: condition=rain|502  icon=10n  用于指定天气
+    GET /_stats    服务统计
+"""
+
+import sys
+import json
+import time
+import random
+import asyncio
+import hashlib
+import argparse
+import threading
+from urllib.parse import urlsplit, parse_qs, urlencode
+from urllib.request import urlopen
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8791
+# 坐标取两位小数（约1公里）作为缓存键
+DEFAULT_PRECISION = 2
+MAX_CACHED_RESPONSES = 100000
+
+# OpenWeather 天气条件：(id, main, 英文描述, 中文描述, 图标编号)
+CONDITIONS = [
+    (800, "Clear", "clear sky", "晴", "01"),
+    (801, "Clouds", "few clouds", "少云", "02"),
+    (802, "Clouds", "scattered clouds", "多云", "03"),
+    (804, "Clouds", "overcast clouds", "阴，多云", "04"),
+    (300, "Drizzle", "light intensity drizzle", "小毛毛雨", "09"),
+    (521, "Rain", "shower rain", "阵雨", "09"),
+    (500, "Rain", "light rain", "小雨", "10"),
+    (502, "Rain", "heavy intensity rain", "大雨", "10"),
+    (200, "Thunderstorm", "thunderstorm with light rain", "雷阵雨", "11"),
+    (600, "Snow", "light snow", "小雪", "13"),
+    (601, "Snow", "snow", "雪", "13"),
+    (701, "Mist", "mist", "薄雾", "50"),
+    (741, "Fog", "fog", "雾", "50"),
+    (721, "Haze", "haze", "霾", "50"),
+]
+CONDITIONS_BY_ID = {condition[0]: condition for condition in CONDITIONS}
+
+# 与 WeatherManager.provideMockWeatherData 相同的城市：(中文名, 英文名, 纬度, 经度, 城市id)
+CITIES = [
+    ("北京", "Beijing", 39.9042, 116.4074, 1816670),
+    ("上海", "Shanghai", 31.2304, 121.4737, 1796236),
+    ("深圳", "Shenzhen", 22.5431, 114.0579, 1795565),
+    ("广州", "Guangzhou", 23.1291, 113.2644, 1809858),
+    ("杭州", "Hangzhou", 30.2741, 120.1551, 1808926),
+    ("成都", "Chengdu", 30.5728, 104.0668, 1815286),
+]
+
+REASONS = {200: "OK", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found",
+           429: "Too Many Requests", 500: "Internal Server Error", 502: "Bad Gateway",
+           503: "Service Unavailable"}
+ERROR_MESSAGES = {
+    400: "wrong latitude",
+    401: "Invalid API key. Please see https://openweathermap.org/faq#error401 for more info.",
+    404: "Internal error",
+    429: "Your account is temporary blocked due to exceeding of requests limitation of your subscription type.",
+    500: "Internal error",
+    502: "Bad gateway",
+    503: "Service unavailable",
+}
+
+
+def http_response(status, body, headers=None):
+    """生成完整的 HTTP/1.1 响应字节（响应头 + 响应体）"""
+    lines = [f"HTTP/1.1 {status} {REASONS.get(status, 'Unknown')}",
+             "Server: mock-openweather",
+             "Content-Type: application/json; charset=utf-8",
+             f"Content-Length: {len(body)}"]
+    lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+
+def json_response(status, payload, headers=None):
+    body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return http_response(status, body, headers)
+
+
+def error_response(status, headers=None, message=None):
+    return json_response(status, {"cod": status, "message": message or ERROR_MESSAGES.get(status, "error")},
+                         headers)
+
+
+def resolve_condition(spec):
+    """天气条件说明 → (条件, 是否白天)；支持图标编号 10n、条件id 502 和 main 名称 rain"""
+    spec = str(spec).strip()
+    if len(spec) == 3 and spec[:2].isdigit() and spec[2] in "dn":
+        for condition in CONDITIONS:
+            if condition[4] == spec[:2]:
+                return condition, spec[2] == "d"
+        raise ValueError(f"未知图标: {spec}")
+    if spec.isdigit():
+        if int(spec) not in CONDITIONS_BY_ID:
+            raise ValueError(f"未知天气条件id: {spec}")
+        return CONDITIONS_BY_ID[int(spec)], None
+    for condition in CONDITIONS:
+        if condition[1].lower() == spec.lower():
+            return condition, None
+    raise ValueError(f"未知天气条件: {spec}，可选: {', '.join(sorted({c[1] for c in CONDITIONS}))}")
+
+
+def nearest_city(lat, lon):
+    """1度以内最近的城市，否则 None"""
+    best = min(CITIES, key=lambda city: (city[2] - lat) ** 2 + (city[3] - lon) ** 2)
+    if (best[2] - lat) ** 2 + (best[3] - lon) ** 2 <= 1.0:
+        return best
+    return None
+
+
+def synthesize_record(lat, lon):
+    """由坐标哈希生成确定的天气记录（温度为摄氏度）"""
+    digest = hashlib.blake2b(f"{lat:.4f},{lon:.4f}".encode(), digest_size=16).digest()
+    condition = CONDITIONS[digest[0] % len(CONDITIONS)]
+    temp = round(28 - abs(lat) * 0.45 + (digest[1] % 100) / 10 - 5, 2)
+    if condition[1] == "Snow":
+        temp = min(temp, round(-(digest[1] % 60) / 10, 2))
+    city = nearest_city(lat, lon)
+    return {
+        "condition": condition,
+        "daylight": True,
+        "temp": temp,
+        "feels_like": round(temp - (digest[2] % 30) / 10, 2),
+        "temp_min": round(temp - 1 - (digest[3] % 20) / 10, 2),
+        "temp_max": round(temp + 1 + (digest[4] % 20) / 10, 2),
+        "pressure": 1000 + digest[5] % 30,
+        "humidity": 30 + digest[6] % 65,
+        "visibility": 10000 if condition[1] not in ("Mist", "Fog", "Haze") else 1000 + digest[7] % 40 * 100,
+        "wind_speed": round((digest[8] % 120) / 10, 2),
+        "wind_deg": digest[9] * 360 // 256,
+        "clouds": {"Clear": 0, "Clouds": 20 + digest[10] % 80}.get(condition[1], 75 + digest[10] % 25),
+        "city": {"name": city[0], "name_en": city[1], "id": city[4], "country": "CN"} if city else
+                {"name": "", "name_en": "", "id": 0, "country": ""},
+        "timezone": round(lon / 15) * 3600,
+    }
+
+
+def to_celsius(value, units):
+    if units == "imperial":
+        return (value - 32) * 5 / 9
+    if units == "metric":
+        return value
+    return value - 273.15
+
+
+def from_celsius(value, units):
+    if units == "imperial":
+        return round(value * 9 / 5 + 32, 2)
+    if units == "metric":
+        return round(value, 2)
+    return round(value + 273.15, 2)
+
+
+def normalize_recording(entry):
+    """录制的原始响应 {"units": ..., "response": {...}} → 天气记录"""
+    units = entry.get("units", "standard")
+    payload = entry["response"]
+    weather = payload["weather"][0]
+    condition = CONDITIONS_BY_ID.get(weather["id"]) or \
+        (weather["id"], weather["main"], weather["description"], weather["description"], weather["icon"][:2])
+    main = payload["main"]
+    return {
+        "condition": condition,
+        "daylight": weather["icon"].endswith("d"),
+        **{key: round(to_celsius(main[key], units), 2) for key in ("temp", "feels_like", "temp_min", "temp_max")},
+        "pressure": main.get("pressure", 1013),
+        "humidity": main.get("humidity", 50),
+        "visibility": payload.get("visibility", 10000),
+        "wind_speed": payload.get("wind", {}).get("speed", 0) * (0.44704 if units == "imperial" else 1),
+        "wind_deg": payload.get("wind", {}).get("deg", 0),
+        "clouds": payload.get("clouds", {}).get("all", 0),
+        "city": {"name": payload.get("name", ""), "name_en": payload.get("name", ""),
+                 "id": payload.get("id", 0), "country": payload.get("sys", {}).get("country", "")},
+        "timezone": payload.get("timezone", 0),
+    }
+
+
+def build_payload(record, lat, lon, units, lang, bucket, condition=None, daylight=None):
+    """天气记录 → OpenWeather 响应；日出日落放在当前小时附近，保证 App 的白天判断稳定"""
+    condition = condition or record["condition"]
+    daylight = record["daylight"] if daylight is None else daylight
+    if daylight:
+        sunrise, sunset = bucket - 6 * 3600, bucket + 7 * 3600
+    else:
+        sunrise, sunset = bucket + 7 * 3600, bucket + 19 * 3600
+    # 指定为下雪时整体下移温度，避免出现 25° 的雪天
+    offset = record["temp"] + 1 if condition[1] == "Snow" and record["temp"] > 0 else 0
+    chinese = lang.lower().startswith("zh")
+    city = record["city"]
+    return {
+        "coord": {"lon": lon, "lat": lat},
+        "weather": [{"id": condition[0], "main": condition[1],
+                     "description": condition[3] if chinese else condition[2],
+                     "icon": condition[4] + ("d" if daylight else "n")}],
+        "base": "stations",
+        "main": {
+            "temp": from_celsius(record["temp"] - offset, units),
+            "feels_like": from_celsius(record["feels_like"] - offset, units),
+            "temp_min": from_celsius(record["temp_min"] - offset, units),
+            "temp_max": from_celsius(record["temp_max"] - offset, units),
+            "pressure": record["pressure"],
+            "humidity": record["humidity"],
+        },
+        "visibility": record["visibility"],
+        "wind": {"speed": round(record["wind_speed"] / (0.44704 if units == "imperial" else 1), 2),
+                 "deg": record["wind_deg"]},
+        "clouds": {"all": record["clouds"]},
+        "dt": bucket,
+        "sys": {"country": city["country"], "sunrise": sunrise, "sunset": sunset},
+        "timezone": record["timezone"],
+        "id": city["id"],
+        "name": city["name"] if chinese else city["name_en"],
+        "cod": 200,
+    }
+
+
+class MockOpenWeather:
+    """替身服务的状态：录制数据、固定天气、预生成的响应缓存和统计"""
+
+    def __init__(self, recordings=None, pins=None, condition=None, api_key=None,
+                 latency_ms=0, jitter_ms=0, failure_rate=0.0, rate_limit=0,
+                 precision=DEFAULT_PRECISION, seed=None):
+        self.precision = precision
+        self.recordings = {self.key(*map(float, point.split(","))): normalize_recording(entry)
+                           for point, entry in (recordings or {}).items()}
+        self.pins = {self.key(*map(float, point.split(","))): resolve_condition(spec)
+                     for point, spec in (pins or {}).items()}
+        self.condition = resolve_condition(condition) if condition else None
+        self.api_key = api_key
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self.rate_limit = rate_limit
+        self.random = random.Random(seed)
+
+        self.responses = {}
+        self.bucket = None
+        self.stats = {"requests": 0, "cache_hits": 0, "synthesized": 0, "recorded": 0,
+                      "injected_failures": 0, "rate_limited": 0}
+        self._window = (0, 0)
+        self._errors = {status: error_response(status) for status in (400, 401, 404, 500, 502, 503)}
+        self._errors[429] = error_response(429, {"Retry-After": "1"})
+
+    def key(self, lat, lon):
+        return round(lat, self.precision), round(lon, self.precision)
+
+    def current_bucket(self):
+        """整点时间戳；换小时后缓存的日出日落失效"""
+        bucket = int(time.time()) // 3600 * 3600
+        if bucket != self.bucket:
+            self.bucket = bucket
+            self.responses.clear()
+        return bucket
+
+    def record_for(self, point):
+        record = self.recordings.get(point)
+        if record is not None:
+            self.stats["recorded"] += 1
+            return record
+        self.stats["synthesized"] += 1
+        return synthesize_record(*point)
+
+    def weather_response(self, lat, lon, units="standard", lang="en", override=None):
+        """返回预生成的响应字节；override 为请求中的 condition/icon 参数"""
+        point = self.key(lat, lon)
+        cache_key = (point, units, lang, override)
+        bucket = self.current_bucket()
+        response = self.responses.get(cache_key)
+        if response is not None:
+            self.stats["cache_hits"] += 1
+            return response
+
+        condition, daylight = resolve_condition(override) if override else \
+            self.pins.get(point) or self.condition or (None, None)
+        payload = build_payload(self.record_for(point), point[0], point[1], units, lang,
+                                bucket, condition, daylight)
+        response = json_response(200, payload)
+        if len(self.responses) >= MAX_CACHED_RESPONSES:
+            self.responses.clear()
+        self.responses[cache_key] = response
+        return response
+
+    def precompute(self, units_list=("metric",), langs=("zh_cn", "en")):
+        """预先生成城市、录制坐标和固定坐标的响应"""
+        points = {self.key(city[2], city[3]) for city in CITIES} | set(self.recordings) | set(self.pins)
+        for point in points:
+            for units in units_list:
+                for lang in langs:
+                    self.weather_response(point[0], point[1], units, lang)
+        self.stats.update(cache_hits=0, synthesized=0, recorded=0)
+        return len(self.responses)
+
+    def admit(self):
+        """限流和随机失败；返回 None 或错误响应字节"""
+        self.stats["requests"] += 1
+        if self.rate_limit:
+            second = int(time.time())
+            start, count = self._window
+            count = count + 1 if start == second else 1
+            self._window = (second, count)
+            if count > self.rate_limit:
+                self.stats["rate_limited"] += 1
+                return self._errors[429]
+        if self.failure_rate and self.random.random() < self.failure_rate:
+            self.stats["injected_failures"] += 1
+            return self._errors[self.random.choice([500, 502, 503])]
+        return None
+
+    def handle(self, method, target):
+        """处理一个请求，返回完整响应字节"""
+        parts = urlsplit(target)
+        if parts.path == "/_stats":
+            return json_response(200, dict(self.stats, cached_responses=len(self.responses)))
+        if method != "GET" or parts.path != "/data/2.5/weather":
+            self.stats["requests"] += 1
+            return self._errors[404]
+
+        query = {name: values[0] for name, values in parse_qs(parts.query).items()}
+        if "appid" not in query or (self.api_key and query["appid"] != self.api_key):
+            self.stats["requests"] += 1
+            return self._errors[401]
+        failure = self.admit()
+        if failure:
+            return failure
+        override = query.get("icon") or query.get("condition")
+        if override:
+            # 单独校验天气条件，错误信息指明是哪个条件无效，而不是笼统的 wrong latitude
+            try:
+                resolve_condition(override)
+            except ValueError as e:
+                return error_response(400, message=str(e))
+        try:
+            lat, lon = float(query["lat"]), float(query["lon"])
+            if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+                raise ValueError
+            return self.weather_response(lat, lon, query.get("units", "standard"),
+                                         query.get("lang", "en"), override)
+        except (KeyError, ValueError):
+            return self._errors[400]
+
+    async def delay(self):
+        if self.latency_ms or self.jitter_ms:
+            await asyncio.sleep((self.latency_ms + self.random.uniform(0, self.jitter_ms)) / 1000)
+
+    async def serve_connection(self, reader, writer):
+        """一个 keep-alive 连接：循环读取请求头，写回预生成的响应（支持流水线请求）"""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                request_line, _, header_block = head.decode("latin-1").partition("\r\n")
+                method, target, version = (request_line.split(" ") + ["", ""])[:3]
+                headers = {}
+                for line in header_block.split("\r\n"):
+                    name, _, value = line.partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length") or 0)
+                if length:
+                    await reader.readexactly(length)
+
+                response = self.handle(method, target)
+                await self.delay()
+                writer.write(response)
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close" or version == "HTTP/1.0":
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(service, host=DEFAULT_HOST, port=DEFAULT_PORT, ready=None):
+    server = await asyncio.start_server(service.serve_connection, host, port, backlog=1024)
+    if ready:
+        ready(server)
+    async with server:
+        await server.serve_forever()
+
+
+def start_server(service, host=DEFAULT_HOST, port=0):
+    """在后台线程的事件循环中启动服务，返回 base_url；port 为0时自动分配端口"""
+    started = threading.Event()
+    address = {}
+
+    def ready(server):
+        address["port"] = server.sockets[0].getsockname()[1]
+        started.set()
+
+    thread = threading.Thread(target=lambda: asyncio.run(serve(service, host, port, ready)), daemon=True)
+    thread.start()
+    started.wait()
+    return f"http://{host}:{address['port']}"
+
+
+def record_live(points, api_key, path, units="metric"):
+    """从真实 OpenWeather 接口录制坐标的响应，合并写入录制文件"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            recordings = json.load(f)
+    except FileNotFoundError:
+        recordings = {}
+    for point in points:
+        lat, lon = point.split(",")
+        query = urlencode({"lat": lat, "lon": lon, "appid": api_key, "units": units, "lang": "en"})
+        with urlopen(f"https://api.openweathermap.org/data/2.5/weather?{query}", timeout=30) as response:
+            recordings[point] = {"units": units, "response": json.load(response)}
+        print(f"  录制: {point} → {recordings[point]['response']['weather'][0]['main']}")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(recordings, f, ensure_ascii=False, indent=2)
+
+
+async def run_benchmark(base_url, total, concurrency):
+    """keep-alive 并发请求，返回 (每秒请求数, 状态码计数)"""
+    from screenshot_uploader import AsyncHTTPClient
+
+    client = AsyncHTTPClient(max_idle=concurrency)
+    statuses = {}
+    points = [(city[2], city[3]) for city in CITIES]
+    counter = iter(range(total))
+
+    async def worker():
+        for i in counter:
+            lat, lon = points[i % len(points)]
+            status, _, _ = await client.request(
+                "GET", f"{base_url}/data/2.5/weather?lat={lat}&lon={lon}&appid=mock&units=metric&lang=zh_cn")
+            statuses[status] = statuses.get(status, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    for connections in client.idle.values():
+        for _, writer in connections:
+            writer.close()
+    return total / elapsed, statuses
+
+
+def parse_pins(values):
+    pins = {}
+    for value in values or []:
+        point, _, spec = value.partition("=")
+        pins[point] = spec
+    return pins
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地 OpenWeather 天气接口替身服务")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="监听地址")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="监听端口")
+    parser.add_argument("--recordings", help="录制的响应JSON：{\"纬度,经度\": {\"units\": ..., \"response\": {...}}}")
+    parser.add_argument("--pin", action="append", metavar="LAT,LON=天气",
+                        help="固定某个坐标的天气（图标编号 10n、条件id 502 或名称 rain），可重复")
+    parser.add_argument("--condition", help="所有坐标使用同一天气（截屏时固定天气卡片）")
+    parser.add_argument("--api-key", help="只接受该 appid，默认接受任意非空 appid")
+    parser.add_argument("--latency-ms", type=float, default=0, help="每个请求的额外延迟")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="随机附加延迟的上限")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="随机返回 5xx 的概率")
+    parser.add_argument("--rate-limit", type=int, default=0, help="每秒请求数上限，超出返回429")
+    parser.add_argument("--precision", type=int, default=DEFAULT_PRECISION, help="坐标缓存键的小数位数")
+    parser.add_argument("--seed", type=int, help="失败注入的随机种子")
+    parser.add_argument("--record", action="append", metavar="LAT,LON",
+                        help="从真实接口录制坐标的响应到 --recordings 文件（需要 --api-key）")
+    parser.add_argument("--benchmark", type=int, metavar="N", help="启动服务并发送 N 个请求测量吞吐量")
+    parser.add_argument("--concurrency", type=int, default=32, help="压测并发连接数")
+    args = parser.parse_args()
+
+    if args.record:
+        if not args.api_key or not args.recordings:
+            parser.error("--record 需要 --api-key 和 --recordings")
+        record_live(args.record, args.api_key, args.recordings)
+        print(f"✅ 已写入 {args.recordings}")
+        return 0
+
+    recordings = None
+    if args.recordings:
+        with open(args.recordings, "r", encoding="utf-8") as f:
+            recordings = json.load(f)
+    try:
+        service = MockOpenWeather(recordings, parse_pins(args.pin), args.condition, args.api_key,
+                                  args.latency_ms, args.jitter_ms, args.failure_rate, args.rate_limit,
+                                  args.precision, args.seed)
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"📦 预生成 {service.precompute()} 个响应")
+
+    if args.benchmark:
+        base_url = start_server(service, args.host, 0)
+        rps, statuses = asyncio.run(run_benchmark(base_url, args.benchmark, args.concurrency))
+        print(f"⏱️  {args.benchmark} 个请求，{args.concurrency} 个连接：{rps:.0f} 请求/秒，状态码 {statuses}")
+        return 0
+
+    print(f"✅ OpenWeather 替身服务已启动: http://{args.host}:{args.port}")
+    try:
+        asyncio.run(serve(service, args.host, args.port))
+    except KeyboardInterrupt:
+        print("\n👋 退出")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
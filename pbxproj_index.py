@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""
+project.pbxproj 索引
+解析 Life.xcodeproj/project.pbxproj（OpenStep 格式的 plist），建立文件引用、分组、构建阶段和
+target 的索引，回答“某文件属于哪些 target”“某 target 编译哪些文件”“磁盘上哪些源文件不属于任何
+target”“哪些文件被重复引用”等查询。
+支持 Xcode 16 的同步文件夹（PBXFileSystemSynchronizedRootGroup）：文件夹中的文件默认属于
+对应 target，membershipExceptions 中列出的除外。
+索引缓存在 .cache/pbxproj/index.json，project.pbxproj 或同步文件夹中任一目录的修改时间变化时重建
+
+用法:
+    python3 pbxproj_index.py                       # 概要：各 target 文件数、孤立文件、重复引用
+    python3 pbxproj_index.py --target Life --phase sources
+    python3 pbxproj_index.py --which Life/Views/ContentView.swift
+    python3 pbxproj_index.py --bench
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+
+# 项目根目录（脚本所在目录）
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_PROJECT = os.path.join(PROJECT_ROOT, "Life.xcodeproj")
+CACHE_DIR = os.path.join(PROJECT_ROOT, ".cache", "pbxproj")
+
+# 索引结构变化时递增，使旧缓存失效
+INDEX_VERSION = 1
+
+# 同步文件夹中按扩展名归入的构建阶段（其余文件归入 resources）
+SOURCE_EXTENSIONS = {".swift", ".m", ".mm", ".c", ".cc", ".cpp", ".metal", ".intentdefinition"}
+# 作为整体处理、不再向下遍历的目录（资源目录、本地化目录等）
+BUNDLE_EXTENSIONS = {".xcassets", ".bundle", ".lproj", ".xcdatamodeld", ".scnassets", ".rcproject"}
+# 同步文件夹中不参与构建的文件
+IGNORED_FILES = {".DS_Store"}
+
+# 构建阶段 isa → 简称
+PHASES = {
+    "PBXSourcesBuildPhase": "sources",
+    "PBXResourcesBuildPhase": "resources",
+    "PBXFrameworksBuildPhase": "frameworks",
+    "PBXCopyFilesBuildPhase": "copy",
+    "PBXHeadersBuildPhase": "headers",
+}
+GROUP_TYPES = ("PBXGroup", "PBXVariantGroup", "XCVersionGroup")
+# 构建设置中引用文件、但文件不需要出现在构建阶段里的键
+SETTING_FILE_KEYS = ("INFOPLIST_FILE", "CODE_SIGN_ENTITLEMENTS")
+
+TOKEN_PATTERN = re.compile(r"""
+    \s+ | /\*.*?\*/ | //[^\n]*
+  | "(?P<string>(?:[^"\\]|\\.)*)"
+  | (?P<word>[^\s{}()=;,"]+)
+  | (?P<punct>[{}()=;,])
+""", re.VERBOSE | re.DOTALL)
+
+ESCAPES = {"n": "\n", "t": "\t", '"': '"', "\\": "\\"}
+
+
+def tokenize(text):
+    """pbxproj 文本 → 词法单元列表（去掉注释）；字符串和单词都作为值"""
+    tokens = []
+    for match in TOKEN_PATTERN.finditer(text):
+        kind = match.lastgroup
+        if kind is None:
+            continue
+        value = match.group(kind)
+        if kind == "string":
+            value = re.sub(r"\\(.)", lambda m: ESCAPES.get(m.group(1), m.group(1)), value)
+            kind = "word"
+        tokens.append((kind, value))
+    return tokens
+
+
+def parse_plist(text):
+    """解析 OpenStep plist：{} 为字典、() 为数组，其余为字符串"""
+    tokens = tokenize(text)
+    position = 0
+
+    def parse_value():
+        nonlocal position
+        kind, value = tokens[position]
+        position += 1
+        if kind == "word":
+            return value
+        if value == "{":
+            result = {}
+            while tokens[position][1] != "}":
+                key = parse_value()
+                position += 1  # =
+                result[key] = parse_value()
+                position += 1  # ;
+            position += 1
+            return result
+        if value == "(":
+            result = []
+            while tokens[position][1] != ")":
+                result.append(parse_value())
+                if tokens[position][1] == ",":
+                    position += 1
+            position += 1
+            return result
+        raise ValueError(f"第 {position} 个词法单元处意外的 {value!r}")
+
+    return parse_value()
+
+
+def resolve_paths(objects, main_group):
+    """
+    按分组层级计算每个文件引用/分组的路径（相对项目根目录）
+    SDK、构建产物等不在项目目录中的引用返回 "$(SOURCE_TREE)/path" 形式
+    """
+    parents = {}
+    for object_id, item in objects.items():
+        if item.get("isa") in GROUP_TYPES:
+            for child in item.get("children", []):
+                parents[child] = object_id
+
+    paths = {}
+
+    def path_of(object_id):
+        if object_id in paths:
+            return paths[object_id]
+        item = objects.get(object_id, {})
+        own = item.get("path", "")
+        tree = item.get("sourceTree", "<group>")
+        if tree == "<group>":
+            parent = parents.get(object_id)
+            base = path_of(parent) if parent and parent != main_group else ""
+            result = os.path.normpath(os.path.join(base, own)) if (base or own) else ""
+        elif tree in ("SOURCE_ROOT", "<absolute>"):
+            result = own
+        else:
+            result = f"$({tree})/{own}"
+        paths[object_id] = "" if result == "." else result
+        return paths[object_id]
+
+    for object_id, item in objects.items():
+        if item.get("isa") in GROUP_TYPES + ("PBXFileReference", "PBXFileSystemSynchronizedRootGroup"):
+            path_of(object_id)
+    return paths
+
+
+def synchronized_files(root, folder):
+    """同步文件夹中的全部构建项（相对项目根目录）和遍历到的目录"""
+    items = []
+    directories = []
+    for current, dirs, names in os.walk(os.path.join(root, folder)):
+        directories.append(os.path.relpath(current, root))
+        bundles = sorted(d for d in dirs if os.path.splitext(d)[1] in BUNDLE_EXTENSIONS)
+        dirs[:] = sorted(d for d in dirs if d not in bundles and not d.startswith("."))
+        for name in bundles + sorted(names):
+            if name in IGNORED_FILES or name.startswith("."):
+                continue
+            items.append(os.path.relpath(os.path.join(current, name), root))
+    return items, directories
+
+
+def phase_for(path):
+    return "sources" if os.path.splitext(path)[1] in SOURCE_EXTENSIONS else "resources"
+
+
+def build_index(project_path):
+    """解析 project.pbxproj 并建立可写入 JSON 的索引"""
+    pbxproj = os.path.join(project_path, "project.pbxproj")
+    root = os.path.dirname(os.path.abspath(project_path))
+    with open(pbxproj, "r", encoding="utf-8") as f:
+        data = parse_plist(f.read())
+    objects = data["objects"]
+    project = objects[data["rootObject"]]
+    paths = resolve_paths(objects, project.get("mainGroup"))
+
+    targets = {}
+    membership = {}
+    references = {}
+    duplicates = []
+    stamps = {os.path.relpath(pbxproj, root): os.stat(pbxproj).st_mtime_ns}
+    setting_files = set()
+
+    def add(target_name, phase, path, via):
+        files = targets[target_name]["files"].setdefault(phase, [])
+        if path in files:
+            duplicates.append({"path": path, "target": target_name, "phase": phase, "via": via})
+            return
+        files.append(path)
+        membership.setdefault(path, [])
+        if target_name not in membership[path]:
+            membership[path].append(target_name)
+
+    for target_id in project.get("targets", []):
+        target = objects[target_id]
+        name = target.get("name", target_id)
+        targets[name] = {"id": target_id, "product_type": target.get("productType", ""),
+                         "product": paths.get(target.get("productReference"), ""), "files": {}}
+
+        # 构建设置中引用的 Info.plist、entitlements
+        configurations = objects.get(target.get("buildConfigurationList"), {}).get("buildConfigurations", [])
+        for configuration_id in configurations:
+            settings = objects.get(configuration_id, {}).get("buildSettings", {})
+            setting_files.update(settings[key] for key in SETTING_FILE_KEYS if key in settings)
+
+        # 传统方式：构建阶段中的 PBXBuildFile
+        for phase_id in target.get("buildPhases", []):
+            phase = objects.get(phase_id, {})
+            phase_name = PHASES.get(phase.get("isa"), phase.get("isa", "other"))
+            for build_file_id in phase.get("files", []):
+                ref = objects.get(build_file_id, {}).get("fileRef") or \
+                    objects.get(build_file_id, {}).get("productRef")
+                if ref is None:
+                    continue
+                add(name, phase_name, paths.get(ref, ref), "build-phase")
+
+        # 同步文件夹：除该 target 的例外以外全部属于 target
+        for group_id in target.get("fileSystemSynchronizedGroups", []):
+            group = objects.get(group_id, {})
+            folder = paths.get(group_id, group.get("path", ""))
+            excluded = set()
+            for exception_id in group.get("exceptions", []):
+                exception = objects.get(exception_id, {})
+                if exception.get("target") == target_id:
+                    excluded.update(os.path.normpath(os.path.join(folder, item))
+                                    for item in exception.get("membershipExceptions", []))
+            items, directories = synchronized_files(root, folder)
+            for directory in directories:
+                stamps[directory] = os.stat(os.path.join(root, directory)).st_mtime_ns
+            for item in items:
+                if item not in excluded:
+                    add(name, phase_for(item), item, "synchronized-folder")
+
+    # 同一路径被多个 PBXFileReference 引用
+    for object_id, item in objects.items():
+        if item.get("isa") == "PBXFileReference":
+            references.setdefault(paths.get(object_id, ""), []).append(object_id)
+    for path, ids in references.items():
+        if len(ids) > 1:
+            duplicates.append({"path": path, "references": ids, "via": "file-reference"})
+
+    return {
+        "version": INDEX_VERSION,
+        "project": os.path.relpath(project_path, root),
+        "targets": targets,
+        "membership": membership,
+        "setting_files": sorted(setting_files),
+        "synchronized": sorted({paths.get(g, "") for t in project.get("targets", [])
+                                for g in objects[t].get("fileSystemSynchronizedGroups", [])}),
+        "duplicates": duplicates,
+        "stamps": stamps,
+    }
+
+
+class ProjectIndex:
+    """索引查询；所有查询都是字典/集合查找"""
+
+    def __init__(self, data, root):
+        self.data = data
+        self.root = root
+        self.membership = {path: frozenset(names) for path, names in data["membership"].items()}
+        self.targets = data["targets"]
+
+    def target_names(self):
+        return list(self.targets)
+
+    def files(self, target, phase=None):
+        """target 的文件（相对项目根目录）；phase 为 sources/resources/frameworks 等"""
+        files = self.targets[target]["files"]
+        if phase is not None:
+            return list(files.get(phase, []))
+        return [path for phase_files in files.values() for path in phase_files]
+
+    def sources(self, target=None, extension=".swift"):
+        """target 编译的源文件；不指定 target 时为全部 target 的并集（按路径排序）"""
+        names = [target] if target else self.target_names()
+        return sorted({path for name in names for path in self.files(name, "sources")
+                       if path.endswith(extension)})
+
+    def targets_for(self, path):
+        """文件所属的 target（接受绝对路径或相对项目根目录的路径）"""
+        if os.path.isabs(path):
+            path = os.path.relpath(path, self.root)
+        return self.membership.get(os.path.normpath(path), frozenset())
+
+    def orphans(self, extensions=(".swift",)):
+        """磁盘上不属于任何 target 的源文件（构建设置引用的 Info.plist 等除外）"""
+        ignored = set(self.data["setting_files"])
+        orphans = []
+        for current, dirs, names in os.walk(self.root):
+            dirs[:] = sorted(d for d in dirs if not d.startswith(".") and d not in ("build", "DerivedData")
+                             and os.path.splitext(d)[1] not in (".xcodeproj", ".xcassets"))
+            for name in sorted(names):
+                if not name.endswith(tuple(extensions)):
+                    continue
+                path = os.path.relpath(os.path.join(current, name), self.root)
+                if path not in self.membership and path not in ignored:
+                    orphans.append(path)
+        return orphans
+
+    def duplicates(self):
+        return self.data["duplicates"]
+
+
+def is_fresh(data, root):
+    """缓存是否仍然有效：版本一致，且记录的文件/目录修改时间都未变化"""
+    if data.get("version") != INDEX_VERSION:
+        return False
+    for path, mtime in data["stamps"].items():
+        try:
+            if os.stat(os.path.join(root, path)).st_mtime_ns != mtime:
+                return False
+        except OSError:
+            return False
+    return True
+
+
+def load_index(project_path=DEFAULT_PROJECT, use_cache=True):
+    """读取（必要时重建）索引，返回 ProjectIndex"""
+    project_path = os.path.abspath(project_path)
+    root = os.path.dirname(project_path)
+    cache_path = os.path.join(CACHE_DIR, os.path.basename(project_path) + ".json")
+    if use_cache and os.path.exists(cache_path):
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if is_fresh(data, root):
+                return ProjectIndex(data, root)
+        except (OSError, ValueError, KeyError):
+            pass
+
+    data = build_index(project_path)
+    if use_cache:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(cache_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+    return ProjectIndex(data, root)
+
+
+def swift_files_from_args(argv=None):
+    """
+    Swift 检查脚本共用的命令行：指定的文件，或 --target（默认全部 target）编译的 Swift 文件
+    未知 target 通过 parser.error 报告可选的 target
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("files", nargs="*", help="要检查的文件，默认为 target 编译的全部 Swift 文件")
+    parser.add_argument("--target", help="只检查该 target（如 Life、WidgetExtension）编译的文件")
+    args = parser.parse_args(argv)
+    if args.files:
+        return args.files
+    index = load_index()
+    if args.target and args.target not in index.target_names():
+        parser.error(f"未知 target: {args.target}，可选: {', '.join(index.target_names())}")
+    return index.sources(args.target)
+
+
+def benchmark(index, rounds=100000):
+    """测量单次成员查询的耗时（微秒）"""
+    paths = list(index.membership) + ["not/in/project.swift"]
+    started = time.perf_counter()
+    for i in range(rounds):
+        index.targets_for(paths[i % len(paths)])
+    return (time.perf_counter() - started) / rounds * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="project.pbxproj 索引：target 成员、孤立文件、重复引用")
+    parser.add_argument("--project", default=DEFAULT_PROJECT, help="xcodeproj 路径")
+    parser.add_argument("--target", help="列出该 target 的文件")
+    parser.add_argument("--phase", help="配合 --target，只列出该构建阶段（sources/resources/frameworks）")
+    parser.add_argument("--which", help="查询文件属于哪些 target")
+    parser.add_argument("--orphans", action="store_true", help="只列出不属于任何 target 的源文件")
+    parser.add_argument("--duplicates", action="store_true", help="只列出重复引用")
+    parser.add_argument("--no-cache", action="store_true", help="不读写索引缓存")
+    parser.add_argument("--bench", action="store_true", help="测量加载和查询耗时")
+    parser.add_argument("--json", action="store_true", help="以JSON格式输出")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    try:
+        index = load_index(args.project, use_cache=not args.no_cache)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"❌ 无法解析 {args.project}: {e}")
+        return 1
+    load_ms = (time.perf_counter() - started) * 1000
+
+    if args.which:
+        names = sorted(index.targets_for(args.which))
+        print(json.dumps(names) if args.json else (", ".join(names) or "（不属于任何 target）"))
+        return 0 if names else 1
+    if args.target:
+        if args.target not in index.targets:
+            print(f"❌ 未知 target: {args.target}（可用: {', '.join(index.target_names())}）")
+            return 2
+        files = index.files(args.target, args.phase)
+        print(json.dumps(files, ensure_ascii=False, indent=2) if args.json else "\n".join(files))
+        return 0
+    if args.orphans:
+        orphans = index.orphans()
+        print(json.dumps(orphans, ensure_ascii=False, indent=2) if args.json else "\n".join(orphans))
+        return 1 if orphans else 0
+    if args.duplicates:
+        print(json.dumps(index.duplicates(), ensure_ascii=False, indent=2))
+        return 1 if index.duplicates() else 0
+
+    print(f"📁 {index.data['project']}（同步文件夹: {', '.join(index.data['synchronized']) or '无'}）")
+    print("=" * 40)
+    for name, target in index.targets.items():
+        counts = "，".join(f"{phase} {len(files)}" for phase, files in target["files"].items()) or "无文件"
+        print(f"🎯 {name} ({target['product_type'].rsplit('.', 1)[-1]}): {counts}")
+    orphans = index.orphans()
+    print(f"\n🧩 孤立源文件: {len(orphans)}")
+    for path in orphans:
+        print(f"  - {path}")
+    print(f"🔁 重复引用: {len(index.duplicates())}")
+    for item in index.duplicates():
+        print(f"  - {item['path']} ({item['via']})")
+    if args.bench:
+        print(f"\n⏱️  加载索引 {load_ms:.2f}ms，成员查询 {benchmark(index):.3f}µs/次")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+资源目录 PNG 无损压缩
+对 Life/Widget 的 Assets.xcassets 中的 PNG 重新编码：去掉 EXIF/XMP 等不影响显示的块，
+在可行时降低颜色类型（去掉全不透明的 alpha、灰度、≤256 色的调色板），
+逐一尝试 PNG 行过滤方式和 zlib 策略取最小结果，解码比对像素完全一致后才替换原文件。
+内容相同的文件（imageset/appiconset 中的重复副本）只处理一次；
+已是最优的文件按内容哈希记录，之后不再处理
+
+用法:
+    python3 png_optimizer.py
+    python3 png_optimizer.py --dry-run
+    python3 png_optimizer.py Life/Assets.xcassets/image --workers 2
+"""
+
+import io
+import os
+import sys
+import json
+import zlib
+import struct
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image, ImageChops
+
+from png_validator import PNG_SIGNATURE, classify, validate_paths, print_report
+
+# 项目根目录（脚本所在目录）
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(PROJECT_ROOT, ".cache", "png_optimizer")
+DEFAULT_PATHS = [
+    os.path.join(PROJECT_ROOT, "Life", "Assets.xcassets"),
+    os.path.join(PROJECT_ROOT, "Widget", "Assets.xcassets"),
+]
+
+# 编码策略变化时递增，使旧缓存失效
+OPTIMIZER_VERSION = 1
+
+# 影响显示颜色的辅助块原样保留，其余辅助块（eXIf、iTXt、tEXt、tIME、pHYs 等）去掉
+KEEP_CHUNKS = (b"iCCP", b"sRGB", b"gAMA", b"cHRM")
+
+# PNG 颜色类型
+COLOR_TYPES = {"L": 0, "RGB": 2, "RGBA": 6}
+
+# 行过滤方式：0 无、1 Sub、2 Up、3 Average；"adaptive" 为逐行取最优
+# （含 Paeth 的逐行自适应由 Pillow 的编码器负责）
+FILTERS = [0, 1, 2, 3, "adaptive"]
+ZLIB_STRATEGIES = [zlib.Z_DEFAULT_STRATEGY, zlib.Z_FILTERED]
+
+# 逐行选过滤方式的代价：字节按有符号数取绝对值（常用的最小绝对值和启发式）
+ABS_SIGNED_LUT = [min(value, 256 - value) for value in range(256)]
+
+
+def read_chunks(data):
+    """PNG 字节 → [(块类型, 块数据)]"""
+    if not data.startswith(PNG_SIGNATURE):
+        raise ValueError("不是PNG文件")
+    chunks = []
+    pos = len(PNG_SIGNATURE)
+    while pos + 8 <= len(data):
+        length, chunk_type = struct.unpack(">I4s", data[pos:pos + 8])
+        chunks.append((chunk_type, data[pos + 8:pos + 8 + length]))
+        pos += 12 + length
+        if chunk_type == b"IEND":
+            break
+    return chunks
+
+
+def write_png(chunks):
+    """[(块类型, 块数据)] → PNG 字节"""
+    parts = [PNG_SIGNATURE]
+    for chunk_type, payload in chunks:
+        parts.append(struct.pack(">I", len(payload)))
+        parts.append(chunk_type)
+        parts.append(payload)
+        parts.append(struct.pack(">I", zlib.crc32(chunk_type + payload) & 0xFFFFFFFF))
+    return b"".join(parts)
+
+
+def assemble(encoded, kept):
+    """
+    把候选编码（IHDR、PLTE、tRNS、合并后的 IDAT）和保留的颜色块组装成文件
+    颜色块必须位于 PLTE 和 IDAT 之前
+    """
+    chunks = [(b"IHDR", encoded[b"IHDR"])] + kept
+    for chunk_type in (b"PLTE", b"tRNS"):
+        if chunk_type in encoded:
+            chunks.append((chunk_type, encoded[chunk_type]))
+    chunks.append((b"IDAT", encoded[b"IDAT"]))
+    chunks.append((b"IEND", b""))
+    return write_png(chunks)
+
+
+def reduced_images(image, icon):
+    """
+    列出像素等价、颜色类型更小的候选图像
+    App 图标必须是不带 alpha 的 RGB（见 png_validator.RULES），不做灰度/调色板转换
+    """
+    if image.mode not in ("L", "LA", "RGB", "RGBA", "P"):
+        image = image.convert("RGBA")
+    candidates = [image]
+
+    if image.mode in ("RGBA", "LA") and image.getchannel("A").getextrema() == (255, 255):
+        image = image.convert(image.mode[:-1])
+        candidates.append(image)
+    if icon:
+        return candidates
+
+    if image.mode in ("RGB", "RGBA"):
+        red, green, blue = image.split()[:3]
+        if ImageChops.difference(red, green).getbbox() is None and \
+                ImageChops.difference(red, blue).getbbox() is None:
+            candidates.append(image.convert("LA" if image.mode == "RGBA" else "L"))
+
+    colors = image.getcolors(256) if image.mode != "P" else None
+    if colors:
+        if image.mode == "RGB":
+            # 按出现次数排序的精确调色板
+            palette_image = Image.new("P", (1, 1))
+            palette = [channel for _, color in sorted(colors, reverse=True) for channel in color]
+            palette_image.putpalette(palette)
+            candidates.append(image.quantize(palette=palette_image, dither=Image.Dither.NONE))
+        elif image.mode == "RGBA":
+            candidates.append(image.quantize(colors=len(colors), method=Image.Quantize.FASTOCTREE,
+                                             dither=Image.Dither.NONE))
+    return candidates
+
+
+def filtered_planes(image):
+    """用图像运算一次算出整幅图的 Sub/Up/Average 过滤结果（逐字节模 256）"""
+    width, height = image.size
+    left = Image.new(image.mode, image.size, 0)
+    left.paste(image.crop((0, 0, width - 1, height)), (1, 0))
+    up = Image.new(image.mode, image.size, 0)
+    up.paste(image.crop((0, 0, width, height - 1)), (0, 1))
+    average = ImageChops.add(left, up, scale=2.0)
+    return {
+        0: image.tobytes(),
+        1: ImageChops.subtract_modulo(image, left).tobytes(),
+        2: ImageChops.subtract_modulo(image, up).tobytes(),
+        3: ImageChops.subtract_modulo(image, average).tobytes(),
+    }
+
+
+def row_costs(plane, row_bytes, height):
+    """每行过滤结果的平均绝对值（在 C 中完成的逐行求和）"""
+    costs = Image.frombytes("L", (row_bytes, height), plane).point(ABS_SIGNED_LUT)
+    return costs.reduce((row_bytes, 1)).tobytes()
+
+
+def custom_encodings(image):
+    """对 L/RGB/RGBA 图像按每种过滤方式和 zlib 策略编码，逐个产出 {块类型: 数据}"""
+    width, height = image.size
+    row_bytes = width * len(image.getbands())
+    planes = filtered_planes(image)
+    header = struct.pack(">IIBBBBB", width, height, 8, COLOR_TYPES[image.mode], 0, 0, 0)
+
+    costs = {f: row_costs(plane, row_bytes, height) for f, plane in planes.items()}
+    for filter_type in FILTERS:
+        raw = bytearray()
+        for y in range(height):
+            if filter_type == "adaptive":
+                row_filter = min(planes, key=lambda f: costs[f][y])
+            else:
+                row_filter = filter_type
+            start = y * row_bytes
+            raw.append(row_filter)
+            raw += planes[row_filter][start:start + row_bytes]
+        for strategy in ZLIB_STRATEGIES:
+            compressor = zlib.compressobj(9, zlib.DEFLATED, 15, 9, strategy)
+            yield {b"IHDR": header, b"IDAT": compressor.compress(bytes(raw)) + compressor.flush()}
+
+
+def pillow_encoding(image, strategy):
+    """Pillow 自身的编码（optimize=True，逐行自适应过滤含 Paeth），调色板/灰度+alpha 图像只用这一种"""
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", optimize=True, compress_type=strategy)
+    encoded = {}
+    for chunk_type, payload in read_chunks(buffer.getvalue()):
+        if chunk_type == b"IDAT":
+            encoded[b"IDAT"] = encoded.get(b"IDAT", b"") + payload
+        elif chunk_type in (b"IHDR", b"PLTE", b"tRNS"):
+            encoded[chunk_type] = payload
+    return encoded
+
+
+def pixels_equal(data, reference):
+    """解码候选文件，与原图逐像素比对（统一转为 RGBA）"""
+    with Image.open(io.BytesIO(data)) as decoded:
+        return ImageChops.difference(decoded.convert("RGBA"), reference).getbbox() is None
+
+
+def optimize_png(data, icon=False):
+    """
+    返回 (新文件字节或 None, 说明)；只有比原文件小且像素完全一致时才返回新字节
+    """
+    kept = [(t, payload) for t, payload in read_chunks(data) if t in KEEP_CHUNKS]
+    with Image.open(io.BytesIO(data)) as original:
+        original.load()
+        reference = original.convert("RGBA")
+        images = reduced_images(original, icon)
+
+    results = []
+    for image in images:
+        for strategy in ZLIB_STRATEGIES:
+            results.append((assemble(pillow_encoding(image, strategy), kept), f"{image.mode} pillow"))
+        if image.mode in COLOR_TYPES:
+            for encoded in custom_encodings(image):
+                results.append((assemble(encoded, kept), image.mode))
+
+    results.sort(key=lambda item: len(item[0]))
+    for candidate, description in results:
+        if len(candidate) >= len(data):
+            break
+        if pixels_equal(candidate, reference):
+            return candidate, description
+    return None, "已是最优"
+
+
+def _optimize_task(task):
+    """进程池任务：(内容哈希, 文件字节, 是否图标) → (内容哈希, 新字节或 None, 说明)"""
+    digest, data, icon = task
+    try:
+        optimized, description = optimize_png(data, icon)
+    except Exception as e:
+        return digest, None, f"处理失败: {e}"
+    return digest, optimized, description
+
+
+def content_hash(data):
+    return hashlib.sha256(data + f":{OPTIMIZER_VERSION}".encode()).hexdigest()
+
+
+class OptimalCache:
+    """已是最优的文件内容哈希 → 文件大小"""
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.path = os.path.join(CACHE_DIR, "optimal.json")
+        self.entries = {}
+        if enabled and os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def __contains__(self, digest):
+        return self.enabled and digest in self.entries
+
+    def add(self, digest, size):
+        self.entries[digest] = size
+
+    def save(self):
+        if not self.enabled:
+            return
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, indent=1)
+
+
+def optimize_paths(paths, workers=None, dry_run=False, use_cache=True):
+    """
+    优化路径中的全部资源 PNG，返回 [(路径, 原大小, 新大小)]（新大小为 None 表示未改动）
+    """
+    # png_validator 只收集 appiconset 下的图标，资源目录中的其他图片需要自己收集
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, names in os.walk(path):
+                dirs.sort()
+                files.extend(os.path.join(root, name) for name in sorted(names) if name.lower().endswith(".png"))
+        elif os.path.isfile(path):
+            files.append(path)
+
+    cache = OptimalCache(enabled=use_cache)
+    groups = {}
+    contents = {}
+    for path in files:
+        with open(path, "rb") as f:
+            data = f.read()
+        digest = content_hash(data)
+        groups.setdefault(digest, []).append(path)
+        contents[digest] = data
+
+    tasks = []
+    for digest, group in groups.items():
+        if digest in cache:
+            continue
+        icon = any(".appiconset" in path for path in group)
+        tasks.append((digest, contents[digest], icon))
+
+    skipped = len(groups) - len(tasks)
+    print(f"📦 {len(files)} 个PNG，{len(groups)} 种内容，{skipped} 种已是最优（缓存），待处理 {len(tasks)} 种")
+
+    if workers == 1 or len(tasks) <= 1:
+        outcomes = [_optimize_task(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            outcomes = list(executor.map(_optimize_task, tasks))
+
+    report = [(path, len(contents[digest]), None) for digest in groups if digest in cache for path in groups[digest]]
+    for digest, optimized, description in outcomes:
+        group = groups[digest]
+        original_size = len(contents[digest])
+        names = "、".join(os.path.relpath(path, PROJECT_ROOT) for path in group)
+        if optimized is None:
+            print(f"➖ {names}: {description}")
+            if not description.startswith("处理失败"):
+                cache.add(digest, original_size)
+            report.extend((path, original_size, None) for path in group)
+            continue
+
+        saved = original_size - len(optimized)
+        print(f"✅ {names}: {original_size / 1024:.1f}KB → {len(optimized) / 1024:.1f}KB "
+              f"(-{saved / original_size:.1%}, {description})")
+        if not dry_run:
+            for path in group:
+                with open(path, "wb") as f:
+                    f.write(optimized)
+            cache.add(content_hash(optimized), len(optimized))
+        report.extend((path, original_size, len(optimized)) for path in group)
+
+    if not dry_run:
+        cache.save()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="资源目录 PNG 无损压缩（像素校验 + 内容哈希缓存）")
+    parser.add_argument("paths", nargs="*", help="文件或目录，默认为 Life/Widget 的 Assets.xcassets")
+    parser.add_argument("--workers", type=int, default=None, help="并行进程数，1 为单进程")
+    parser.add_argument("--dry-run", action="store_true", help="只报告可节省的大小，不改写文件")
+    parser.add_argument("--no-cache", action="store_true", help="忽略已是最优的记录，全部重新处理")
+    args = parser.parse_args()
+
+    paths = [os.path.abspath(p) for p in args.paths] if args.paths else DEFAULT_PATHS
+
+    print("🗜️  资源目录 PNG 无损压缩")
+    print("=" * 40)
+    report = optimize_paths(paths, workers=args.workers, dry_run=args.dry_run, use_cache=not args.no_cache)
+    if not report:
+        print("⚠️  未找到PNG文件")
+        return 1
+
+    before = sum(original for _, original, _ in report)
+    after = sum(new if new is not None else original for _, original, new in report)
+    print("\n" + "=" * 40)
+    verb = "可节省" if args.dry_run else "节省"
+    print(f"📉 {before / 1024:.1f}KB → {after / 1024:.1f}KB，{verb} {(before - after) / 1024:.1f}KB")
+
+    # 改写后的图标仍需满足 App Store 的要求
+    changed_icons = [path for path, _, new in report if new is not None and classify(path) == "icon"]
+    if changed_icons and not args.dry_run:
+        return 1 if print_report(validate_paths(changed_icons)) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
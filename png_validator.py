@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+App Store Connect 截屏和图标的PNG校验
+只读取IDAT之前的PNG块头（IHDR、tRNS、iCCP、sRGB等），不解码像素，
+多线程并行检查尺寸、alpha通道、颜色类型、位深、ICC配置和文件大小
+"""
+
+import os
+import sys
+import json
+import time
+import struct
+import argparse
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+# 项目根目录（脚本所在目录）
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# PNG 颜色类型
+COLOR_TYPES = {0: "灰度", 2: "RGB", 3: "调色板", 4: "灰度+alpha", 6: "RGBA"}
+ALPHA_COLOR_TYPES = (4, 6)
+
+# App Store Connect 接受的截屏尺寸（竖屏，横屏为宽高互换）
+SCREENSHOT_SIZES = {
+    "iPhone 6.9\"": [(1320, 2868), (1290, 2796), (1260, 2736)],
+    "iPhone 6.5\"": [(1242, 2688), (1284, 2778)],
+    "iPhone 6.3\"": [(1206, 2622), (1179, 2556)],
+    "iPhone 6.1\"": [(1170, 2532), (1125, 2436), (1080, 2340)],
+    "iPhone 5.5\"": [(1242, 2208)],
+    "iPad 13\"": [(2064, 2752), (2048, 2732)],
+    "iPad 11\"": [(1488, 2266), (1668, 2420), (1668, 2388), (1640, 2360)],
+}
+
+# 可接受的嵌入色彩配置名称（小写匹配）
+ACCEPTED_ICC_PROFILES = ("srgb", "display p3")
+
+# 各类资源的校验规则
+RULES = {
+    "screenshot": {"color_types": (2, 3), "bit_depths": (8,), "max_mb": 10},
+    "icon": {"sizes": [(1024, 1024)], "color_types": (2,), "bit_depths": (8,), "max_mb": 10},
+}
+
+DEFAULT_PATHS = [
+    os.path.join(PROJECT_ROOT, "AppStoreImages"),
+    os.path.join(PROJECT_ROOT, "Life", "Assets.xcassets"),
+]
+
+PngHeader = namedtuple("PngHeader", "width height bit_depth color_type interlace "
+                                    "has_trns icc_profile srgb apple_cgbi file_size")
+ValidationResult = namedtuple("ValidationResult", "path kind header errors warnings")
+
+
+def read_png_header(path):
+    """读取PNG块头直到第一个IDAT，返回 PngHeader；不是PNG时抛出 ValueError"""
+    with open(path, "rb") as f:
+        file_size = os.fstat(f.fileno()).st_size
+        if f.read(8) != PNG_SIGNATURE:
+            raise ValueError("不是PNG文件")
+
+        ihdr = None
+        has_trns = False
+        icc_profile = None
+        srgb = False
+        apple_cgbi = False
+        while True:
+            chunk_header = f.read(8)
+            if len(chunk_header) < 8:
+                break
+            length, chunk_type = struct.unpack(">I4s", chunk_header)
+            if chunk_type == b"IHDR":
+                ihdr = struct.unpack(">IIBBBBB", f.read(13))
+                f.seek(length - 13 + 4, 1)
+            elif chunk_type == b"iCCP":
+                # 配置名称以 \0 结尾，最长79字节
+                data = f.read(min(length, 80))
+                icc_profile = data.split(b"\0", 1)[0].decode("latin-1")
+                f.seek(length - len(data) + 4, 1)
+            elif chunk_type in (b"IDAT", b"IEND"):
+                break
+            else:
+                if chunk_type == b"tRNS":
+                    has_trns = True
+                elif chunk_type == b"sRGB":
+                    srgb = True
+                elif chunk_type == b"CgBI":
+                    apple_cgbi = True
+                f.seek(length + 4, 1)
+
+    if ihdr is None:
+        raise ValueError("缺少IHDR块")
+    width, height, bit_depth, color_type, _, _, interlace = ihdr
+    return PngHeader(width, height, bit_depth, color_type, interlace,
+                     has_trns, icc_profile, srgb, apple_cgbi, file_size)
+
+
+def classify(path):
+    """按路径判断资源类型：appiconset 下为图标，资源目录中的其他图片不校验，其余为截屏"""
+    if ".appiconset" in path:
+        return "icon"
+    if ".xcassets" in path:
+        return None
+    return "screenshot"
+
+
+def screenshot_device(width, height):
+    """返回匹配尺寸的设备类别，不匹配时返回 None"""
+    size = (min(width, height), max(width, height))
+    for device, sizes in SCREENSHOT_SIZES.items():
+        if size in sizes:
+            return device
+    return None
+
+
+def validate_file(path, max_mb=None):
+    """校验单个文件，返回 ValidationResult"""
+    kind = classify(path)
+    rules = RULES[kind]
+    errors = []
+    warnings = []
+
+    try:
+        header = read_png_header(path)
+    except (OSError, ValueError, struct.error) as e:
+        return ValidationResult(path, kind, None, [f"无法读取: {e}"], [])
+
+    if header.apple_cgbi:
+        errors.append("Xcode 压缩的 CgBI 格式，不是标准PNG")
+
+    if kind == "icon":
+        if (header.width, header.height) not in rules["sizes"]:
+            allowed = ", ".join(f"{w}x{h}" for w, h in rules["sizes"])
+            errors.append(f"尺寸 {header.width}x{header.height} 不符合要求（{allowed}）")
+    elif screenshot_device(header.width, header.height) is None:
+        errors.append(f"尺寸 {header.width}x{header.height} 不属于任何设备类别")
+
+    if header.color_type in ALPHA_COLOR_TYPES or header.has_trns:
+        errors.append("包含alpha通道或透明度")
+    if header.color_type not in rules["color_types"]:
+        name = COLOR_TYPES.get(header.color_type, str(header.color_type))
+        errors.append(f"颜色类型为{name}，应为 " +
+                      "/".join(COLOR_TYPES[t] for t in rules["color_types"]))
+    if header.bit_depth not in rules["bit_depths"]:
+        errors.append(f"位深为 {header.bit_depth}，应为 " +
+                      "/".join(str(b) for b in rules["bit_depths"]))
+
+    limit_mb = max_mb if max_mb is not None else rules["max_mb"]
+    if header.file_size > limit_mb * 1024 * 1024:
+        errors.append(f"文件大小 {header.file_size / 1024 / 1024:.1f}MB 超过 {limit_mb}MB")
+
+    if header.icc_profile is not None and \
+            not any(name in header.icc_profile.lower() for name in ACCEPTED_ICC_PROFILES):
+        warnings.append(f"嵌入的色彩配置 \"{header.icc_profile}\" 不是 sRGB 或 Display P3")
+    if header.interlace:
+        warnings.append("使用了隔行扫描")
+
+    return ValidationResult(path, kind, header, errors, warnings)
+
+
+def collect_pngs(paths):
+    """收集路径（文件或目录，递归）中的所有PNG文件"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, names in os.walk(path):
+                dirs.sort()
+                files.extend(os.path.join(root, name) for name in sorted(names)
+                             if name.lower().endswith(".png") and not name.endswith("_backup.png"))
+        elif os.path.isfile(path):
+            files.append(path)
+    return [path for path in files if classify(path) is not None]
+
+
+def validate_paths(paths, workers=8, max_mb=None):
+    """并行校验所有PNG，返回按路径顺序排列的 ValidationResult 列表"""
+    files = collect_pngs(paths)
+    if not files:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(files)))) as executor:
+        return list(executor.map(lambda path: validate_file(path, max_mb), files))
+
+
+def print_report(results, verbose=False):
+    """打印校验结果，返回错误数量"""
+    error_count = 0
+    warning_count = 0
+    for result in results:
+        error_count += len(result.errors)
+        warning_count += len(result.warnings)
+        if not result.errors and not result.warnings and not verbose:
+            continue
+        path = os.path.relpath(result.path, PROJECT_ROOT)
+        status = "❌" if result.errors else ("⚠️ " if result.warnings else "✅")
+        header = result.header
+        detail = ""
+        if header is not None:
+            detail = (f" ({header.width}x{header.height}, "
+                      f"{COLOR_TYPES.get(header.color_type, header.color_type)}, "
+                      f"{header.bit_depth}bit, {header.file_size / 1024 / 1024:.1f}MB)")
+        print(f"{status} {path}{detail}")
+        for message in result.errors:
+            print(f"    错误: {message}")
+        for message in result.warnings:
+            print(f"    警告: {message}")
+
+    icons = sum(1 for r in results if r.kind == "icon")
+    print(f"\n🔍 校验了 {len(results)} 个PNG（{icons} 个图标，{len(results) - icons} 张截屏）："
+          f"{error_count} 个错误，{warning_count} 个警告")
+    return error_count
+
+
+def result_to_dict(result):
+    """转换为可写入JSON的字典，截屏附带匹配的设备类别"""
+    header = result.header
+    return {"path": os.path.abspath(result.path), "kind": result.kind,
+            "header": header._asdict() if header else None,
+            "device": screenshot_device(header.width, header.height)
+            if header and result.kind == "screenshot" else None,
+            "errors": result.errors, "warnings": result.warnings}
+
+
+def write_manifest(results, path):
+    """写出校验清单，供上传工具只上传通过校验的文件"""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                   "files": [result_to_dict(r) for r in results]}, f, ensure_ascii=False, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="校验App Store截屏和图标PNG（只读取块头）")
+    parser.add_argument("paths", nargs="*", help="要校验的文件或目录，默认为 AppStoreImages 和 Life/Assets.xcassets")
+    parser.add_argument("--workers", type=int, default=8, help="并行线程数")
+    parser.add_argument("--max-size-mb", type=float, default=None, help="文件大小上限（MB），默认 10")
+    parser.add_argument("--json", action="store_true", help="以JSON格式输出结果")
+    parser.add_argument("--verbose", "-v", action="store_true", help="同时列出通过校验的文件")
+    parser.add_argument("--manifest", help="把校验结果写入该JSON清单（供 screenshot_uploader.py 使用）")
+    args = parser.parse_args()
+
+    results = validate_paths(args.paths or DEFAULT_PATHS, args.workers, args.max_size_mb)
+    if args.manifest:
+        write_manifest(results, args.manifest)
+    if args.json:
+        print(json.dumps([result_to_dict(r) for r in results], ensure_ascii=False, indent=2))
+        error_count = sum(len(r.errors) for r in results)
+    else:
+        error_count = print_report(results, args.verbose)
+    sys.exit(1 if error_count else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,462 @@
+#!/usr/bin/env python3
+"""
+发布流水线
+把 build_and_upload.sh / quick_build.sh 中串行执行的步骤（图标、去 alpha、资源压缩、截屏、
+Swift 检查、版本号、Archive、导出、校验、上传）描述为带输入/输出的有向无环图：
+互不依赖的步骤并发执行；输入内容哈希与上次成功运行一致的步骤直接跳过；
+运行结束后按实际耗时计算关键路径，写入 .cache/pipeline/last_run.json
+
+用法:
+    python3 release_pipeline.py                          # 全部默认步骤（含上传 TestFlight）
+    python3 release_pipeline.py --build-only             # 不上传
+    python3 release_pipeline.py --steps screenshots,validate,lint
+    python3 release_pipeline.py --plan                   # 只显示执行计划
+    python3 release_pipeline.py --force archive          # 强制重跑某些步骤
+
+上传步骤从环境变量 APPLE_ID、APP_SPECIFIC_PASSWORD 读取凭据
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import argparse
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from pbxproj_index import load_index
+
+# 项目根目录（脚本所在目录）
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(PROJECT_ROOT, ".cache", "pipeline")
+LOG_DIR = os.path.join(CACHE_DIR, "logs")
+
+PYTHON = sys.executable
+MAFU = [PYTHON, "mafu.py"]
+
+# 计算输入哈希时忽略的文件和目录
+IGNORED_NAMES = {"__pycache__", ".DS_Store", "xcuserdata"}
+
+# 只读 Swift 代码的步骤以各 target 实际编译的文件为输入（来自 project.pbxproj 索引），
+# 不依赖资源目录，避免被图标/资源步骤串行化
+SWIFT_CODE = load_index().sources()
+
+
+class Step:
+    """
+    流水线步骤
+    inputs/outputs: 相对项目根目录的文件或目录；after: 显式依赖的步骤名
+    requires: 需要的命令行工具，缺少时该步骤及其下游标记为不可用
+    optional: 不在默认目标中，只有通过 --steps 指定时才执行
+    """
+
+    def __init__(self, name, command, description, inputs=(), outputs=(), after=(),
+                 requires=(), env=(), optional=False):
+        self.name = name
+        self.command = command
+        self.description = description
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.after = list(after)
+        self.requires = list(requires)
+        self.env = list(env)
+        self.optional = optional
+
+
+STEPS = [
+    # icons 和 fix-alpha 会改写已发布的图标，只在显式指定时运行
+    Step("icons", MAFU + ["alt-icons", "--install"], "按 AppIconDesign 渲染并安装应用图标",
+         inputs=["app_icon_engine.py"], outputs=["Life/Assets.xcassets/logo"], optional=True),
+    Step("fix-alpha", MAFU + ["fix-alpha"], "去除应用图标的alpha通道",
+         inputs=["fix_icon_python.py", "Life/Assets.xcassets/image/AppIcon.imageset",
+                 "Life/Assets.xcassets/logo/AppIcon.appiconset"],
+         outputs=["Life/Assets.xcassets/image/AppIcon.imageset", "Life/Assets.xcassets/logo/AppIcon.appiconset"],
+         optional=True),
+    Step("optimize-assets", MAFU + ["optimize-assets"], "资源目录PNG无损压缩",
+         inputs=["png_optimizer.py", "Life/Assets.xcassets", "Widget/Assets.xcassets"],
+         outputs=["Life/Assets.xcassets", "Widget/Assets.xcassets"]),
+    Step("screenshots", MAFU + ["screenshots"], "生成App Store截屏",
+         inputs=["create_real_image_app_store_images.py", "create_advanced_app_store_images.py",
+                 "layout_engine.py", "chart_renderer.py", "shared_assets.py", "Life/Assets.xcassets/image"],
+         outputs=["AppStoreImages"]),
+    Step("lint", MAFU + ["lint"], "手动检查Swift常见错误",
+         inputs=["manual_swift_check.py"] + SWIFT_CODE),
+    Step("parse", MAFU + ["parse"], "swiftc语法检查",
+         inputs=["check_swift_errors.py"] + SWIFT_CODE, requires=["swiftc"]),
+    Step("typecheck-cost", MAFU + ["typecheck-cost"], "类型检查耗时预测",
+         inputs=["swift_typecheck_cost.py"] + SWIFT_CODE),
+    Step("validate", MAFU + ["validate", "--manifest", "build/screenshot_manifest.json"],
+         "校验截屏和图标", inputs=["png_validator.py", "AppStoreImages", "Life/Assets.xcassets"],
+         outputs=["build/screenshot_manifest.json"]),
+    Step("bump-version", ["xcrun", "agvtool", "next-version", "-all"], "递增构建号",
+         inputs=["Life", "Widget"], outputs=["Life.xcodeproj"], requires=["xcrun"]),
+    Step("archive", ["xcodebuild", "archive", "-project", "Life.xcodeproj", "-scheme", "Life",
+                     "-configuration", "Release", "-archivePath", "build/Life.xcarchive",
+                     "-destination", "generic/platform=iOS", "CODE_SIGN_STYLE=Automatic"],
+         "创建Archive", inputs=["Life", "Widget", "Life.xcodeproj"], outputs=["build/Life.xcarchive"],
+         after=["bump-version"], requires=["xcodebuild"]),
+    Step("export", ["xcodebuild", "-exportArchive", "-archivePath", "build/Life.xcarchive",
+                    "-exportPath", "build/Export", "-exportOptionsPlist", "ExportOptions.plist"],
+         "导出IPA", inputs=["build/Life.xcarchive", "ExportOptions.plist"], outputs=["build/Export"],
+         requires=["xcodebuild"]),
+    Step("upload", ["sh", "-c", 'xcrun altool --upload-app -f "$(ls build/Export/*.ipa | head -1)" '
+                                '-u "$APPLE_ID" -p "$APP_SPECIFIC_PASSWORD"'],
+         "上传到TestFlight", inputs=["build/Export"], after=["lint", "parse", "validate"],
+         requires=["xcrun"], env=["APPLE_ID", "APP_SPECIFIC_PASSWORD"]),
+    Step("upload-screenshots", MAFU + ["upload-screenshots", "--manifest", "build/screenshot_manifest.json"],
+         "上传截屏到App Store Connect", inputs=["AppStoreImages", "build/screenshot_manifest.json"],
+         env=["ASC_TOKEN"], optional=True),
+]
+
+
+def overlaps(path, other):
+    """两个相对路径相同，或一个是另一个的上级目录"""
+    path = path.rstrip("/") + "/"
+    other = other.rstrip("/") + "/"
+    return path.startswith(other) or other.startswith(path)
+
+
+def build_graph(steps):
+    """
+    依赖关系 = 显式 after + 推断：输入与之前步骤的输出重叠时依赖该步骤
+    （按 STEPS 中的声明顺序推断，因此同一文件的多个写入者按声明顺序串行）
+    """
+    names = {step.name for step in steps}
+    dependencies = {step.name: set(d for d in step.after if d in names) for step in steps}
+    for index, step in enumerate(steps):
+        for earlier in steps[:index]:
+            touches = [o for o in earlier.outputs for path in step.inputs + step.outputs if overlaps(path, o)]
+            if touches:
+                dependencies[step.name].add(earlier.name)
+    return dependencies
+
+
+def select_steps(steps, targets, build_only):
+    """目标步骤及其全部上游；未指定目标时为所有非可选步骤，可选步骤只在显式指定时运行，不作为上游带入"""
+    by_name = {step.name: step for step in steps}
+    if targets:
+        unknown = [name for name in targets if name not in by_name]
+        if unknown:
+            raise ValueError(f"未知步骤: {', '.join(unknown)}")
+        wanted = set(targets)
+    else:
+        wanted = {step.name for step in steps if not step.optional}
+        if build_only:
+            wanted.discard("upload")
+
+    dependencies = build_graph(steps)
+    pending = list(wanted)
+    while pending:
+        name = pending.pop()
+        for dependency in dependencies[name]:
+            if dependency not in wanted and not by_name[dependency].optional:
+                wanted.add(dependency)
+                pending.append(dependency)
+    selected = [step for step in steps if step.name in wanted]
+    return selected, {step.name: dependencies[step.name] & wanted for step in selected}
+
+
+class InputHasher:
+    """输入内容哈希；单个文件的哈希按 (路径, 大小, 修改时间) 记住，避免重复读取 Archive 等大目录"""
+
+    def __init__(self):
+        self.path = os.path.join(CACHE_DIR, "file_hashes.json")
+        self.index = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self.index = json.load(f)
+            except (OSError, ValueError):
+                self.index = {}
+
+    def file_hash(self, path):
+        stat = os.stat(path)
+        key = f"{path}:{stat.st_size}:{stat.st_mtime_ns}"
+        digest = self.index.get(key)
+        if digest is None:
+            hasher = hashlib.sha256()
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(1024 * 1024), b""):
+                    hasher.update(block)
+            digest = hasher.hexdigest()
+            self.index[key] = digest
+        return digest
+
+    def step_hash(self, step):
+        """命令 + 所需环境变量名 + 全部输入文件（相对路径和内容）"""
+        hasher = hashlib.sha256(json.dumps([step.command, step.env]).encode())
+        for relative in sorted(step.inputs):
+            full_path = os.path.join(PROJECT_ROOT, relative)
+            if os.path.isfile(full_path):
+                files = [full_path]
+            elif os.path.isdir(full_path):
+                files = []
+                for root, dirs, names in os.walk(full_path):
+                    dirs[:] = sorted(d for d in dirs if d not in IGNORED_NAMES)
+                    files.extend(os.path.join(root, n) for n in sorted(names) if n not in IGNORED_NAMES)
+            else:
+                hasher.update(f"{relative}:missing".encode())
+                continue
+            for path in files:
+                hasher.update(os.path.relpath(path, PROJECT_ROOT).encode())
+                hasher.update(self.file_hash(path).encode())
+        return hasher.hexdigest()
+
+    def save(self):
+        # 只保留仍然存在的文件，防止索引无限增长
+        live = {key: value for key, value in self.index.items() if os.path.exists(key.rsplit(":", 2)[0])}
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(live, f)
+
+
+def load_state():
+    path = os.path.join(CACHE_DIR, "state.json")
+    if os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            pass
+    return {}
+
+
+def save_state(state):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(os.path.join(CACHE_DIR, "state.json"), "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+
+
+def unavailable_reason(step):
+    """缺少工具或环境变量时返回原因"""
+    missing = [tool for tool in step.requires if shutil.which(tool) is None]
+    if missing:
+        return f"缺少命令: {', '.join(missing)}"
+    missing = [name for name in step.env if not os.environ.get(name)]
+    if missing:
+        return f"缺少环境变量: {', '.join(missing)}"
+    return None
+
+
+def run_command(step):
+    """执行步骤命令，输出写入日志文件，返回 (是否成功, 开始时间, 结束时间)"""
+    os.makedirs(LOG_DIR, exist_ok=True)
+    os.makedirs(os.path.join(PROJECT_ROOT, "build"), exist_ok=True)
+    log_path = os.path.join(LOG_DIR, f"{step.name}.log")
+    started = time.time()
+    with open(log_path, "w", encoding="utf-8") as log:
+        try:
+            returncode = subprocess.run(step.command, cwd=PROJECT_ROOT, stdout=log,
+                                        stderr=subprocess.STDOUT).returncode
+        except OSError as e:
+            log.write(f"{e}\n")
+            returncode = -1
+    return returncode == 0, started, time.time()
+
+
+def log_tail(name, lines=20):
+    with open(os.path.join(LOG_DIR, f"{name}.log"), "r", encoding="utf-8", errors="replace") as f:
+        return f.read().splitlines()[-lines:]
+
+
+def critical_path(dependencies, durations):
+    """按依赖关系和实际耗时计算最长路径，返回 (总时长, [步骤名])"""
+    finish = {}
+    previous = {}
+    remaining = dict(dependencies)
+    while remaining:
+        for name, deps in list(remaining.items()):
+            if all(d in finish for d in deps):
+                start = max((finish[d] for d in deps), default=0.0)
+                previous[name] = max(deps, key=lambda d: finish[d]) if deps else None
+                finish[name] = start + durations.get(name, 0.0)
+                del remaining[name]
+    if not finish:
+        return 0.0, []
+    name = max(finish, key=finish.get)
+    total = finish[name]
+    path = []
+    while name is not None:
+        path.append(name)
+        name = previous[name]
+    return total, path[::-1]
+
+
+class Pipeline:
+    """调度器：依赖完成后提交到线程池，每个步骤在独立子进程中运行"""
+
+    def __init__(self, steps, dependencies, jobs=4, force=()):
+        self.steps = {step.name: step for step in steps}
+        self.order = [step.name for step in steps]
+        self.dependencies = dependencies
+        self.jobs = jobs
+        self.force = set(force)
+        self.hasher = InputHasher()
+        self.state = load_state()
+        self.results = {}
+
+    def is_fresh(self, step):
+        """输入哈希与上次成功运行一致，且输出都存在"""
+        if step.name in self.force:
+            return False
+        recorded = self.state.get(step.name)
+        if not recorded or recorded.get("inputs") != self.hasher.step_hash(step):
+            return False
+        return all(os.path.exists(os.path.join(PROJECT_ROOT, output)) for output in step.outputs)
+
+    def plan(self):
+        """打印执行计划（按依赖层级），不执行"""
+        level = {}
+        for name in self.order:
+            level[name] = max((level[d] + 1 for d in self.dependencies[name]), default=0)
+        for depth in range(max(level.values(), default=-1) + 1):
+            print(f"第 {depth + 1} 层:")
+            for name in self.order:
+                if level[name] != depth:
+                    continue
+                step = self.steps[name]
+                reason = unavailable_reason(step)
+                status = f"⚠️  {reason}" if reason else ("⏭️  无变化" if self.is_fresh(step) else "▶️  执行")
+                deps = f"（依赖 {', '.join(sorted(self.dependencies[name]))}）" if self.dependencies[name] else ""
+                print(f"  {name:<18} {status}  {step.description}{deps}")
+
+    def start(self, executor, name):
+        """开始一个步骤：不可用或无变化时立即完成，否则提交到线程池"""
+        step = self.steps[name]
+        reason = unavailable_reason(step)
+        if reason:
+            self.results[name] = {"status": "unavailable", "reason": reason, "duration": 0.0}
+            print(f"⚠️  {name}: {reason}")
+            return None
+        if self.is_fresh(step):
+            self.results[name] = {"status": "skipped", "duration": 0.0}
+            print(f"⏭️  {name}: 输入无变化，跳过")
+            return None
+        print(f"▶️  {name}: {step.description}")
+        return executor.submit(run_command, step)
+
+    def run(self):
+        waiting = list(self.order)
+        running = {}
+        started = time.time()
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            while waiting or running:
+                progressed = False
+                for name in list(waiting):
+                    deps = self.dependencies[name]
+                    if any(self.results.get(d, {}).get("status") in ("failed", "unavailable", "blocked")
+                           for d in deps):
+                        self.results[name] = {"status": "blocked", "duration": 0.0}
+                        print(f"⛔ {name}: 上游步骤未完成，不执行")
+                        waiting.remove(name)
+                        progressed = True
+                    elif all(d in self.results for d in deps):
+                        waiting.remove(name)
+                        future = self.start(executor, name)
+                        if future is not None:
+                            running[future] = name
+                        progressed = True
+                if progressed or not running:
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    ok, step_start, step_end = future.result()
+                    duration = step_end - step_start
+                    self.results[name] = {"status": "succeeded" if ok else "failed", "duration": duration,
+                                          "start": step_start - started, "end": step_end - started}
+                    if ok:
+                        print(f"✅ {name}: {duration:.1f}s")
+                    else:
+                        print(f"❌ {name}: 失败（{duration:.1f}s），日志: {os.path.relpath(os.path.join(LOG_DIR, name + '.log'), PROJECT_ROOT)}")
+                        for line in log_tail(name):
+                            print(f"    {line}")
+        self.wall_time = time.time() - started
+        self.settle()
+        return self.results
+
+    def settle(self):
+        """
+        全部结束后重新计算成功/跳过步骤的输入哈希并记录
+        （后续步骤可能改写前面步骤的输入，例如资源压缩改写图标；以整次运行结束时的状态为准，
+        否则下次运行会反复触发）
+        """
+        for name in self.order:
+            if self.results[name]["status"] in ("succeeded", "skipped"):
+                self.state[name] = {"inputs": self.hasher.step_hash(self.steps[name]),
+                                    "finished_at": time.strftime("%Y-%m-%dT%H:%M:%S")}
+        save_state(self.state)
+        self.hasher.save()
+
+    def report(self, path=None):
+        """打印并写出耗时报告（关键路径、串行总耗时、实际墙钟时间）"""
+        durations = {name: result["duration"] for name, result in self.results.items()}
+        critical_total, critical_steps = critical_path(self.dependencies, durations)
+        serial_total = sum(durations.values())
+        print(f"⏱️  墙钟 {self.wall_time:.1f}s，串行合计 {serial_total:.1f}s，"
+              f"关键路径 {critical_total:.1f}s: {' → '.join(critical_steps)}")
+
+        report = {
+            "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "wall_time": round(self.wall_time, 3),
+            "serial_time": round(serial_total, 3),
+            "critical_path": {"duration": round(critical_total, 3), "steps": critical_steps},
+            "steps": {name: dict(self.results[name], after=sorted(self.dependencies[name]))
+                      for name in self.order},
+        }
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        for target in filter(None, [os.path.join(CACHE_DIR, "last_run.json"), path]):
+            with open(target, "w", encoding="utf-8") as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+        return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="按依赖关系并发执行发布步骤，输入无变化的步骤跳过")
+    parser.add_argument("--steps", help="逗号分隔的目标步骤（自动包含上游），默认全部非可选步骤")
+    parser.add_argument("--build-only", action="store_true", help="不上传TestFlight")
+    parser.add_argument("--force", default="", help="逗号分隔，强制重跑的步骤")
+    parser.add_argument("--jobs", type=int, default=4, help="同时执行的步骤数（默认4）")
+    parser.add_argument("--plan", action="store_true", help="只显示执行计划")
+    parser.add_argument("--report", help="把耗时报告另存到该JSON文件")
+    parser.add_argument("--list", action="store_true", help="列出全部步骤")
+    args = parser.parse_args()
+
+    if args.list:
+        for step in STEPS:
+            flag = "（可选）" if step.optional else ""
+            print(f"  {step.name:<18} {step.description}{flag}")
+        return 0
+
+    targets = [name.strip() for name in args.steps.split(",") if name.strip()] if args.steps else None
+    try:
+        steps, dependencies = select_steps(STEPS, targets, args.build_only)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 2
+    force = [name.strip() for name in args.force.split(",") if name.strip()]
+
+    print("🚀 发布流水线")
+    print("=" * 40)
+    pipeline = Pipeline(steps, dependencies, jobs=args.jobs, force=force)
+    if args.plan:
+        pipeline.plan()
+        return 0
+
+    results = pipeline.run()
+    print("\n" + "=" * 40)
+    pipeline.report(args.report)
+
+    problems = [name for name, result in results.items() if result["status"] in ("failed", "blocked", "unavailable")]
+    if problems:
+        print(f"⚠️  未完成的步骤: {', '.join(problems)}")
+        return 1
+    print("🎉 流水线完成！")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+App Store截屏常驻渲染服务
+在本地HTTP端口上包装截屏生成器，图片资源、字体和静态图层在请求之间保持在内存中
+
+用法:
+    python3 render_server.py [--host 127.0.0.1] [--port 8765]
+
+接口:
+    GET  /health  服务状态和缓存统计
+    POST /render  JSON请求体:
+        {
+            "generator": "real" | "advanced",       # 默认 real
+            "size": "iphone_67_portrait" | [宽, 高],
+            "type": "home" | "feature" | "widget",  # 默认 home
+            "app_info": {...},                       # 可选，覆盖 app_info 中的字段
+            "colors": {...},                         # 可选，覆盖 colors 中的字段
+            "output": "png" | "path",                # 默认 png，返回PNG字节或保存后返回文件路径
+            "filename": "xxx.png"                    # output 为 path 时可选
+        }
+"""
+
+import os
+import io
+import sys
+import copy
+import json
+import time
+import argparse
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from create_real_image_app_store_images import RealImageAppStoreGenerator
+from create_advanced_app_store_images import AdvancedAppStoreImageGenerator
+from layout_engine import LayoutCache
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+SCREENSHOT_TYPES = ["home", "feature", "widget"]
+
+# App Store Connect 接受的最大截屏尺寸：iPhone 6.9" 1320x2868，iPad 13" 2064x2752
+MAX_LONG_EDGE = 2868
+MAX_SHORT_EDGE = 2064
+
+# 常驻服务中每个生成器缓存的条目上限（渐变和画布都是整张截屏大小的图片）
+CACHE_LIMITS = {
+    "_gradient_cache": 16,
+    "_canvas_cache": 8,
+    "_resize_cache": 64,
+    "_font_cache": 64,
+}
+# 布局缓存的键包含完整的 app_info 覆盖，每种覆盖都会产生新条目
+LAYOUT_CACHE_LIMIT = 128
+
+
+class LRUCache(OrderedDict):
+    """条目数有上限的字典，超出时淘汰最久未使用的条目；接口与生成器使用的 dict 缓存一致"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        super().__init__()
+
+    def get(self, key, default=None):
+        if key in self:
+            self.move_to_end(key)
+            return self[key]
+        return default
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        while len(self) > self.max_entries:
+            self.popitem(last=False)
+
+
+class RenderService:
+    """持有预热的生成器，按请求渲染截屏"""
+
+    def __init__(self, output_path=None):
+        self.generators = {
+            "real": RealImageAppStoreGenerator(output_path=output_path),
+            "advanced": AdvancedAppStoreImageGenerator(output_path=output_path),
+        }
+        self.output_path = self.generators["real"].output_path
+
+        # 不同尺寸和颜色覆盖的请求会不断产生新的缓存条目，常驻服务中改为有上限的缓存
+        for generator in self.generators.values():
+            for name, max_entries in CACHE_LIMITS.items():
+                if hasattr(generator, name):
+                    setattr(generator, name, LRUCache(max_entries))
+            if hasattr(generator, "_layouts"):
+                generator._layouts = LayoutCache(LRUCache(LAYOUT_CACHE_LIMIT))
+
+        # 只解码一次图片资源
+        self.images = {
+            "real": self.generators["real"].load_real_images(),
+            "advanced": self.generators["advanced"].load_images(),
+        }
+        for images in self.images.values():
+            for image in images.values():
+                image.load()
+
+        self.lock = threading.Lock()
+        self.render_count = 0
+
+    def warm_up(self):
+        """预先渲染每种尺寸，填充字体、渐变和缩放缓存"""
+        for name, generator in self.generators.items():
+            for size in generator.sizes.values():
+                for screenshot_type in SCREENSHOT_TYPES:
+                    generator.create_app_screenshot(size, self.images[name], screenshot_type)
+
+    def resolve_size(self, generator, size):
+        """将尺寸名称或 [宽, 高] 转换为元组"""
+        if isinstance(size, str):
+            if size not in generator.sizes:
+                raise ValueError(f"未知尺寸: {size}，可选: {', '.join(generator.sizes)}")
+            return generator.sizes[size]
+        if isinstance(size, (list, tuple)) and len(size) == 2:
+            width, height = int(size[0]), int(size[1])
+            if width <= 0 or height <= 0:
+                raise ValueError(f"无效尺寸: {size}")
+            if max(width, height) > MAX_LONG_EDGE or min(width, height) > MAX_SHORT_EDGE:
+                raise ValueError(f"尺寸超出 App Store 上限 {MAX_SHORT_EDGE}x{MAX_LONG_EDGE}: {width}x{height}")
+            return (width, height)
+        raise ValueError(f"无效尺寸: {size}")
+
+    def prepare_generator(self, name, request):
+        """返回应用了 app_info/colors 覆盖的生成器，缓存与原生成器共享"""
+        if name not in self.generators:
+            raise ValueError(f"未知生成器: {name}，可选: {', '.join(self.generators)}")
+        base = self.generators[name]
+        app_info = request.get("app_info")
+        colors = request.get("colors")
+        if not app_info and not colors:
+            return base
+        generator = copy.copy(base)
+        if app_info:
+            generator.app_info = {**base.app_info, **app_info}
+        if colors:
+            generator.colors = {**base.colors, **colors}
+        return generator
+
+    def render(self, request):
+        """渲染单张截屏，返回 (PIL图片, 建议文件名)"""
+        name = request.get("generator", "real")
+        generator = self.prepare_generator(name, request)
+        size = self.resolve_size(generator, request.get("size", "iphone_67_portrait"))
+        screenshot_type = request.get("type", "home")
+        if screenshot_type not in SCREENSHOT_TYPES:
+            raise ValueError(f"未知截屏类型: {screenshot_type}，可选: {', '.join(SCREENSHOT_TYPES)}")
+
+        with self.lock:
+            image = generator.create_app_screenshot(size, self.images[name], screenshot_type)
+            self.render_count += 1
+
+        filename = request.get("filename") or f"{name}_{size[0]}x{size[1]}_{screenshot_type}.png"
+        return image, os.path.basename(filename)
+
+    def render_png(self, request):
+        """渲染并编码为PNG字节"""
+        image, _ = self.render(request)
+        buffer = io.BytesIO()
+        image.save(buffer, "PNG")
+        return buffer.getvalue()
+
+    def render_to_file(self, request):
+        """渲染并保存到输出目录，返回文件路径"""
+        image, filename = self.render(request)
+        filepath = os.path.join(self.output_path, filename)
+        image.save(filepath, "PNG")
+        return filepath
+
+    def stats(self):
+        """缓存统计"""
+        return {
+            "renders": self.render_count,
+            "images": {name: sorted(images) for name, images in self.images.items()},
+            "fonts": {name: len(g._font_cache) for name, g in self.generators.items()},
+            "gradients": {name: len(g._gradient_cache) for name, g in self.generators.items()},
+        }
+
+
+class RenderRequestHandler(BaseHTTPRequestHandler):
+    """HTTP请求处理"""
+
+    service = None
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self.send_json(200, {"status": "ok", **self.service.stats()})
+        else:
+            self.send_json(404, {"error": f"未知路径: {self.path}"})
+
+    def do_POST(self):
+        if self.path != "/render":
+            self.send_json(404, {"error": f"未知路径: {self.path}"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(request, dict):
+                raise ValueError("请求体必须是JSON对象")
+
+            start = time.perf_counter()
+            if request.get("output", "png") == "path":
+                filepath = self.service.render_to_file(request)
+                elapsed = (time.perf_counter() - start) * 1000
+                self.send_json(200, {"path": filepath, "elapsed_ms": round(elapsed, 1)})
+                return
+
+            png = self.service.render_png(request)
+            elapsed = (time.perf_counter() - start) * 1000
+        except (ValueError, TypeError) as e:
+            self.send_json(400, {"error": str(e)})
+            return
+        except Exception as e:
+            self.send_json(500, {"error": str(e)})
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "image/png")
+        self.send_header("Content-Length", str(len(png)))
+        self.send_header("X-Render-Time-Ms", f"{elapsed:.1f}")
+        self.end_headers()
+        self.wfile.write(png)
+
+    def log_message(self, format, *args):
+        print(f"  {self.address_string()} {format % args}")
+
+
+def request_render(request, host=DEFAULT_HOST, port=DEFAULT_PORT, timeout=60):
+    """客户端：向渲染服务发送请求，返回PNG字节或JSON结果"""
+    import urllib.request
+
+    data = json.dumps(request, ensure_ascii=False).encode("utf-8")
+    http_request = urllib.request.Request(f"http://{host}:{port}/render", data=data,
+                                          headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(http_request, timeout=timeout) as response:
+        body = response.read()
+        if response.headers.get("Content-Type", "").startswith("application/json"):
+            return json.loads(body)
+        return body
+
+
+def main():
+    parser = argparse.ArgumentParser(description="App Store截屏常驻渲染服务")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="监听地址")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="监听端口")
+    parser.add_argument("--output", default=None, help="output 为 path 时的保存目录")
+    parser.add_argument("--no-warm-up", action="store_true", help="启动时不预先渲染")
+    args = parser.parse_args()
+
+    print("🚀 启动渲染服务...")
+    service = RenderService(output_path=args.output)
+    if not args.no_warm_up:
+        start = time.perf_counter()
+        service.warm_up()
+        print(f"🔥 预热完成 ({(time.perf_counter() - start):.1f}s)")
+
+    RenderRequestHandler.service = service
+    server = ThreadingHTTPServer((args.host, args.port), RenderRequestHandler)
+    print(f"✅ 渲染服务已启动: http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 退出")
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
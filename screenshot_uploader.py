@@ -0,0 +1,492 @@
+#!/usr/bin/env python3
+"""
+App Store Connect 截屏并发上传
+读取 AppStoreImages（以及 png_validator.py 生成的校验清单），按设备类别放入截屏组，
+通过 asyncio 并发上传：复用 HTTP 连接、按预约的分块上传、失败时退避重试，
+每一步写入本地日志，中断后再次运行会跳过已完成的文件并续传未完成的分块
+
+用法:
+    python3 screenshot_uploader.py --localization-id <ID> --token <JWT>
+    python3 screenshot_uploader.py --mock [--mock-failure-rate 0.2]   # 使用本地模拟服务离线测试
+"""
+
+import os
+import ssl
+import sys
+import json
+import time
+import random
+import asyncio
+import hashlib
+import argparse
+from urllib.parse import urlsplit
+
+# 项目根目录（脚本所在目录）
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_API_BASE = "https://api.appstoreconnect.apple.com"
+JOURNAL_NAME = ".upload_journal.jsonl"
+
+# png_validator 的设备类别 -> App Store Connect screenshotDisplayType
+DISPLAY_TYPES = {
+    "iPhone 6.9\"": "APP_IPHONE_67",
+    "iPhone 6.5\"": "APP_IPHONE_65",
+    "iPhone 6.3\"": "APP_IPHONE_61",
+    "iPhone 6.1\"": "APP_IPHONE_61",
+    "iPhone 5.5\"": "APP_IPHONE_55",
+    "iPad 13\"": "APP_IPAD_PRO_3GEN_129",
+    "iPad 11\"": "APP_IPAD_PRO_3GEN_11",
+}
+
+RETRYABLE_STATUS = (408, 429, 500, 502, 503, 504)
+
+
+class UploadError(Exception):
+    """不可重试的错误，或重试次数用尽"""
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+class AsyncHTTPClient:
+    """基于 asyncio 流的最小 HTTP/1.1 客户端，按 (协议, 主机, 端口) 复用 keep-alive 连接"""
+
+    def __init__(self, max_idle=8, timeout=60):
+        self.max_idle = max_idle
+        self.timeout = timeout
+        self.idle = {}
+        self.stats = {"connections": 0, "reused": 0, "requests": 0}
+        self._ssl = None
+
+    async def acquire(self, key, fresh=False):
+        idle = self.idle.setdefault(key, [])
+        while idle and not fresh:
+            reader, writer = idle.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                self.stats["reused"] += 1
+                return reader, writer, True
+            writer.close()
+        scheme, host, port = key
+        if scheme == "https" and self._ssl is None:
+            self._ssl = ssl.create_default_context()
+        reader, writer = await asyncio.open_connection(host, port, ssl=self._ssl if scheme == "https" else None)
+        self.stats["connections"] += 1
+        return reader, writer, False
+
+    def release(self, key, connection, reusable):
+        idle = self.idle.setdefault(key, [])
+        if reusable and len(idle) < self.max_idle:
+            idle.append(connection)
+        else:
+            connection[1].close()
+
+    async def request(self, method, url, body=b"", headers=None):
+        """发送请求，返回 (状态码, 响应头字典(小写键), 响应体)"""
+        parts = urlsplit(url)
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        key = (parts.scheme, parts.hostname, port)
+        path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {parts.netloc}",
+                 f"Content-Length: {len(body)}", "Connection: keep-alive"]
+        lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+        payload = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+        self.stats["requests"] += 1
+        reader, writer, reused = await self.acquire(key)
+        try:
+            try:
+                status, response_headers, data = await self.exchange(reader, writer, payload)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                if not reused:
+                    raise
+                # 复用的空闲连接可能已被服务端关闭，换新连接重发一次
+                writer.close()
+                reader, writer, _ = await self.acquire(key, fresh=True)
+                status, response_headers, data = await self.exchange(reader, writer, payload)
+        except BaseException:
+            writer.close()
+            raise
+        reusable = response_headers.get("connection", "").lower() != "close"
+        self.release(key, (reader, writer), reusable)
+        return status, response_headers, data
+
+    async def exchange(self, reader, writer, payload):
+        writer.write(payload)
+        await writer.drain()
+        return await asyncio.wait_for(self.read_response(reader), self.timeout)
+
+    async def read_response(self, reader):
+        status_line = await reader.readuntil(b"\r\n")
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await reader.readuntil(b"\r\n")
+            if line == b"\r\n":
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await reader.readuntil(b"\r\n")).split(b";")[0], 16)
+                if size == 0:
+                    await reader.readuntil(b"\r\n")
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            return status, headers, b"".join(chunks)
+        if "content-length" in headers:
+            return status, headers, await reader.readexactly(int(headers["content-length"]))
+        headers["connection"] = "close"
+        return status, headers, await reader.read()
+
+    async def close(self):
+        for connections in self.idle.values():
+            for _, writer in connections:
+                writer.close()
+        self.idle.clear()
+
+
+class UploadJournal:
+    """追加写入的JSON Lines日志：reserved（预约）/ chunk（分块完成）/ committed（提交完成）/ deleted（旧截屏已删除）"""
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        try:
+                            self.apply(json.loads(line))
+                        except json.JSONDecodeError:
+                            # 中断时可能留下半行
+                            continue
+        self.file = open(path, "a", encoding="utf-8")
+
+    def apply(self, event):
+        name = event["file"]
+        if event["event"] == "reserved":
+            self.entries[name] = {"checksum": event["checksum"], "screenshot_id": event["screenshot_id"],
+                                  "operations": event["operations"], "chunks": set(), "committed": False}
+        elif name in self.entries and event.get("screenshot_id") == self.entries[name]["screenshot_id"]:
+            if event["event"] == "chunk":
+                self.entries[name]["chunks"].add(event["index"])
+            elif event["event"] == "committed":
+                self.entries[name]["committed"] = True
+            elif event["event"] == "deleted":
+                del self.entries[name]
+
+    def record(self, event):
+        self.apply(event)
+        self.file.write(json.dumps(event, ensure_ascii=False) + "\n")
+        self.file.flush()
+
+    def get(self, name, checksum):
+        """返回该文件内容未变化时的日志状态"""
+        entry = self.entries.get(name)
+        return entry if entry and entry["checksum"] == checksum else None
+
+    def close(self):
+        self.file.close()
+
+
+class ScreenshotUploader:
+    """并发上传截屏到一个 appStoreVersionLocalization"""
+
+    def __init__(self, client, api_base, token, localization_id, journal,
+                 concurrency=4, retries=5, backoff=0.5):
+        self.client = client
+        self.api_base = api_base.rstrip("/")
+        self.token = token
+        self.localization_id = localization_id
+        self.journal = journal
+        self.retries = retries
+        self.backoff = backoff
+        self.files = asyncio.Semaphore(concurrency)
+        # 所有请求（包括同一文件的多个分块）共享的并发上限
+        self.requests = asyncio.Semaphore(concurrency * 2)
+        self.stats = {"uploaded": 0, "skipped": 0, "resumed": 0, "replaced": 0, "failed": 0, "retries": 0, "bytes": 0}
+
+    async def call(self, method, url, payload=None, body=None, headers=None, api=True):
+        """发送请求并在可重试错误时指数退避；返回解析后的JSON（或 None）"""
+        headers = dict(headers or {})
+        if api:
+            headers["Authorization"] = f"Bearer {self.token}"
+            url = self.api_base + url
+        if payload is not None:
+            body = json.dumps(payload).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+
+        for attempt in range(self.retries + 1):
+            delay = self.backoff * (2 ** attempt) * (0.5 + random.random())
+            try:
+                async with self.requests:
+                    status, response_headers, data = await self.client.request(method, url, body or b"", headers)
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+                error = UploadError(f"{method} {url}: {e}")
+            else:
+                if 200 <= status < 300:
+                    return json.loads(data) if data else None
+                error = UploadError(f"{method} {url}: HTTP {status} {data[:200].decode('utf-8', 'replace')}",
+                                    status)
+                if status not in RETRYABLE_STATUS:
+                    raise error
+                if "retry-after" in response_headers:
+                    delay = max(delay, float(response_headers["retry-after"]))
+            if attempt == self.retries:
+                raise error
+            self.stats["retries"] += 1
+            await asyncio.sleep(delay)
+
+    async def prepare_sets(self, display_types):
+        """查询已有截屏组，缺少的按设备类型创建，返回 {显示类型: 截屏组id}"""
+        response = await self.call("GET", f"/v1/appStoreVersionLocalizations/{self.localization_id}"
+                                          f"/appScreenshotSets")
+        sets = {item["attributes"]["screenshotDisplayType"]: item["id"] for item in response["data"]}
+        for display_type in sorted(set(display_types) - set(sets)):
+            response = await self.call("POST", "/v1/appScreenshotSets", {"data": {
+                "type": "appScreenshotSets",
+                "attributes": {"screenshotDisplayType": display_type},
+                "relationships": {"appStoreVersionLocalization": {
+                    "data": {"type": "appStoreVersionLocalizations", "id": self.localization_id}}},
+            }})
+            sets[display_type] = response["data"]["id"]
+            print(f"  📁 创建截屏组: {display_type}")
+        return sets
+
+    async def reserve(self, item, set_id):
+        response = await self.call("POST", "/v1/appScreenshots", {"data": {
+            "type": "appScreenshots",
+            "attributes": {"fileName": item["name"], "fileSize": len(item["content"])},
+            "relationships": {"appScreenshotSet": {"data": {"type": "appScreenshotSets", "id": set_id}}},
+        }})
+        data = response["data"]
+        self.journal.record({"event": "reserved", "file": item["key"], "checksum": item["checksum"],
+                             "screenshot_id": data["id"], "operations": data["attributes"]["uploadOperations"]})
+        return self.journal.get(item["key"], item["checksum"])
+
+    async def delete_superseded(self, item):
+        """文件内容变化时删除日志中的旧截屏，避免重新上传后截屏组中留下重复（每组最多10张）"""
+        entry = self.journal.entries.get(item["key"])
+        if entry is None:
+            return
+        try:
+            await self.call("DELETE", f"/v1/appScreenshots/{entry['screenshot_id']}")
+        except UploadError as e:
+            if e.status not in (404, 410):
+                raise
+        self.journal.record({"event": "deleted", "file": item["key"], "screenshot_id": entry["screenshot_id"]})
+        self.stats["replaced"] += 1
+
+    async def upload_chunk(self, item, entry, index, operation):
+        offset = operation["offset"]
+        chunk = item["content"][offset:offset + operation["length"]]
+        headers = {header["name"]: header["value"] for header in operation.get("requestHeaders") or []}
+        await self.call(operation["method"], operation["url"], body=chunk, headers=headers, api=False)
+        self.journal.record({"event": "chunk", "file": item["key"],
+                             "screenshot_id": entry["screenshot_id"], "index": index})
+        self.stats["bytes"] += len(chunk)
+
+    async def check_reservation(self, item, entry, set_id):
+        """确认日志中的预约仍然有效；已完成时记录提交并返回 None，失效时重新预约"""
+        try:
+            response = await self.call("GET", f"/v1/appScreenshots/{entry['screenshot_id']}")
+        except UploadError as e:
+            if e.status not in (404, 410):
+                raise
+            return await self.reserve(item, set_id)
+        state = response["data"]["attributes"]["assetDeliveryState"]["state"]
+        if state == "COMPLETE":
+            self.journal.record({"event": "committed", "file": item["key"],
+                                 "screenshot_id": entry["screenshot_id"]})
+            return None
+        if state != "AWAITING_UPLOAD":
+            return await self.reserve(item, set_id)
+        return entry
+
+    async def transfer(self, item, entry):
+        """上传预约中尚未完成的分块并提交"""
+        pending = [(index, operation) for index, operation in enumerate(entry["operations"])
+                   if index not in entry["chunks"]]
+        await asyncio.gather(*(self.upload_chunk(item, entry, index, operation)
+                               for index, operation in pending))
+        response = await self.call("PATCH", f"/v1/appScreenshots/{entry['screenshot_id']}", {"data": {
+            "type": "appScreenshots", "id": entry["screenshot_id"],
+            "attributes": {"uploaded": True, "sourceFileChecksum": item["checksum"]},
+        }})
+        state = response["data"]["attributes"]["assetDeliveryState"]
+        if state["state"] == "FAILED":
+            raise UploadError(f"{item['name']} 提交失败: {state.get('errors')}")
+
+    async def upload(self, item, set_id):
+        """上传一个文件：预约 → 上传未完成的分块 → 提交"""
+        async with self.files:
+            entry = self.journal.get(item["key"], item["checksum"])
+            if entry and entry["committed"]:
+                self.stats["skipped"] += 1
+                return "skipped"
+            if entry:
+                entry = await self.check_reservation(item, entry, set_id)
+                if entry is None:
+                    self.stats["skipped"] += 1
+                    return "skipped"
+                self.stats["resumed"] += 1
+            else:
+                await self.delete_superseded(item)
+                entry = await self.reserve(item, set_id)
+
+            for attempt in range(2):
+                try:
+                    await self.transfer(item, entry)
+                    break
+                except UploadError as e:
+                    # 日志中的旧预约已失效（404/410），重新预约并完整上传一次
+                    if e.status not in (404, 410) or attempt:
+                        raise
+                    entry = await self.reserve(item, set_id)
+            self.journal.record({"event": "committed", "file": item["key"],
+                                 "screenshot_id": entry["screenshot_id"]})
+            self.stats["uploaded"] += 1
+            return "uploaded"
+
+    async def update_metadata(self, attributes):
+        await self.call("PATCH", f"/v1/appStoreVersionLocalizations/{self.localization_id}", {"data": {
+            "type": "appStoreVersionLocalizations", "id": self.localization_id, "attributes": attributes,
+        }})
+
+    async def run(self, items, metadata=None):
+        sets = await self.prepare_sets({item["display_type"] for item in items})
+        if metadata:
+            await self.update_metadata(metadata)
+            print("  📝 已更新元数据")
+
+        async def upload_one(item):
+            try:
+                result = await self.upload(item, sets[item["display_type"]])
+                mark = "⏭️ " if result == "skipped" else "✅"
+                print(f"  {mark} {item['name']} ({item['display_type']})")
+            except UploadError as e:
+                self.stats["failed"] += 1
+                print(f"  ❌ {item['name']}: {e}")
+
+        await asyncio.gather(*(upload_one(item) for item in items))
+        return self.stats
+
+
+def load_items(images_dir, manifest_path=None):
+    """读取截屏目录顶层要上传的截屏，跳过校验失败的文件；返回按文件名排序的列表"""
+    images_root = os.path.abspath(images_dir)
+    if manifest_path:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            results = json.load(f)["files"]
+        # 清单通常递归校验了整个目录，主题、语言和套框子目录中的截屏不属于这个本地化
+        top_level = [r for r in results if os.path.dirname(os.path.abspath(r["path"])) == images_root]
+        if len(top_level) < len(results):
+            print(f"  ℹ️  忽略清单中不在 {images_dir} 顶层的 {len(results) - len(top_level)} 个文件")
+        results = top_level
+    else:
+        from png_validator import validate_paths, result_to_dict
+        files = [os.path.join(images_dir, name) for name in sorted(os.listdir(images_dir))
+                 if name.lower().endswith(".png")]
+        results = [result_to_dict(r) for r in validate_paths(files)]
+
+    items = []
+    for result in sorted(results, key=lambda r: r["path"]):
+        name = os.path.basename(result["path"])
+        if result["kind"] != "screenshot":
+            continue
+        if result["errors"]:
+            print(f"  ⚠️  跳过未通过校验的文件: {name} ({'; '.join(result['errors'])})")
+            continue
+        display_type = DISPLAY_TYPES.get(result["device"])
+        if display_type is None:
+            print(f"  ⚠️  跳过无法确定设备类型的文件: {name}")
+            continue
+        with open(result["path"], "rb") as f:
+            content = f.read()
+        # 上传日志按相对截屏目录的路径记录，不同目录中的同名文件不会互相覆盖
+        items.append({"name": name, "key": os.path.relpath(os.path.abspath(result["path"]), images_root),
+                      "path": result["path"], "display_type": display_type,
+                      "content": content, "checksum": hashlib.md5(content).hexdigest()})
+    return items
+
+
+async def upload_all(items, args, api_base, token, journal_path):
+    client = AsyncHTTPClient(max_idle=args.concurrency * 2)
+    journal = UploadJournal(journal_path)
+    uploader = ScreenshotUploader(client, api_base, token, args.localization_id, journal,
+                                  args.concurrency, args.retries, args.backoff)
+    metadata = None
+    if args.metadata:
+        with open(args.metadata, "r", encoding="utf-8") as f:
+            metadata = json.load(f)
+    try:
+        return await uploader.run(items, metadata), client.stats
+    finally:
+        journal.close()
+        await client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="并发上传App Store截屏（支持断点续传）")
+    parser.add_argument("--images", default=os.path.join(PROJECT_ROOT, "AppStoreImages"),
+                        help="截屏目录（不递归），默认 AppStoreImages")
+    parser.add_argument("--manifest", help="png_validator.py --manifest 生成的校验清单，未指定时现场校验")
+    parser.add_argument("--localization-id", help="appStoreVersionLocalization 的ID")
+    parser.add_argument("--token", default=os.environ.get("ASC_TOKEN"),
+                        help="App Store Connect API 的JWT令牌，默认读取环境变量 ASC_TOKEN")
+    parser.add_argument("--api-base", default=DEFAULT_API_BASE, help="API地址")
+    parser.add_argument("--metadata", help="JSON文件，内容为要更新的本地化属性（description、keywords 等）")
+    parser.add_argument("--concurrency", type=int, default=4, help="同时上传的文件数")
+    parser.add_argument("--retries", type=int, default=5, help="每个请求的最大重试次数")
+    parser.add_argument("--backoff", type=float, default=0.5, help="重试退避的基础秒数")
+    parser.add_argument("--journal", help=f"上传日志路径，默认为截屏目录下的 {JOURNAL_NAME}")
+    parser.add_argument("--mock", action="store_true", help="启动本地模拟服务并上传到模拟服务")
+    parser.add_argument("--mock-failure-rate", type=float, default=0.0, help="模拟服务随机失败概率")
+    parser.add_argument("--mock-latency-ms", type=float, default=0, help="模拟服务每个请求的延迟")
+    parser.add_argument("--mock-chunk-size", type=int, default=16 * 1024, help="模拟服务的上传分块大小")
+    args = parser.parse_args()
+
+    api_base, token = args.api_base, args.token
+    server = None
+    if args.mock:
+        from mock_app_store_connect import MockAppStoreConnect, start_server
+        service = MockAppStoreConnect(args.mock_chunk_size, args.mock_latency_ms, args.mock_failure_rate)
+        server, api_base = start_server(service)
+        token = token or "mock-token"
+        args.localization_id = args.localization_id or "mock-localization"
+        print(f"🧪 使用本地模拟服务: {api_base}")
+    if not token or not args.localization_id:
+        parser.error("需要 --token（或环境变量 ASC_TOKEN）和 --localization-id，或使用 --mock")
+
+    items = load_items(args.images, args.manifest)
+    if not items:
+        print("没有需要上传的截屏")
+        return 0
+    journal_path = args.journal or os.path.join(args.images, JOURNAL_NAME)
+    total_bytes = sum(len(item["content"]) for item in items)
+    print(f"📤 上传 {len(items)} 张截屏 ({total_bytes / 1024 / 1024:.1f}MB)，并发 {args.concurrency}")
+
+    start = time.perf_counter()
+    try:
+        stats, http_stats = asyncio.run(upload_all(items, args, api_base, token, journal_path))
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+    elapsed = time.perf_counter() - start
+
+    print(f"\n⏱️  耗时 {elapsed:.2f}s，{stats['bytes'] / 1024 / 1024 / max(elapsed, 1e-6):.1f}MB/s")
+    print(f"  上传 {stats['uploaded']}，跳过 {stats['skipped']}，续传 {stats['resumed']}，替换 {stats['replaced']}，"
+          f"失败 {stats['failed']}，重试 {stats['retries']} 次")
+    print(f"  HTTP 请求 {http_stats['requests']} 个，新建连接 {http_stats['connections']} 个，"
+          f"复用 {http_stats['reused']} 次")
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
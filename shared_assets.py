@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+多进程渲染的共享内存图片资源
+父进程只解码一次图片，把像素数据放入 multiprocessing.shared_memory，
+工作进程直接把共享缓冲区包装成PIL图片，不需要重新解码也不需要pickle传输像素
+"""
+
+import os
+import time
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image
+
+# Image.frombuffer 可以直接引用（不复制）缓冲区的模式
+ZERO_COPY_MODES = ("L", "RGBA", "RGBX", "CMYK")
+
+
+class SharedAssetStore:
+    """父进程端：发布解码后的图片到共享内存"""
+
+    def __init__(self):
+        self.blocks = {}
+        self.manifest = {}
+
+    def publish(self, images):
+        """发布图片字典 {名称: PIL图片}，返回可传给工作进程的清单"""
+        for key, image in images.items():
+            if image.mode not in ZERO_COPY_MODES:
+                image = image.convert("RGBA")
+            data = image.tobytes()
+            block = shared_memory.SharedMemory(create=True, size=max(len(data), 1))
+            block.buf[:len(data)] = data
+            self.blocks[key] = block
+            self.manifest[key] = (block.name, image.mode, image.size, len(data))
+        return dict(self.manifest)
+
+    def close(self):
+        """释放共享内存"""
+        for block in self.blocks.values():
+            block.close()
+            try:
+                block.unlink()
+            except FileNotFoundError:
+                pass
+        self.blocks.clear()
+        self.manifest.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class AttachedAssets(dict):
+    """工作进程端：包装共享内存的只读图片字典，持有共享内存引用防止被回收"""
+
+    def __init__(self, manifest):
+        super().__init__()
+        self.blocks = []
+        for key, (name, mode, size, length) in manifest.items():
+            block = shared_memory.SharedMemory(name=name)
+            self.blocks.append(block)
+            # frombuffer 对 ZERO_COPY_MODES 直接引用缓冲区，图片为只读，写入时PIL会自动复制
+            self[key] = Image.frombuffer(mode, size, block.buf[:length], "raw", mode, 0, 1)
+
+    def close(self):
+        self.clear()
+        for block in self.blocks:
+            try:
+                block.close()
+            except BufferError:
+                # 仍有图片引用缓冲区，进程退出时由系统回收
+                pass
+        self.blocks = []
+
+
+# 工作进程内的全局状态（由 initializer 设置）
+_worker_state = {}
+
+
+def _init_worker(generator, manifest):
+    """工作进程初始化：挂载共享图片"""
+    _worker_state["generator"] = generator
+    _worker_state["images"] = AttachedAssets(manifest)
+
+
+def _render_task(task):
+    """在工作进程中渲染并保存一张截屏"""
+    filename, size, screenshot_type = task
+    generator = _worker_state["generator"]
+    # 低内存模式：尺寸切换时释放上一尺寸的画布
+    if generator.low_memory and _worker_state.get("size") not in (None, size):
+        generator.release_buffers()
+    _worker_state["size"] = size
+    screenshot = generator.create_app_screenshot(size, _worker_state["images"], screenshot_type)
+    screenshot.save(os.path.join(generator.output_path, filename), "PNG")
+    return filename
+
+
+def render_matrix(generator, images, tasks, workers):
+    """
+    使用进程池渲染截屏矩阵
+    tasks: [(文件名, 尺寸, 截屏类型), ...]
+    返回按完成顺序排列的文件名
+    """
+    start = time.perf_counter()
+    with SharedAssetStore() as store:
+        manifest = store.publish(images)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(generator, manifest)) as executor:
+            results = []
+            for filename in executor.map(_render_task, tasks):
+                print(f"  保存: {filename}")
+                results.append(filename)
+    print(f"⏱️  {workers} 个进程渲染 {len(tasks)} 张截屏，耗时 {time.perf_counter() - start:.2f}s")
+    return results
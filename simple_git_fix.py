@@ -3,55 +3,49 @@
 简单的git变基撤销脚本
 """
 
-import subprocess
-import os
+import sys
 
-def execute_command(command):
-    """执行命令"""
-    try:
-        # 使用os.system作为备选方案
-        result = os.system(command)
-        return result == 0
-    except:
-        return False
+from git_state import GitState
 
 def main():
     print("🔧 Git变基撤销工具")
     print("=" * 30)
-    
-    # 切换到正确的目录
-    os.chdir('/Users/tangxiaojun/Downloads/Life')
-    
-    print("📁 当前目录:", os.getcwd())
-    
+
+    try:
+        state = GitState(sys.argv[1] if len(sys.argv) > 1 else None)
+    except FileNotFoundError as e:
+        print(f"❌ {e}")
+        return
+
+    print("📁 当前仓库:", state.work_tree)
+
     # 检查ORIG_HEAD是否存在
-    if os.path.exists('.git/ORIG_HEAD'):
+    orig_head = state.orig_head()
+    if orig_head:
         print("✅ 找到ORIG_HEAD，可以撤销变基")
-        
-        # 读取ORIG_HEAD内容
-        with open('.git/ORIG_HEAD', 'r') as f:
-            orig_head = f.read().strip()
-        print(f"📍 ORIG_HEAD指向: {orig_head}")
-        
+        print(f"📍 ORIG_HEAD指向: {state.describe(orig_head)}")
+
         # 执行撤销变基
         print("\n🔄 正在撤销变基...")
-        command = f"git reset --hard {orig_head}"
-        print(f"执行命令: {command}")
-        
-        success = execute_command(command)
-        
-        if success:
+        print(f"执行命令: git reset --hard {orig_head}")
+
+        returncode, stdout, stderr = state.reset_hard(orig_head)
+
+        if returncode == 0:
             print("✅ 变基撤销成功！")
+            print(stdout)
         else:
             print("❌ 变基撤销失败")
-            
+            print(stderr)
+
         # 显示当前状态
         print("\n📊 当前状态:")
-        execute_command("git status")
-        
+        branch, sha = state.head()
+        print(f"🌿 {branch or '(分离HEAD)'} {state.describe(sha)}")
+
     else:
         print("❌ 未找到ORIG_HEAD，可能变基操作已经完成很久")
-        print("💡 建议使用 git reflog 查看历史操作")
+        print("💡 建议使用 python3 fix_git_rebase.py 查看历史操作")
 
 if __name__ == "__main__":
     main()
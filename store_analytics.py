@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+"""
+SwiftData 导出存储的离线分析工具
+以只读方式打开从测试设备复制出的存储文件（SQLite，Core Data 表结构），
+聚合计算全部在 SQLite 内完成，结果按 (存储文件哈希, 查询) 缓存
+
+用法:
+    python3 store_analytics.py default.store
+    python3 store_analytics.py default.store --start 2024-01-01 --end 2024-12-31 --report streaks
+    python3 store_analytics.py default.store --matter 心情 --chart-output mood.json
+
+--chart-output 写出的 {"values": [...]} 可直接作为截屏生成器的 --chart-data
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import sqlite3
+import hashlib
+import argparse
+from datetime import date, datetime, timedelta, timezone
+
+# 项目根目录（脚本所在目录）
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(PROJECT_ROOT, ".cache", "analytics")
+
+# Core Data 的时间基准（日期存储为相对该时间的秒数）
+CORE_DATA_EPOCH = datetime(2001, 1, 1, tzinfo=timezone.utc)
+SECONDS_PER_DAY = 86400
+
+REPORTS = ["completion", "distribution", "streaks", "series"]
+
+# 记录是否有内容：单选有值，或多选数组非空
+COMPLETED_CONDITION = ("(ZSINGLEOPTIONID IS NOT NULL OR "
+                       "(ZSELECTEDOPTIONIDS IS NOT NULL AND length(ZSELECTEDOPTIONIDS) > 2))")
+
+
+def file_hash(path, use_cache=True):
+    """
+    计算文件内容的 SHA-256；use_cache 时按 (路径, 大小, 修改时间) 记住结果避免重复计算，
+    索引每个路径只保留一条，写入时去掉已不存在的文件
+    """
+    stat = os.stat(path)
+    index_path = os.path.join(CACHE_DIR, "hashes.json")
+    key = os.path.abspath(path)
+    index = {}
+    if use_cache and os.path.exists(index_path):
+        try:
+            with open(index_path, "r") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = {}
+    entry = index.get(key)
+    if isinstance(entry, list) and entry[:2] == [stat.st_size, stat.st_mtime_ns]:
+        return entry[2]
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    if use_cache:
+        index = {name: value for name, value in index.items()
+                 if isinstance(value, list) and os.path.exists(name)}
+        index[key] = [stat.st_size, stat.st_mtime_ns, digest.hexdigest()]
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(index_path, "w") as f:
+            json.dump(index, f)
+    return digest.hexdigest()
+
+
+def day_number(day):
+    """日期转为相对 Core Data 基准的天数"""
+    return (day - CORE_DATA_EPOCH.date()).days
+
+
+def day_from_number(number):
+    """天数转回日期"""
+    return CORE_DATA_EPOCH.date() + timedelta(days=number)
+
+
+def uuid_text(value):
+    """BLOB/字符串形式的 UUID 统一为字符串"""
+    if isinstance(value, (bytes, memoryview)) and len(value) == 16:
+        return str(uuid.UUID(bytes=bytes(value)))
+    return str(value) if value is not None else None
+
+
+def parse_options(raw):
+    """解析事项子项（JSON 编码的 MatterOption 数组），无法解析时返回空列表"""
+    if raw is None:
+        return []
+    try:
+        options = json.loads(bytes(raw).decode("utf-8") if isinstance(raw, (bytes, memoryview)) else raw)
+    except (ValueError, UnicodeDecodeError):
+        return []
+    return options if isinstance(options, list) else []
+
+
+class StoreAnalytics:
+    """对单个存储文件的只读分析"""
+
+    def __init__(self, path, use_cache=True, tz_offset_hours=0):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"存储文件不存在: {path}")
+        self.path = path
+        self.use_cache = use_cache
+        self.tz_offset = int(tz_offset_hours * 3600)
+        self.store_hash = file_hash(path, use_cache)
+        self._connection = None
+        self._matters = None
+        self.records_table = None
+
+    @property
+    def connection(self):
+        """只读连接，首次使用时打开"""
+        if self._connection is None:
+            self._connection = sqlite3.connect(f"file:{os.path.abspath(self.path)}?mode=ro", uri=True)
+            self.check_schema()
+            self.prepare_tables()
+        return self._connection
+
+    def check_schema(self):
+        """确认存储中存在事项和记录表"""
+        tables = {row[0] for row in self._connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        missing = [t for t in ("ZMATTER", "ZMATTERRECORD") if t not in tables]
+        if missing:
+            raise ValueError(f"不是 Life 应用的存储文件，缺少表: {', '.join(missing)}")
+
+    def has_index(self, table, column):
+        """检查是否存在以 column 开头的索引"""
+        for index in self._connection.execute(f"PRAGMA index_list({table})"):
+            columns = [row[2] for row in self._connection.execute(f"PRAGMA index_info({index[1]})")]
+            if columns and columns[0] == column:
+                return True
+        return False
+
+    def prepare_tables(self):
+        """
+        准备查询用的临时表：
+        - option_index: 子项ID -> 序号（用于计算平均分）
+        - 存储中没有 ZMATTERID 索引时，把记录投影到带索引的临时表
+          （只读文件不能建索引，临时表位于内存中）
+        """
+        self._connection.execute("CREATE TEMP TABLE option_index (option_id BLOB PRIMARY KEY, matter_id BLOB, idx INTEGER)")
+        rows = []
+        for matter_id, raw_options in self._connection.execute("SELECT ZID, ZOPTIONS FROM ZMATTER"):
+            for idx, option in enumerate(parse_options(raw_options), 1):
+                try:
+                    rows.append((uuid.UUID(option["id"]).bytes, matter_id, idx))
+                except (KeyError, ValueError, TypeError):
+                    continue
+        self._connection.executemany("INSERT OR IGNORE INTO temp.option_index VALUES (?, ?, ?)", rows)
+
+        if self.has_index("ZMATTERRECORD", "ZMATTERID"):
+            self.records_table = "ZMATTERRECORD"
+        else:
+            self._connection.executescript(f"""
+                CREATE TEMP TABLE records AS
+                    SELECT ZMATTERID, ZDATE, ZSINGLEOPTIONID, ZSELECTEDOPTIONIDS FROM main.ZMATTERRECORD;
+                CREATE INDEX temp.records_matter_date ON records (ZMATTERID, ZDATE);
+            """)
+            self.records_table = "temp.records"
+
+    def matters(self):
+        """事项列表 [{id, title, options}]，按 order 排序"""
+        if self._matters is None:
+            self._matters = []
+            for matter_id, title, raw_options in self.connection.execute(
+                    "SELECT ZID, ZTITLE, ZOPTIONS FROM ZMATTER ORDER BY ZORDER, Z_PK"):
+                self._matters.append({"id": matter_id, "key": uuid_text(matter_id), "title": title,
+                                      "options": parse_options(raw_options)})
+        return self._matters
+
+    def find_matter(self, title):
+        """按标题查找事项"""
+        for matter in self.matters():
+            if matter["title"] == title:
+                return matter
+        raise ValueError(f"未找到事项: {title}")
+
+    def date_range(self):
+        """记录覆盖的日期范围"""
+        first, last = self.connection.execute(
+            f"SELECT MIN(ZDATE), MAX(ZDATE) FROM {self.records_table}").fetchone()
+        if first is None:
+            today = date.today()
+            return today, today
+        return (day_from_number(int((first + self.tz_offset) // SECONDS_PER_DAY)),
+                day_from_number(int((last + self.tz_offset) // SECONDS_PER_DAY)))
+
+    def window_params(self, start, end):
+        """日期窗口转为查询参数（end 当天包含在内）"""
+        return {
+            "start": day_number(start) * SECONDS_PER_DAY - self.tz_offset,
+            "end": (day_number(end) + 1) * SECONDS_PER_DAY - self.tz_offset,
+            "tz": self.tz_offset,
+        }
+
+    def cached(self, query, compute):
+        """按 (存储哈希, 查询) 读取或写入缓存"""
+        key = hashlib.sha256(f"{self.store_hash}:{json.dumps(query, sort_keys=True)}".encode()).hexdigest()
+        cache_path = os.path.join(CACHE_DIR, f"{key}.json")
+        if self.use_cache and os.path.exists(cache_path):
+            with open(cache_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        result = compute()
+        if self.use_cache:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            with open(cache_path, "w", encoding="utf-8") as f:
+                json.dump(result, f, ensure_ascii=False)
+        return result
+
+    def completion(self, start, end):
+        """每个事项在窗口内有记录的天数和完成率"""
+        def compute():
+            params = self.window_params(start, end)
+            counts = dict(self.connection.execute(f"""
+                SELECT ZMATTERID, COUNT(DISTINCT CAST((ZDATE + :tz) / 86400 AS INTEGER))
+                FROM {self.records_table}
+                WHERE ZDATE >= :start AND ZDATE < :end AND {COMPLETED_CONDITION}
+                GROUP BY ZMATTERID
+            """, params).fetchall())
+            total_days = (end - start).days + 1
+            return {m["title"]: {"days": counts.get(m["id"], 0), "total_days": total_days,
+                                 "rate": counts.get(m["id"], 0) / total_days}
+                    for m in self.matters()}
+        return self.cached({"report": "completion", "start": str(start), "end": str(end), "tz": self.tz_offset}, compute)
+
+    def distribution(self, start, end):
+        """每个事项各子项被选中的次数"""
+        def compute():
+            params = self.window_params(start, end)
+            result = {}
+            labels = {}
+            for matter in self.matters():
+                result[matter["title"]] = {}
+                for option in matter["options"]:
+                    label = f"{option.get('emoji', '')} {option.get('title', '')}".strip()
+                    labels[(matter["key"], option.get("id"))] = label
+                    result[matter["title"]][label] = 0
+            titles = {m["key"]: m["title"] for m in self.matters()}
+            for matter_id, option_id, count in self.connection.execute(f"""
+                SELECT ZMATTERID, ZSINGLEOPTIONID, COUNT(*)
+                FROM {self.records_table}
+                WHERE ZDATE >= :start AND ZDATE < :end AND ZSINGLEOPTIONID IS NOT NULL
+                GROUP BY ZMATTERID, ZSINGLEOPTIONID
+            """, params):
+                matter_key = uuid_text(matter_id)
+                option_key = uuid_text(option_id)
+                title = titles.get(matter_key, matter_key)
+                label = labels.get((matter_key, option_key), option_key)
+                result.setdefault(title, {})[label] = count
+            return result
+        return self.cached({"report": "distribution", "start": str(start), "end": str(end), "tz": self.tz_offset}, compute)
+
+    def streaks(self, start, end):
+        """每个事项的最长连续记录天数和截至窗口末尾的当前连续天数"""
+        def compute():
+            params = self.window_params(start, end)
+            last_day = day_number(end)
+            result = {m["title"]: {"longest": 0, "longest_start": None, "longest_end": None, "current": 0}
+                      for m in self.matters()}
+            titles = {m["id"]: m["title"] for m in self.matters()}
+            # gaps-and-islands：连续的天数减去行号后相同
+            for matter_id, first, last, length in self.connection.execute(f"""
+                WITH days AS (
+                    SELECT DISTINCT ZMATTERID AS m, CAST((ZDATE + :tz) / 86400 AS INTEGER) AS d
+                    FROM {self.records_table}
+                    WHERE ZDATE >= :start AND ZDATE < :end AND {COMPLETED_CONDITION}
+                ), islands AS (
+                    SELECT m, d, d - ROW_NUMBER() OVER (PARTITION BY m ORDER BY d) AS grp FROM days
+                )
+                SELECT m, MIN(d), MAX(d), COUNT(*) FROM islands GROUP BY m, grp
+            """, params):
+                title = titles.get(matter_id, uuid_text(matter_id))
+                entry = result.setdefault(title, {"longest": 0, "longest_start": None,
+                                                  "longest_end": None, "current": 0})
+                if length > entry["longest"]:
+                    entry.update(longest=length, longest_start=str(day_from_number(first)),
+                                 longest_end=str(day_from_number(last)))
+                if last == last_day:
+                    entry["current"] = length
+            return result
+        return self.cached({"report": "streaks", "start": str(start), "end": str(end), "tz": self.tz_offset}, compute)
+
+    def series(self, matter_title, start, end):
+        """单个事项的每日平均分（子项序号，从1开始），没有记录的日期不输出"""
+        matter = self.find_matter(matter_title)
+
+        def compute():
+            params = self.window_params(start, end)
+            params["matter"] = matter["id"]
+            rows = self.connection.execute(f"""
+                SELECT CAST((r.ZDATE + :tz) / 86400 AS INTEGER) AS d, AVG(o.idx)
+                FROM {self.records_table} r
+                JOIN temp.option_index o ON o.option_id = r.ZSINGLEOPTIONID
+                WHERE r.ZMATTERID = :matter AND r.ZDATE >= :start AND r.ZDATE < :end
+                GROUP BY d ORDER BY d
+            """, params).fetchall()
+            return {"matter": matter["title"], "max": len(matter["options"]),
+                    "dates": [str(day_from_number(d)) for d, _ in rows],
+                    "values": [round(v, 3) for _, v in rows]}
+        return self.cached({"report": "series", "matter": matter["key"], "start": str(start),
+                            "end": str(end), "tz": self.tz_offset}, compute)
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+def print_completion(result):
+    print("\n✅ 完成率：")
+    for title, entry in result.items():
+        print(f"  {title}: {entry['days']}/{entry['total_days']} 天 ({entry['rate'] * 100:.1f}%)")
+
+
+def print_distribution(result):
+    print("\n📊 子项分布：")
+    for title, counts in result.items():
+        total = sum(counts.values())
+        if not total:
+            continue
+        print(f"  {title}:")
+        for label, count in counts.items():
+            print(f"    {label}: {count} ({count / total * 100:.1f}%)")
+
+
+def print_streaks(result):
+    print("\n🔥 连续记录：")
+    for title, entry in result.items():
+        longest = f"{entry['longest']} 天"
+        if entry["longest_start"]:
+            longest += f" ({entry['longest_start']} ~ {entry['longest_end']})"
+        print(f"  {title}: 最长 {longest}，当前 {entry['current']} 天")
+
+
+def print_series(result):
+    values = result["values"]
+    print(f"\n📈 {result['matter']} 每日平均分（满分 {result['max']}）：{len(values)} 天")
+    if values:
+        print(f"  平均 {sum(values) / len(values):.2f}，最低 {min(values):.2f}，最高 {max(values):.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SwiftData 导出存储的离线分析")
+    parser.add_argument("store", help="复制出的存储文件（.store / .sqlite）")
+    parser.add_argument("--start", default=None, help="开始日期 (YYYY-MM-DD)，默认第一条记录")
+    parser.add_argument("--end", default=None, help="结束日期 (YYYY-MM-DD)，默认最后一条记录")
+    parser.add_argument("--report", choices=REPORTS + ["all"], default="all", help="输出的报告")
+    parser.add_argument("--matter", default=None, help="series 报告使用的事项标题，默认第一个事项")
+    parser.add_argument("--chart-output", default=None, help="把 series 写成截屏图表数据文件")
+    parser.add_argument("--tz-offset", type=float, default=0, help="按日统计使用的时区偏移（小时）")
+    parser.add_argument("--json", action="store_true", help="以JSON输出全部结果")
+    parser.add_argument("--no-cache", action="store_true", help="不读写结果和文件哈希缓存")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    try:
+        analytics = StoreAnalytics(args.store, use_cache=not args.no_cache, tz_offset_hours=args.tz_offset)
+        first, last = analytics.date_range()
+        start = date.fromisoformat(args.start) if args.start else first
+        end = date.fromisoformat(args.end) if args.end else last
+        if end < start:
+            raise ValueError(f"结束日期早于开始日期: {start} ~ {end}")
+
+        reports = REPORTS if args.report == "all" else [args.report]
+        if args.chart_output and "series" not in reports:
+            reports.append("series")
+        matter_title = args.matter or (analytics.matters()[0]["title"] if analytics.matters() else None)
+
+        results = {}
+        for report in reports:
+            if report == "series":
+                if matter_title is None:
+                    continue
+                results[report] = analytics.series(matter_title, start, end)
+            else:
+                results[report] = getattr(analytics, report)(start, end)
+        analytics.close()
+    except (FileNotFoundError, ValueError, sqlite3.DatabaseError) as e:
+        print(f"❌ {e}")
+        return 1
+
+    if args.chart_output and "series" in results:
+        with open(args.chart_output, "w", encoding="utf-8") as f:
+            json.dump({"values": results["series"]["values"]}, f)
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return 0
+
+    print(f"🔍 {args.store}: {start} ~ {end}")
+    printers = {"completion": print_completion, "distribution": print_distribution,
+                "streaks": print_streaks, "series": print_series}
+    for report, result in results.items():
+        printers[report](result)
+    if args.chart_output and "series" in results:
+        print(f"\n💾 图表数据已写入: {args.chart_output}")
+    print(f"\n⏱️  {(time.perf_counter() - started) * 1000:.1f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
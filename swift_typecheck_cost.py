@@ -0,0 +1,510 @@
+#!/usr/bin/env python3
+"""
+SwiftUI 类型检查耗时静态预测
+不编译，只对 Swift 源码做词法分析，按声明统计容易拖慢类型检查的写法：
+视图构建器嵌套深度、链式修饰符数量、带字面量的算术表达式和三元表达式。
+按预测分数给出全项目最可能编译慢的位置；每个文件的结果按内容哈希缓存
+
+用法:
+    python3 swift_typecheck_cost.py
+    python3 swift_typecheck_cost.py Life/Views/MatterHistoryView.swift --top 5
+    python3 swift_typecheck_cost.py --all --json cost.json
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import argparse
+
+# 项目根目录（脚本所在目录）
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(PROJECT_ROOT, ".cache", "swift_cost")
+DEFAULT_PATHS = ["Life", "Widget"]
+
+# 分析逻辑变化时递增，使旧缓存失效
+ANALYZER_VERSION = 1
+MAX_CACHE_ENTRIES = 500
+
+# 预测分数的权重：嵌套深度按平方计，字面量表达式按运算符个数指数增长（与类型检查器的重载组合数一致）
+WEIGHTS = {"depth": 1.0, "chain": 2.0, "modifiers": 0.25, "expression": 1.0}
+# 同一表达式中至少有这么多个运算符/三元表达式才计入表达式分数
+EXPRESSION_MIN_OPERATORS = 2
+
+KEYWORDS = {
+    "var", "let", "func", "init", "subscript", "struct", "class", "enum", "extension", "protocol",
+    "if", "else", "guard", "switch", "case", "default", "for", "in", "while", "repeat", "return",
+    "some", "any", "where", "static", "private", "fileprivate", "public", "internal", "override",
+    "mutating", "lazy", "weak", "unowned", "true", "false", "nil", "self", "Self", "try", "await",
+}
+ARITHMETIC = {"+", "-", "*", "/", "%"}
+OPEN_BRACKETS = {"(": ")", "[": "]", "{": "}"}
+CLOSE_BRACKETS = {")", "]", "}"}
+
+TOKEN_PATTERN = re.compile(r"""
+    (?P<newline>\n)
+  | (?P<space>[ \t\r\f\v]+)
+  | (?P<number>0[xX][0-9a-fA-F_]+(?:\.[0-9a-fA-F_]+)?(?:[pP][+-]?[0-9]+)?
+              |0[bB][01_]+|0[oO][0-7_]+
+              |[0-9][0-9_]*(?:\.[0-9][0-9_]*)?(?:[eE][+-]?[0-9]+)?)
+  | (?P<ident>`[^`\n]+`|[@#$]?[A-Za-z_][A-Za-z0-9_]*|\$[0-9]+)
+  | (?P<op>\.\.[.<]|[/=\-+!*%<>&|^~?]+)
+  | (?P<punct>[()\[\]{}.,:;\\])
+""", re.VERBOSE)
+
+
+class Token:
+    """词法单元；space_before/newline_before 用于区分二元运算符、三元表达式和语句边界"""
+
+    __slots__ = ("kind", "text", "line", "space_before", "newline_before", "space_after")
+
+    def __init__(self, kind, text, line, space_before, newline_before):
+        self.kind = kind
+        self.text = text
+        self.line = line
+        self.space_before = space_before
+        self.newline_before = newline_before
+        self.space_after = False
+
+
+def skip_block_comment(source, pos):
+    """跳过可嵌套的 /* */ 注释，返回注释结束位置"""
+    depth = 0
+    length = len(source)
+    while pos < length:
+        if source.startswith("/*", pos):
+            depth += 1
+            pos += 2
+        elif source.startswith("*/", pos):
+            depth -= 1
+            pos += 2
+            if depth == 0:
+                return pos
+        else:
+            pos += 1
+    return length
+
+
+def skip_string(source, pos):
+    """
+    跳过字符串字面量（普通、多行 \"\"\"、原始 #\"...\"#），返回结束位置
+    插值 \\( ... ) 中可以再嵌套字符串和括号
+    """
+    hashes = 0
+    while source[pos] == "#":
+        hashes += 1
+        pos += 1
+    quote = '"""' if source.startswith('"""', pos) else '"'
+    pos += len(quote)
+    terminator = quote + "#" * hashes
+    escape = "\\" + "#" * hashes
+    length = len(source)
+    while pos < length:
+        if source.startswith(terminator, pos):
+            return pos + len(terminator)
+        if source.startswith(escape, pos):
+            pos += len(escape)
+            if pos < length and source[pos] == "(":
+                pos = skip_interpolation(source, pos + 1)
+            else:
+                pos += 1
+            continue
+        if quote == '"' and source[pos] == "\n":
+            return pos
+        pos += 1
+    return length
+
+
+def skip_interpolation(source, pos):
+    """跳过字符串插值中的表达式（已越过左括号），返回右括号之后的位置"""
+    depth = 1
+    length = len(source)
+    while pos < length:
+        char = source[pos]
+        if char == '"' or (char == "#" and re.match(r'#+"', source[pos:pos + 8])):
+            pos = skip_string(source, pos)
+            continue
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+            if depth == 0:
+                return pos + 1
+        pos += 1
+    return length
+
+
+def tokenize(source):
+    """Swift 源码 → Token 列表（注释被丢弃，字符串整体作为一个 string 词法单元）"""
+    tokens = []
+    pos = 0
+    line = 1
+    length = len(source)
+    space = False
+    newline = False
+    while pos < length:
+        char = source[pos]
+        if source.startswith("//", pos):
+            end = source.find("\n", pos)
+            pos = length if end < 0 else end
+            continue
+        if source.startswith("/*", pos):
+            end = skip_block_comment(source, pos)
+            line += source.count("\n", pos, end)
+            space = True
+            pos = end
+            continue
+        if char == '"' or (char == "#" and re.match(r'#+"', source[pos:pos + 8])):
+            end = skip_string(source, pos)
+            tokens.append(Token("string", '""', line, space, newline))
+            line += source.count("\n", pos, end)
+            space = newline = False
+            pos = end
+            continue
+
+        match = TOKEN_PATTERN.match(source, pos)
+        if match is None:
+            # 无法识别的字符（如 Unicode 运算符）当作标点跳过
+            tokens.append(Token("punct", char, line, space, newline))
+            space = newline = False
+            pos += 1
+            continue
+        kind = match.lastgroup
+        text = match.group()
+        pos = match.end()
+        if kind == "newline":
+            line += 1
+            space = newline = True
+            continue
+        if kind == "space":
+            space = True
+            continue
+        if kind == "ident" and text in KEYWORDS:
+            kind = "keyword"
+        tokens.append(Token(kind, text, line, space, newline))
+        space = newline = False
+
+    for current, following in zip(tokens, tokens[1:]):
+        current.space_after = following.space_before
+    return tokens
+
+
+def is_binary(token):
+    """Swift 规则：二元运算符两侧空白一致；一侧有空白的是前缀/后缀运算符"""
+    return token.kind == "op" and token.space_before == token.space_after
+
+
+def match_brace(tokens, index):
+    """tokens[index] 为左花括号，返回对应右花括号的下标"""
+    depth = 0
+    for i in range(index, len(tokens)):
+        text = tokens[i].text
+        if tokens[i].kind != "punct":
+            continue
+        if text == "{":
+            depth += 1
+        elif text == "}":
+            depth -= 1
+            if depth == 0:
+                return i
+    return len(tokens) - 1
+
+
+def find_declarations(tokens):
+    """
+    找出带函数体的 var/func/init/subscript 声明
+    返回 [(名称, 签名中的返回类型文本, 是否 @ViewBuilder, 声明所在行, 左花括号下标, 右花括号下标)]
+    """
+    declarations = []
+    for i, token in enumerate(tokens):
+        if token.kind != "keyword" or token.text not in ("var", "func", "init", "subscript"):
+            continue
+        name = token.text
+        if token.text in ("var", "func") and i + 1 < len(tokens):
+            name = tokens[i + 1].text
+        view_builder = any(t.text == "@ViewBuilder" for t in tokens[max(i - 4, 0):i])
+
+        # 在同一声明内找函数体的左花括号；遇到 = 或新的声明说明没有函数体
+        depth = 0
+        signature = []
+        for j in range(i + 1, len(tokens)):
+            candidate = tokens[j]
+            text = candidate.text
+            if text in ("(", "["):
+                depth += 1
+            elif text in (")", "]"):
+                depth -= 1
+            elif depth == 0 and (text == "=" or text == "}" or
+                                 (candidate.kind == "keyword" and text in ("var", "let", "func", "init"))):
+                break
+            elif depth == 0 and text == "{":
+                end = match_brace(tokens, j)
+                declarations.append((name, " ".join(signature), view_builder, token.line, j, end))
+                break
+            if depth == 0 and candidate.newline_before and token.text == "var" and j > i + 1 \
+                    and signature and signature[-1] != ":":
+                # var 声明换行后仍未遇到花括号，是存储属性
+                break
+            signature.append(text)
+    return declarations
+
+
+def is_view_declaration(name, signature, view_builder):
+    """返回 some View（或 body）的声明、以及 @ViewBuilder 标注的声明"""
+    return view_builder or name == "body" or "View" in signature.split("->")[-1].split(":")[-1]
+
+
+class Segment:
+    """一个表达式片段内的运算符、三元表达式和字面量计数"""
+
+    __slots__ = ("line", "operators", "ternaries", "literals")
+
+    def __init__(self, line):
+        self.line = line
+        self.operators = 0
+        self.ternaries = 0
+        self.literals = 0
+
+    def cost(self):
+        """类型检查器对字面量和重载运算符的组合按指数级尝试，分数同样按指数增长"""
+        total = self.operators + self.ternaries
+        if total < EXPRESSION_MIN_OPERATORS or not (self.literals or self.ternaries):
+            return 0
+        return 2 ** total
+
+
+def ends_segment(previous, token):
+    """是否在 token 处开始新的表达式片段"""
+    text = token.text
+    if token.kind == "punct" and text in (",", ";", "{", "}"):
+        return True
+    if text == ":" and not token.space_before:
+        # 参数标签/字典键（三元表达式的冒号两侧都有空白）
+        return True
+    if text == "=" or (token.kind == "keyword" and text in ("return", "let", "var", "if", "guard",
+                                                             "else", "in", "case", "switch", "for")):
+        return True
+    if token.newline_before and previous is not None:
+        # 换行后以 . 或二元运算符开头、或上一行以二元运算符结尾时表达式仍在继续
+        continues = text == "." or is_binary(token) or (is_binary(previous) and previous.text != "?")
+        return not continues
+    return False
+
+
+def analyze_body(tokens, start, end):
+    """统计函数体 tokens[start..end]（含两端花括号）的各项指标"""
+    max_depth = 0
+    brace_depth = 0
+    # 按 (圆/方/花括号) 总层级记录当前的修饰符链长度
+    chains = {}
+    chain_max = 0
+    chain_line = tokens[start].line
+    modifiers = 0
+    ternaries = 0
+    level = 0
+
+    segments = []
+    segment = Segment(tokens[start].line)
+    previous = None
+
+    for index in range(start + 1, end):
+        token = tokens[index]
+        text = token.text
+
+        if ends_segment(previous, token):
+            if segment.cost():
+                segments.append(segment)
+            segment = Segment(token.line)
+        if token.kind in ("number", "string"):
+            segment.literals += 1
+        elif token.kind == "op":
+            if text == "?" and token.space_before and token.space_after:
+                segment.ternaries += 1
+                ternaries += 1
+            elif text in ARITHMETIC and is_binary(token):
+                segment.operators += 1
+
+        # 修饰符链：上一个同层级词法单元是 ) } ] 或标识符，且 .name 之后紧跟调用
+        if text == "." and previous is not None and \
+                (previous.text in CLOSE_BRACKETS or previous.kind == "ident") and index + 2 < end:
+            following = tokens[index + 2]
+            if tokens[index + 1].kind in ("ident", "keyword") and following.text in ("(", "{"):
+                chains[level] = chains.get(level, 0) + 1
+                modifiers += 1
+                if chains[level] > chain_max:
+                    chain_max = chains[level]
+                    chain_line = token.line
+        elif token.kind == "punct" and text in OPEN_BRACKETS:
+            level += 1
+            chains[level] = 0
+            if text == "{":
+                brace_depth += 1
+                max_depth = max(max_depth, brace_depth)
+        elif token.kind == "punct" and text in CLOSE_BRACKETS:
+            chains.pop(level, None)
+            level -= 1
+            if text == "}":
+                brace_depth -= 1
+        elif not (previous is not None and previous.text == "." and token.kind in ("ident", "keyword")):
+            # 链以外的词法单元（换行开始新语句）结束当前层级的链
+            if token.newline_before and text != ".":
+                chains[level] = 0
+        previous = token
+
+    if segment.cost():
+        segments.append(segment)
+
+    expression_cost = sum(s.cost() for s in segments)
+    worst = max(segments, key=lambda s: s.cost(), default=None)
+    score = (WEIGHTS["depth"] * max_depth ** 2 + WEIGHTS["chain"] * chain_max +
+             WEIGHTS["modifiers"] * modifiers + WEIGHTS["expression"] * expression_cost)
+    return {
+        "depth": max_depth,
+        "chain": chain_max,
+        "chain_line": chain_line,
+        "modifiers": modifiers,
+        "expressions": len(segments),
+        "ternaries": ternaries,
+        "expression_cost": expression_cost,
+        "worst_line": worst.line if worst else None,
+        "score": round(score, 2),
+    }
+
+
+def analyze_source(source):
+    """分析一个文件，返回每个带函数体的声明的指标（外层声明会包含内层声明的代码）"""
+    tokens = tokenize(source)
+    results = []
+    for name, signature, view_builder, line, start, end in find_declarations(tokens):
+        metrics = analyze_body(tokens, start, end)
+        metrics.update({
+            "name": name,
+            "line": line,
+            "end_line": tokens[end].line,
+            "view": is_view_declaration(name, signature, view_builder),
+        })
+        results.append(metrics)
+    return results
+
+
+class CostCache:
+    """按文件内容哈希缓存分析结果（内容不变时跳过词法分析）"""
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.path = os.path.join(CACHE_DIR, "index.json")
+        self.entries = {}
+        self.dirty = False
+        self.hits = 0
+        if enabled and os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                self.entries = {}
+
+    @staticmethod
+    def key(content):
+        return hashlib.sha256(content + f":{ANALYZER_VERSION}".encode()).hexdigest()
+
+    def analyze(self, path):
+        with open(path, "rb") as f:
+            content = f.read()
+        key = self.key(content)
+        if self.enabled and key in self.entries:
+            self.hits += 1
+            # 重新插入到末尾，淘汰时保留最近用过的
+            self.entries[key] = self.entries.pop(key)
+            return self.entries[key]
+        results = analyze_source(content.decode("utf-8", errors="replace"))
+        self.entries[key] = results
+        self.dirty = True
+        return results
+
+    def save(self):
+        if not (self.enabled and self.dirty):
+            return
+        while len(self.entries) > MAX_CACHE_ENTRIES:
+            self.entries.pop(next(iter(self.entries)))
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f)
+
+
+def collect_swift_files(paths):
+    """展开目录为其中的 .swift 文件（跳过构建产物）"""
+    files = []
+    for path in paths:
+        full_path = path if os.path.isabs(path) else os.path.join(PROJECT_ROOT, path)
+        if os.path.isfile(full_path):
+            files.append(full_path)
+            continue
+        for root, dirs, names in os.walk(full_path):
+            dirs[:] = sorted(d for d in dirs if d not in ("build", "DerivedData", ".build"))
+            files.extend(os.path.join(root, name) for name in sorted(names) if name.endswith(".swift"))
+    return files
+
+
+def rank(paths, include_all=False, use_cache=True):
+    """分析全部文件并按分数从高到低排序，返回 (排行, 文件数, 缓存命中数)"""
+    cache = CostCache(enabled=use_cache)
+    files = collect_swift_files(paths)
+    ranking = []
+    for path in files:
+        relative = os.path.relpath(path, PROJECT_ROOT)
+        for metrics in cache.analyze(path):
+            if include_all or metrics["view"]:
+                ranking.append(dict(metrics, file=relative))
+    cache.save()
+    ranking.sort(key=lambda item: item["score"], reverse=True)
+    return ranking, len(files), cache.hits
+
+
+def print_ranking(ranking, top):
+    """打印最可能拖慢类型检查的声明"""
+    print(f"{'分数':>8}  {'深度':>4}  {'最长链':>6}  {'修饰符':>6}  {'三元':>4}  {'表达式':>6}  位置")
+    for item in ranking[:top]:
+        print(f"{item['score']:>10.1f}  {item['depth']:>5}  {item['chain']:>8}  {item['modifiers']:>8}  "
+              f"{item['ternaries']:>6}  {item['expression_cost']:>8}  {item['file']}:{item['line']} {item['name']}")
+        hints = []
+        if item["worst_line"]:
+            hints.append(f"字面量/三元表达式最重: 第{item['worst_line']}行")
+        if item["chain"] >= 6:
+            hints.append(f"最长修饰符链: 第{item['chain_line']}行")
+        if hints:
+            print(f"{'':>12}↳ " + "；".join(hints))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="静态预测 SwiftUI 声明的类型检查耗时")
+    parser.add_argument("paths", nargs="*", default=DEFAULT_PATHS, help="Swift 文件或目录（默认 Life、Widget）")
+    parser.add_argument("--top", type=int, default=15, help="显示前几名（默认15）")
+    parser.add_argument("--all", action="store_true", help="包含非视图声明")
+    parser.add_argument("--no-cache", action="store_true", help="不读写内容哈希缓存")
+    parser.add_argument("--json", help="把完整排行写入 JSON 文件")
+    args = parser.parse_args()
+
+    print("🔍 SwiftUI 类型检查耗时预测")
+    print("=" * 40)
+    started = time.perf_counter()
+    ranking, file_count, hits = rank(args.paths, include_all=args.all, use_cache=not args.no_cache)
+    elapsed = time.perf_counter() - started
+
+    if not ranking:
+        print("⚠️  未找到可分析的声明")
+        return 1
+    print_ranking(ranking, args.top)
+    print("\n" + "=" * 40)
+    print(f"📄 {file_count} 个文件，{len(ranking)} 个声明，缓存命中 {hits} 个文件，用时 {elapsed * 1000:.0f}ms")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(ranking, f, ensure_ascii=False, indent=2)
+        print(f"💾 完整排行已写入 {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+主题变体截屏（深色模式、季节主题等）
+每个 (尺寸, 截屏类型) 只渲染一次“角色标记”图层：colors 中的每个颜色角色换成唯一的标记色，
+渐变背景换成单独的标记色，文字只记录不绘制；
+之后每个主题只需用查找表把角色索引映射成主题颜色 (Image.point)，合成渐变并重放文字
+"""
+
+import os
+import json
+import time
+import argparse
+
+from PIL import Image, ImageChops
+
+from create_real_image_app_store_images import PROJECT_ROOT, RealImageAppStoreGenerator, peak_rss_mb
+
+SCREENSHOT_TYPES = ["home", "feature", "widget"]
+
+# 可换色的颜色角色，索引从1开始；0 表示不参与换色的内容（图片、固定颜色）
+ROLES = ["primary", "secondary", "background", "card_bg", "text", "light_text", "accent"]
+GRADIENT_INDEX = len(ROLES) + 1
+
+# 标记色：R 通道为 TAG_RED_BASE + 角色索引，G/B 固定为少见的值
+TAG_RED_BASE = 100
+TAG_GREEN = 3
+TAG_BLUE = 251
+
+THEMES = {
+    "light": {
+        "primary": "#667eea", "secondary": "#764ba2", "background": "#f8f9ff", "card_bg": "#ffffff",
+        "text": "#333333", "light_text": "#666666", "accent": "#4CAF50",
+    },
+    "dark": {
+        "primary": "#3f4a8a", "secondary": "#2b1d45", "background": "#1c1c1e", "card_bg": "#2c2c2e",
+        "text": "#f2f2f7", "light_text": "#a1a1aa", "accent": "#30d158",
+    },
+    "spring": {
+        "primary": "#f6a5c0", "secondary": "#7fd1ae", "background": "#fff8fb", "card_bg": "#ffffff",
+        "text": "#3a2e39", "light_text": "#7a6a78", "accent": "#ff7aa2",
+    },
+    "autumn": {
+        "primary": "#e07a2f", "secondary": "#8c3b1f", "background": "#fff7ef", "card_bg": "#ffffff",
+        "text": "#3b2a20", "light_text": "#7d6657", "accent": "#c9a227",
+    },
+}
+
+
+def tag_color(index):
+    return (TAG_RED_BASE + index, TAG_GREEN, TAG_BLUE)
+
+
+def hex_color(rgb):
+    return "#%02x%02x%02x" % rgb
+
+
+class ThemeLayer:
+    """一个 (尺寸, 截屏类型) 的角色标记渲染结果"""
+
+    def __init__(self, tagged, ops, direction):
+        self.tagged = tagged
+        self.ops = ops
+        self.direction = direction
+
+        # 角色索引图：标记色像素为角色索引，其余为0，全部用查找表和通道运算完成
+        red, green, blue = tagged.split()
+        red_lut = [0] * 256
+        for index in range(1, GRADIENT_INDEX + 1):
+            red_lut[TAG_RED_BASE + index] = index
+        valid = ImageChops.multiply(green.point([255 if v == TAG_GREEN else 0 for v in range(256)]),
+                                    blue.point([255 if v == TAG_BLUE else 0 for v in range(256)]))
+        self.index = ImageChops.multiply(red.point(red_lut), valid)
+
+        self.role_mask = self.index.point([255 if 0 < v < GRADIENT_INDEX else 0 for v in range(256)])
+        self.gradient_mask = self.index.point([255 if v == GRADIENT_INDEX else 0 for v in range(256)])
+
+
+class ThemeRenderer:
+    """一次标记渲染 + 每个主题一次查找表换色"""
+
+    def __init__(self, generator, images):
+        self.generator = generator
+        self.images = images
+        # 主题渐变背景只作为粘贴源，不需要生成器返回的副本
+        self._gradients = {}
+
+    def get_gradient(self, size, color1, color2, direction):
+        key = (size, color1, color2, direction)
+        gradient = self._gradients.get(key)
+        if gradient is None:
+            gradient = self.generator.create_gradient_background(size, color1, color2, direction)
+            self._gradients[key] = gradient
+        return gradient
+
+    def render_layer(self, size, screenshot_type):
+        """用标记色渲染一次，返回 ThemeLayer"""
+        generator = self.generator
+        direction = "horizontal" if size[0] > size[1] else "vertical"
+        saved_colors = generator.colors
+        generator.colors = dict(saved_colors)
+        for i, role in enumerate(ROLES):
+            generator.colors[role] = hex_color(tag_color(i + 1))
+
+        # 渐变背景整体标记为一个角色，换色时按主题重新生成
+        gradient_key = (size, tag_color(ROLES.index("primary") + 1),
+                        tag_color(ROLES.index("secondary") + 1), direction)
+        generator._gradient_cache[gradient_key] = Image.new("RGB", size, tag_color(GRADIENT_INDEX))
+        generator._text_ops = []
+        try:
+            tagged = generator.create_app_screenshot(size, self.images, screenshot_type)
+            if generator.low_memory:
+                # 低内存模式下返回的是复用画布，换色时会被覆盖
+                tagged = tagged.copy()
+            ops = generator._text_ops
+        finally:
+            generator._text_ops = None
+            generator._gradient_cache.pop(gradient_key, None)
+            generator.colors = saved_colors
+        return ThemeLayer(tagged, ops, direction)
+
+    def apply_theme(self, layer, theme):
+        """用主题颜色替换角色像素、合成渐变背景并重放文字"""
+        generator = self.generator
+        colors = {role: generator.hex_to_rgb(theme[role]) for role in ROLES}
+
+        # 每个通道一张查找表：角色索引 -> 主题颜色分量
+        channels = []
+        for channel in range(3):
+            lut = [0] * 256
+            for i, role in enumerate(ROLES):
+                lut[i + 1] = colors[role][channel]
+            channels.append(layer.index.point(lut))
+
+        image = layer.tagged.copy()
+        image.paste(Image.merge("RGB", channels), (0, 0), layer.role_mask)
+        gradient = self.get_gradient(layer.tagged.size, colors["primary"],
+                                     colors["secondary"], layer.direction)
+        image.paste(gradient, (0, 0), layer.gradient_mask)
+
+        # 文字颜色：标记色换成主题颜色，固定颜色（如白色）保持不变
+        remap = {tag_color(i + 1): colors[role] for i, role in enumerate(ROLES)}
+        for op in layer.ops:
+            color = remap.get(tuple(op.color[:3]), tuple(op.color[:3])) + tuple(op.color[3:])
+            generator.add_text(image, op.text, op.position, op.font_size, color, op.max_width, op.align,
+                               op.box_width)
+        return image
+
+    def generate(self, themes, sizes, output_path):
+        """生成 主题 × 尺寸 × 类型 的截屏矩阵，返回耗时统计"""
+        timings = {"render": 0.0, "theme": 0.0, "save": 0.0, "count": 0}
+        for name in themes:
+            os.makedirs(os.path.join(output_path, name), exist_ok=True)
+
+        for size_name, size in sizes.items():
+            print(f"生成尺寸: {size_name} ({size[0]}x{size[1]})")
+            for i, screenshot_type in enumerate(SCREENSHOT_TYPES):
+                start = time.perf_counter()
+                layer = self.render_layer(size, screenshot_type)
+                timings["render"] += time.perf_counter() - start
+
+                filename = f"{size_name}_{screenshot_type}_{i+1}.png"
+                for name, theme in themes.items():
+                    start = time.perf_counter()
+                    screenshot = self.apply_theme(layer, theme)
+                    timings["theme"] += time.perf_counter() - start
+
+                    start = time.perf_counter()
+                    screenshot.save(os.path.join(output_path, name, filename), "PNG")
+                    timings["save"] += time.perf_counter() - start
+                    timings["count"] += 1
+                print(f"  保存: {filename} × {len(themes)} 个主题")
+            self._gradients.clear()
+            if self.generator.low_memory:
+                self.generator.release_buffers()
+        return timings
+
+
+def load_themes(names, theme_file=None):
+    """按名称选择主题；theme_file 为 {名称: {角色: 颜色}} 的JSON，缺少的角色取 light 主题"""
+    available = dict(THEMES)
+    if theme_file:
+        with open(theme_file, "r", encoding="utf-8") as f:
+            for name, colors in json.load(f).items():
+                available[name] = {**THEMES["light"], **colors}
+    names = names or list(available)
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        raise ValueError(f"未知主题: {', '.join(unknown)}，可选: {', '.join(available)}")
+    return {name: available[name] for name in names}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="一次渲染、查找表换色生成主题变体截屏")
+    parser.add_argument("--themes", help=f"逗号分隔的主题列表，默认全部（{', '.join(THEMES)}）")
+    parser.add_argument("--theme-file", help="自定义主题JSON：{名称: {角色: 颜色}}")
+    parser.add_argument("--output", default=os.path.join(PROJECT_ROOT, "AppStoreImages", "themes"),
+                        help="输出目录，每个主题一个子目录")
+    parser.add_argument("--low-memory", action="store_true", help="低内存模式：每个尺寸渲染完后释放缓存")
+    args = parser.parse_args()
+
+    try:
+        themes = load_themes(args.themes.split(",") if args.themes else None, args.theme_file)
+    except ValueError as e:
+        parser.error(str(e))
+
+    generator = RealImageAppStoreGenerator(low_memory=args.low_memory)
+    images = generator.load_real_images()
+    print(f"🎨 主题: {', '.join(themes)}")
+
+    start = time.perf_counter()
+    timings = ThemeRenderer(generator, images).generate(themes, generator.sizes, args.output)
+    total = time.perf_counter() - start
+
+    print(f"\n所有图片已生成到: {args.output}")
+    print(f"⏱️  共 {timings['count']} 张截屏，耗时 {total:.2f}s")
+    print(f"  标记渲染: {len(generator.sizes) * len(SCREENSHOT_TYPES)} 次，{timings['render']:.2f}s")
+    print(f"  主题换色: {timings['count']} 次，{timings['theme']:.2f}s")
+    print(f"  PNG 编码: {timings['save']:.2f}s")
+    own_rss, _ = peak_rss_mb()
+    if own_rss is not None:
+        print(f"📈 峰值内存: {own_rss:.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
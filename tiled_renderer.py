@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+超大画布的分块流式渲染
+场景由渐变、圆角矩形（手机框架、卡片）、图片和文字图层组成，
+按整行宽的条带逐块光栅化，每个条带立即经 Up 滤波和 zlib 压缩写入PNG，
+峰值内存只与 画布宽度 × 条带高度 有关，与画布高度无关
+"""
+
+import os
+import time
+import zlib
+import struct
+import argparse
+
+from PIL import Image, ImageChops, ImageDraw
+
+from create_real_image_app_store_images import PROJECT_ROOT, RealImageAppStoreGenerator, peak_rss_mb
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+IDAT_CHUNK_SIZE = 1 << 18
+
+# 常用大尺寸画布
+CANVAS_PRESETS = {
+    "4k": (3840, 2160),
+    "8k": (7680, 4320),
+    "16k": (15360, 8640),
+    "print-a3": (7016, 4961),  # A3 横向 600dpi
+}
+
+
+class PNGStreamWriter:
+    """逐行写入RGB PNG：每行使用 Up 滤波，压缩数据累积到一定大小后写出一个IDAT块"""
+
+    def __init__(self, f, width, height, compress_level=6):
+        self.f = f
+        self.width = width
+        self.height = height
+        self.rows_written = 0
+        self.compressor = zlib.compressobj(compress_level)
+        self.pending = []
+        self.pending_size = 0
+        self.previous_row = Image.new("RGB", (width, 1))
+
+        f.write(PNG_SIGNATURE)
+        self.write_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+
+    def write_chunk(self, chunk_type, data):
+        self.f.write(struct.pack(">I", len(data)))
+        self.f.write(chunk_type)
+        self.f.write(data)
+        self.f.write(struct.pack(">I", zlib.crc32(data, zlib.crc32(chunk_type)) & 0xffffffff))
+
+    def write_band(self, band):
+        """写入一个条带（宽度与画布相同的RGB图片）"""
+        width, rows = band.size
+        # Up 滤波：每行减去上一行（按字节取模），用整块图片运算代替逐字节循环
+        above = Image.new("RGB", (width, rows))
+        above.paste(self.previous_row, (0, 0))
+        if rows > 1:
+            above.paste(band.crop((0, 0, width, rows - 1)), (0, 1))
+        filtered = ImageChops.subtract_modulo(band, above).tobytes()
+        self.previous_row = band.crop((0, rows - 1, width, rows))
+
+        stride = width * 3
+        for row in range(rows):
+            self.append(self.compressor.compress(b"\x02" + filtered[row * stride:(row + 1) * stride]))
+        self.rows_written += rows
+
+    def append(self, data):
+        if not data:
+            return
+        self.pending.append(data)
+        self.pending_size += len(data)
+        if self.pending_size >= IDAT_CHUNK_SIZE:
+            self.flush_idat()
+
+    def flush_idat(self):
+        if self.pending:
+            self.write_chunk(b"IDAT", b"".join(self.pending))
+            self.pending = []
+            self.pending_size = 0
+
+    def close(self):
+        if self.rows_written != self.height:
+            raise ValueError(f"已写入 {self.rows_written} 行，画布高度为 {self.height}")
+        self.append(self.compressor.flush())
+        self.flush_idat()
+        self.write_chunk(b"IEND", b"")
+
+
+class GradientLayer:
+    """与生成器相同公式的线性渐变背景"""
+
+    def __init__(self, color1, color2, direction="vertical"):
+        self.color1 = color1
+        self.color2 = color2
+        self.direction = direction
+        self._row = None
+
+    def color_at(self, position, length):
+        ratio = position / length
+        return tuple(int(a * (1 - ratio) + b * ratio) for a, b in zip(self.color1, self.color2))
+
+    def draw(self, band, top, canvas_size):
+        width, height = canvas_size
+        rows = band.size[1]
+        if self.direction == "vertical":
+            column = Image.new("RGB", (1, rows))
+            column.putdata([self.color_at(top + y, height) for y in range(rows)])
+            band.paste(column.resize((width, rows), Image.Resampling.NEAREST))
+        else:
+            # 水平渐变每行相同，只计算一次
+            if self._row is None:
+                self._row = Image.new("RGB", (width, 1))
+                self._row.putdata([self.color_at(x, width) for x in range(width)])
+            band.paste(self._row.resize((width, rows), Image.Resampling.NEAREST))
+
+
+class RectLayer:
+    """圆角矩形（手机外框、屏幕、卡片）"""
+
+    def __init__(self, box, fill, radius=0):
+        self.box = box
+        self.fill = fill
+        self.radius = radius
+
+    def draw(self, band, top, canvas_size):
+        x0, y0, x1, y1 = self.box
+        if y1 < top or y0 >= top + band.size[1]:
+            return
+        draw = ImageDraw.Draw(band)
+        if self.radius:
+            draw.rounded_rectangle([x0, y0 - top, x1, y1 - top], radius=self.radius, fill=self.fill)
+        else:
+            draw.rectangle([x0, y0 - top, x1, y1 - top], fill=self.fill)
+
+
+class ImageLayer:
+    """缩放后粘贴的图片，只对与条带相交的源区域重采样，可选圆角遮罩"""
+
+    def __init__(self, source, box, radius=0):
+        self.source = source if source.mode == "RGBA" else source.convert("RGBA")
+        self.box = box
+        self.radius = radius
+
+    def draw(self, band, top, canvas_size):
+        x0, y0, x1, y1 = self.box
+        start = max(y0, top)
+        end = min(y1, top + band.size[1])
+        if start >= end:
+            return
+        src_width, src_height = self.source.size
+        scale = src_height / (y1 - y0)
+        piece = self.source.resize((x1 - x0, end - start), Image.Resampling.LANCZOS,
+                                   box=(0, (start - y0) * scale, src_width, (end - y0) * scale))
+        if self.radius:
+            mask = Image.new("L", piece.size, 0)
+            ImageDraw.Draw(mask).rounded_rectangle([0, y0 - start, x1 - x0 - 1, y1 - start - 1],
+                                                   radius=self.radius, fill=255)
+            piece.putalpha(ImageChops.multiply(piece.getchannel("A"), mask))
+        band.paste(piece, (x0, start - top), piece)
+
+
+class TextLayer:
+    """单行文字"""
+
+    def __init__(self, text, position, font, fill, anchor="la"):
+        self.text = text
+        self.position = position
+        self.font = font
+        self.fill = fill
+        self.anchor = anchor
+        self.bbox = ImageDraw.Draw(Image.new("L", (1, 1))).textbbox(position, text, font=font, anchor=anchor)
+
+    def draw(self, band, top, canvas_size):
+        if self.bbox[3] < top or self.bbox[1] >= top + band.size[1]:
+            return
+        x, y = self.position
+        ImageDraw.Draw(band).text((x, y - top), self.text, font=self.font, fill=self.fill, anchor=self.anchor)
+
+
+class TiledRenderer:
+    """按条带渲染场景并流式写入PNG"""
+
+    def __init__(self, size, layers, band_height=256):
+        self.size = size
+        self.layers = layers
+        self.band_height = band_height
+
+    def render_band(self, top):
+        width, height = self.size
+        band = Image.new("RGB", (width, min(self.band_height, height - top)))
+        for layer in self.layers:
+            layer.draw(band, top, self.size)
+        return band
+
+    def render(self):
+        """整块渲染（仅用于小画布对照）"""
+        image = Image.new("RGB", self.size)
+        for top in range(0, self.size[1], self.band_height):
+            image.paste(self.render_band(top), (0, top))
+        return image
+
+    def render_to_png(self, path, compress_level=6):
+        with open(path, "wb") as f:
+            writer = PNGStreamWriter(f, self.size[0], self.size[1], compress_level)
+            for top in range(0, self.size[1], self.band_height):
+                band = self.render_band(top)
+                writer.write_band(band)
+                band.close()
+            writer.close()
+
+
+def build_promo_scene(generator, images, size):
+    """
+    用生成器的颜色、文案、图片和手机框架/卡片样式构建宣传图场景
+    所有尺寸按画布短边相对 1242 像素缩放
+    """
+    width, height = size
+    is_landscape = width > height
+    scale = min(width, height) / 1242
+    colors = {key: generator.hex_to_rgb(value) for key, value in generator.colors.items()}
+
+    def px(value):
+        return int(value * scale)
+
+    layers = [GradientLayer(colors["primary"], colors["secondary"],
+                            "horizontal" if is_landscape else "vertical")]
+
+    # 手机框架（与生成器相同的 1:2 宽高比）：横屏放在右侧，左侧留给标题
+    if is_landscape:
+        phone_height = int(height * 0.8)
+        phone_width = phone_height // 2
+        phone_x = int(width * 0.72 - phone_width / 2)
+        phone_y = (height - phone_height) // 2
+    else:
+        phone_height = int(min(height * 0.6, width * 1.4))
+        phone_width = phone_height // 2
+        phone_x = (width - phone_width) // 2
+        phone_y = int(height * 0.6 - phone_height / 2)
+    layers.append(RectLayer((phone_x, phone_y, phone_x + phone_width, phone_y + phone_height),
+                            (30, 30, 30), px(25) * 2))
+
+    margin = px(15) * 2
+    screen = (phone_x + margin, phone_y + margin, phone_x + phone_width - margin, phone_y + phone_height - margin)
+    layers.append(RectLayer(screen, colors["background"], px(20) * 2))
+
+    # 屏幕内：应用图标 + 功能卡片
+    inner = px(40)
+    icon_size = (screen[2] - screen[0]) // 3
+    icon_x = (screen[0] + screen[2] - icon_size) // 2
+    icon_y = screen[1] + inner * 2
+    if "AppIcon" in images:
+        layers.append(ImageLayer(images["AppIcon"], (icon_x, icon_y, icon_x + icon_size, icon_y + icon_size),
+                                 radius=icon_size // 5))
+    layers.append(TextLayer(generator.app_info["name"], ((screen[0] + screen[2]) // 2, icon_y + icon_size + inner),
+                            generator.get_font(px(64)), colors["text"], anchor="ma"))
+
+    card_height = px(140)
+    card_y = icon_y + icon_size + inner * 4
+    for feature in generator.app_info["features"]:
+        if card_y + card_height > screen[3] - inner:
+            break
+        card = (screen[0] + inner, card_y, screen[2] - inner, card_y + card_height)
+        layers.append(RectLayer(card, colors["card_bg"], px(24)))
+        feature_icon = card_height - px(40)
+        icon_box = (card[0] + px(20), card_y + px(20), card[0] + px(20) + feature_icon, card_y + px(20) + feature_icon)
+        layers.append(RectLayer(icon_box, colors["primary"], px(16)))
+        if feature["image"] in images:
+            layers.append(ImageLayer(images[feature["image"]], icon_box, radius=px(16)))
+        text_x = icon_box[2] + px(24)
+        layers.append(TextLayer(feature["title"], (text_x, card_y + px(30)), generator.get_font(px(36)), colors["text"]))
+        layers.append(TextLayer(feature["desc"], (text_x, card_y + px(80)), generator.get_font(px(28)),
+                                colors["light_text"]))
+        card_y += card_height + px(30)
+
+    # 标题文字
+    if is_landscape:
+        text_x, text_y, anchor = int(width * 0.08), int(height * 0.3), "la"
+    else:
+        text_x, text_y, anchor = width // 2, int(height * 0.06), "ma"
+    white = (255, 255, 255)
+    layers.append(TextLayer(generator.app_info["name"], (text_x, text_y), generator.get_font(px(160)), white, anchor))
+    layers.append(TextLayer(generator.app_info["subtitle"], (text_x, text_y + px(220)),
+                            generator.get_font(px(72)), white, anchor))
+    layers.append(TextLayer(generator.app_info["description"], (text_x, text_y + px(330)),
+                            generator.get_font(px(48)), white, anchor))
+    return layers
+
+
+def parse_size(value):
+    """解析 8k / 16k 等预设或 宽x高"""
+    if value.lower() in CANVAS_PRESETS:
+        return CANVAS_PRESETS[value.lower()]
+    width, height = value.lower().split("x")
+    return int(width), int(height)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="分块流式渲染超大宣传图")
+    parser.add_argument("--size", default="8k",
+                        help=f"画布尺寸：{' / '.join(CANVAS_PRESETS)} 或 宽x高，默认 8k")
+    parser.add_argument("--band-height", type=int, default=256, help="每个条带的行数，决定峰值内存")
+    parser.add_argument("--compress-level", type=int, default=6, help="zlib 压缩级别 0-9")
+    parser.add_argument("--output", default=None, help="输出文件，默认 PromoBanners/promo_<宽>x<高>.png")
+    args = parser.parse_args()
+
+    size = parse_size(args.size)
+    output = args.output or os.path.join(PROJECT_ROOT, "PromoBanners", f"promo_{size[0]}x{size[1]}.png")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+
+    generator = RealImageAppStoreGenerator()
+    images = generator.load_real_images()
+    renderer = TiledRenderer(size, build_promo_scene(generator, images, size), args.band_height)
+
+    print(f"🖼️  分块渲染 {size[0]}x{size[1]}，条带高度 {args.band_height} 行")
+    start = time.perf_counter()
+    renderer.render_to_png(output, args.compress_level)
+    elapsed = time.perf_counter() - start
+
+    band_mb = size[0] * args.band_height * 3 / 1024 / 1024
+    print(f"✅ 已保存: {output} ({os.path.getsize(output) / 1024 / 1024:.1f}MB)，耗时 {elapsed:.2f}s")
+    print(f"   单个条带 {band_mb:.1f}MB，整幅画布 {size[0] * size[1] * 3 / 1024 / 1024:.0f}MB")
+    own_rss, _ = peak_rss_mb()
+    if own_rss is not None:
+        print(f"📈 峰值内存: {own_rss:.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -49,6 +49,22 @@ find_latest_ipa() {
     return 1
 }
 
+# 校验应用图标（尺寸、alpha通道、颜色类型等）
+validate_assets() {
+    local validator="${PROJECT_PATH}/png_validator.py"
+    if [ ! -f "$validator" ] || ! command -v python3 >/dev/null 2>&1; then
+        log_warning "跳过图标校验: 未找到 png_validator.py 或 python3"
+        return 0
+    fi
+
+    log_info "校验应用图标..."
+    if ! python3 "$validator" "${PROJECT_PATH}/Life/Assets.xcassets"; then
+        log_error "图标不符合App Store要求，可运行 fix_icon_python.py 去除alpha通道"
+        exit 1
+    fi
+    log_success "图标校验通过"
+}
+
 # 上传到TestFlight
 upload_to_testflight() {
     log_info "开始上传到TestFlight..."
@@ -130,6 +146,9 @@ main() {
         fi
     fi
     
+    # 上传前校验图标
+    validate_assets
+
     # 开始上传
     upload_to_testflight
 }
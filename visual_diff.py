@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+截屏输出的分块哈希视觉对比
+把两次生成的 AppStoreImages 中同名图片切成固定大小的块并计算哈希，
+只对哈希不同的块做逐像素比较和 SSIM 计算，输出高亮标记图和汇总报告
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image, ImageChops, ImageDraw
+
+# 项目根目录（脚本所在目录）
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_TILE_SIZE = 64
+# SSIM 常数（8位像素）
+SSIM_C1 = (0.01 * 255) ** 2
+SSIM_C2 = (0.03 * 255) ** 2
+
+HIGHLIGHT_COLOR = (255, 59, 48)
+
+
+def file_digest(path):
+    """文件内容的哈希，字节相同的图片无需解码"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def tile_hashes(image, tile_size):
+    """按行扫描一次像素数据，返回 {(列, 行): 哈希}"""
+    width, height = image.size
+    data = image.tobytes()
+    pixel = len(image.getbands())
+    stride = width * pixel
+    columns = (width + tile_size - 1) // tile_size
+    hashes = {}
+    for tile_y in range(0, height, tile_size):
+        row_hashers = [hashlib.blake2b(digest_size=16) for _ in range(columns)]
+        for y in range(tile_y, min(tile_y + tile_size, height)):
+            offset = y * stride
+            for col, hasher in enumerate(row_hashers):
+                start = offset + col * tile_size * pixel
+                hasher.update(data[start:min(start + tile_size * pixel, offset + stride)])
+        for col, hasher in enumerate(row_hashers):
+            hashes[(col, tile_y // tile_size)] = hasher.digest()
+    return hashes
+
+
+def tile_ssim(tile_a, tile_b):
+    """单窗口 SSIM（亮度通道，带透明度时取与 alpha 通道的较小值），用于衡量块的感知差异"""
+    ssim = channel_ssim(tile_a.convert("L").tobytes(), tile_b.convert("L").tobytes())
+    if "A" in tile_a.getbands():
+        ssim = min(ssim, channel_ssim(tile_a.getchannel("A").tobytes(), tile_b.getchannel("A").tobytes()))
+    return ssim
+
+
+def channel_ssim(a, b):
+    """两个等长8位通道的单窗口 SSIM"""
+    n = len(a)
+    mean_a = sum(a) / n
+    mean_b = sum(b) / n
+    var_a = sum((x - mean_a) ** 2 for x in a) / n
+    var_b = sum((y - mean_b) ** 2 for y in b) / n
+    cov = sum((x - mean_a) * (y - mean_b) for x, y in zip(a, b)) / n
+    return ((2 * mean_a * mean_b + SSIM_C1) * (2 * cov + SSIM_C2)) / \
+           ((mean_a ** 2 + mean_b ** 2 + SSIM_C1) * (var_a + var_b + SSIM_C2))
+
+
+def compare_tile(tile_a, tile_b):
+    """逐像素比较一个块，返回 (变化像素数, 最大通道差, SSIM)"""
+    diff = ImageChops.difference(tile_a, tile_b)
+    # 各通道取最大值再二值化；convert("L") 按亮度加权，单通道 1 级的差异会被舍入成 0
+    bands = diff.split()
+    merged = bands[0]
+    for band in bands[1:]:
+        merged = ImageChops.lighter(merged, band)
+    mask = merged.point(lambda v: 255 if v else 0)
+    changed = mask.histogram()[255]
+    max_delta = max(high for _, high in diff.getextrema())
+    return changed, max_delta, tile_ssim(tile_a, tile_b)
+
+
+def draw_overlay(image, tiles, tile_size, output_path):
+    """把未变化区域调暗，并用红色框出变化的块"""
+    image = image.convert("RGB")
+    overlay = Image.blend(image, Image.new("RGB", image.size, (128, 128, 128)), 0.6)
+    highlight = Image.new("RGBA", image.size, (0, 0, 0, 0))
+    draw = ImageDraw.Draw(highlight)
+    for tile in tiles:
+        x0, y0, x1, y1 = tile["box"]
+        overlay.paste(image.crop((x0, y0, x1, y1)), (x0, y0))
+        draw.rectangle([x0, y0, x1 - 1, y1 - 1], fill=HIGHLIGHT_COLOR + (60,),
+                       outline=HIGHLIGHT_COLOR + (255,), width=max(tile_size // 32, 2))
+    overlay.paste(highlight, (0, 0), highlight)
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    overlay.save(output_path, "PNG", compress_level=1)
+
+
+def diff_images(task):
+    """比较一对图片，返回该文件的对比结果"""
+    name, baseline_path, candidate_path, tile_size, overlay_dir = task
+    result = {"file": name, "status": "identical", "changed_tiles": 0, "total_tiles": 0,
+              "changed_pixels": 0, "max_delta": 0, "min_ssim": 1.0, "tiles": []}
+
+    if file_digest(baseline_path) == file_digest(candidate_path):
+        return result
+
+    # 按 RGBA 比较，只有透明度变化的像素也算变化
+    with Image.open(baseline_path) as f:
+        baseline = f.convert("RGBA")
+    with Image.open(candidate_path) as f:
+        candidate = f.convert("RGBA")
+
+    width, height = candidate.size
+    if baseline.size != candidate.size:
+        result.update(status="resized", baseline_size=list(baseline.size),
+                      candidate_size=list(candidate.size), changed_pixels=width * height, min_ssim=0.0)
+        return result
+
+    hashes_a = tile_hashes(baseline, tile_size)
+    hashes_b = tile_hashes(candidate, tile_size)
+    result["total_tiles"] = len(hashes_b)
+
+    for (col, row), digest in sorted(hashes_b.items(), key=lambda item: (item[0][1], item[0][0])):
+        if hashes_a[(col, row)] == digest:
+            continue
+        box = (col * tile_size, row * tile_size,
+               min((col + 1) * tile_size, width), min((row + 1) * tile_size, height))
+        changed, max_delta, ssim = compare_tile(baseline.crop(box), candidate.crop(box))
+        result["tiles"].append({"box": list(box), "changed_pixels": changed,
+                                "max_delta": max_delta, "ssim": round(ssim, 4)})
+        result["changed_pixels"] += changed
+        result["max_delta"] = max(result["max_delta"], max_delta)
+        result["min_ssim"] = min(result["min_ssim"], ssim)
+
+    result["changed_tiles"] = len(result["tiles"])
+    if result["tiles"]:
+        result["status"] = "changed"
+        boxes = [tile["box"] for tile in result["tiles"]]
+        result["bbox"] = [min(b[0] for b in boxes), min(b[1] for b in boxes),
+                          max(b[2] for b in boxes), max(b[3] for b in boxes)]
+        if overlay_dir:
+            overlay_path = os.path.join(overlay_dir, name)
+            draw_overlay(candidate, result["tiles"], tile_size, overlay_path)
+            result["overlay"] = overlay_path
+    result["min_ssim"] = round(result["min_ssim"], 4)
+    return result
+
+
+def collect_images(root):
+    """返回 {相对路径: 绝对路径}"""
+    images = {}
+    for directory, dirs, names in os.walk(root):
+        dirs.sort()
+        for name in names:
+            if name.lower().endswith(".png"):
+                path = os.path.join(directory, name)
+                images[os.path.relpath(path, root)] = path
+    return images
+
+
+def diff_directories(baseline_dir, candidate_dir, tile_size=DEFAULT_TILE_SIZE,
+                     overlay_dir=None, workers=None):
+    """比较两个输出目录，返回按文件名排序的结果列表"""
+    baseline = collect_images(baseline_dir)
+    candidate = collect_images(candidate_dir)
+
+    results = [{"file": name, "status": "removed"} for name in sorted(set(baseline) - set(candidate))]
+    results += [{"file": name, "status": "added"} for name in sorted(set(candidate) - set(baseline))]
+
+    tasks = [(name, baseline[name], candidate[name], tile_size, overlay_dir)
+             for name in sorted(set(baseline) & set(candidate))]
+    if workers == 1 or len(tasks) <= 1:
+        results += [diff_images(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results += list(executor.map(diff_images, tasks))
+    return sorted(results, key=lambda r: r["file"])
+
+
+def is_regression(result, min_ssim):
+    """判断一个结果是否应让检查失败：SSIM 低于阈值，或文件增删、尺寸变化"""
+    if result["status"] == "identical":
+        return False
+    if result["status"] == "changed":
+        return min_ssim >= 1.0 or result["min_ssim"] < min_ssim
+    return True
+
+
+def print_report(results, min_ssim):
+    """打印汇总报告，返回需要关注的文件数量"""
+    failures = 0
+    for result in results:
+        status = result["status"]
+        if status == "identical":
+            continue
+        failed = is_regression(result, min_ssim)
+        failures += failed
+        mark = "❌" if failed else "⚠️ "
+        if status == "changed":
+            ratio = result["changed_tiles"] / result["total_tiles"]
+            print(f"{mark} {result['file']}: {result['changed_tiles']}/{result['total_tiles']} 块变化 "
+                  f"({ratio:.1%})，{result['changed_pixels']} 像素，最大差值 {result['max_delta']}，"
+                  f"最低SSIM {result['min_ssim']}，区域 {tuple(result['bbox'])}")
+        elif status == "resized":
+            print(f"{mark} {result['file']}: 尺寸 {tuple(result['baseline_size'])} → "
+                  f"{tuple(result['candidate_size'])}")
+        else:
+            print(f"{mark} {result['file']}: {'新增' if status == 'added' else '删除'}")
+
+    identical = sum(1 for r in results if r["status"] == "identical")
+    print(f"\n🔍 对比了 {len(results)} 张图片：{identical} 张相同，{len(results) - identical} 张有变化，"
+          f"{failures} 张超出阈值 (SSIM < {min_ssim})")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="分块哈希对比两次截屏生成的结果")
+    parser.add_argument("baseline", help="基准输出目录")
+    parser.add_argument("candidate", nargs="?", default=os.path.join(PROJECT_ROOT, "AppStoreImages"),
+                        help="待比较的输出目录，默认为 AppStoreImages")
+    parser.add_argument("--tile-size", type=int, default=DEFAULT_TILE_SIZE, help="分块边长（像素）")
+    parser.add_argument("--report", default=os.path.join(PROJECT_ROOT, "VisualDiff"),
+                        help="报告目录：report.json 和高亮标记图")
+    parser.add_argument("--min-ssim", type=float, default=1.0,
+                        help="块 SSIM 低于该值时视为失败，默认任何变化都失败")
+    parser.add_argument("--workers", type=int, default=None, help="并行进程数")
+    parser.add_argument("--no-overlay", action="store_true", help="不生成高亮标记图")
+    args = parser.parse_args()
+
+    overlay_dir = None if args.no_overlay else os.path.join(args.report, "overlays")
+    start = time.perf_counter()
+    results = diff_directories(args.baseline, args.candidate, args.tile_size, overlay_dir, args.workers)
+    elapsed = time.perf_counter() - start
+
+    os.makedirs(args.report, exist_ok=True)
+    report_path = os.path.join(args.report, "report.json")
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump({"baseline": args.baseline, "candidate": args.candidate,
+                   "tile_size": args.tile_size, "results": results}, f, ensure_ascii=False, indent=2)
+
+    failures = print_report(results, args.min_ssim)
+    print(f"⏱️  耗时 {elapsed:.2f}s，报告: {report_path}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+小组件预览批量渲染
+读取 TodayWidgetData JSON（WidgetDataManager.updateTodayData 写入 App Group 的数据），
+按 Widget.swift 中 Small/Medium/Large 三种尺寸的布局批量生成预览图
+
+用法:
+    python3 widget_preview.py data1.json data2.json ...     # 每个文件一个文档或文档数组，也支持 .jsonl
+    python3 widget_preview.py --sample 300 --workers 8       # 生成随机状态用于视觉检查
+
+布局和静态图层（背景、固定文字、图标）每种尺寸只计算一次，
+文档按块分发给进程池，每个工作进程复用自己的布局和字体缓存
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+from functools import lru_cache
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image, ImageDraw, ImageFont
+
+# 项目根目录（脚本所在目录）
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# 字体候选列表，按顺序尝试
+FONT_CANDIDATES = ["/System/Library/Fonts/PingFang.ttc", "/System/Library/Fonts/Helvetica.ttc"]
+
+# Swift JSONEncoder 默认把 Date 编码为相对2001-01-01的秒数
+SWIFT_EPOCH = datetime(2001, 1, 1, tzinfo=timezone.utc)
+
+# 小组件尺寸（点），对应 6.7" iPhone
+FAMILY_SIZES = {
+    "small": (170, 170),
+    "medium": (364, 170),
+    "large": (364, 382),
+}
+
+# 系统颜色
+COLORS = {
+    "background": (255, 255, 255),
+    "text": (0, 0, 0),
+    "secondary": (142, 142, 147),
+    "gray6": (242, 242, 247),
+    "red": (255, 59, 48),
+    "green": (52, 199, 89),
+    "gray": (174, 174, 178),
+    "blue": (0, 122, 255),
+}
+
+PADDING = 16
+
+
+def hex_to_rgb(hex_color, default=COLORS["blue"]):
+    """将十六进制颜色转换为RGB，格式错误时返回默认颜色"""
+    hex_color = (hex_color or "").lstrip('#')
+    if len(hex_color) < 6:
+        return default
+    try:
+        return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
+    except ValueError:
+        return default
+
+
+@lru_cache(maxsize=None)
+def get_font(size):
+    """获取指定像素大小的字体（每个进程缓存）"""
+    for font_path in FONT_CANDIDATES:
+        try:
+            return ImageFont.truetype(font_path, size)
+        except:
+            continue
+    try:
+        return ImageFont.load_default(size)
+    except TypeError:
+        return ImageFont.load_default()
+
+
+def parse_date(value):
+    """解析 TodayWidgetData.date：Swift 默认的秒数或ISO8601字符串"""
+    if isinstance(value, (int, float)):
+        return SWIFT_EPOCH + timedelta(seconds=value)
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            pass
+    return datetime.now(timezone.utc)
+
+
+def format_date(moment):
+    """与 Text(date, style: .date) 在中文环境下的格式一致"""
+    return f"{moment.year}年{moment.month}月{moment.day}日"
+
+
+class WidgetLayout:
+    """单个尺寸的预先计算布局（像素坐标）"""
+
+    def __init__(self, family, scale):
+        self.family = family
+        self.scale = scale
+        width, height = FAMILY_SIZES[family]
+        self.size = (width * scale, height * scale)
+        self.boxes = {}
+        self.rows = []
+        getattr(self, f"layout_{family}")(width, height)
+
+    def px(self, value):
+        return int(value * self.scale)
+
+    def box(self, name, x, y, font_size=None, width=None, align="left"):
+        """记录一个文字或图形位置"""
+        self.boxes[name] = {"xy": (self.px(x), self.px(y)), "font": self.px(font_size) if font_size else None,
+                            "width": self.px(width) if width else None, "align": align}
+
+    def layout_small(self, width, height):
+        self.box("icon", PADDING, PADDING, width=20)
+        self.box("title", PADDING + 28, PADDING, 17, width - PADDING * 2 - 28)
+        self.box("mood_label", width / 2, 56, 12, align="center")
+        self.box("mood", width / 2, 76, 30, width - PADDING * 2, align="center")
+        self.box("date", width / 2, height - PADDING - 13, 11, align="center")
+        self.static_texts = [("title", "今日", "text"), ("mood_label", "心情", "secondary")]
+
+    def layout_medium(self, width, height):
+        left_width = width / 2 - PADDING
+        self.box("icon", PADDING, PADDING, width=18)
+        self.box("title", PADDING + 26, PADDING, 17, left_width - 26)
+        self.box("mood_label", PADDING, 52, 12)
+        self.box("mood", PADDING, 70, 15, left_width)
+        self.box("date", PADDING, height - PADDING - 13, 11)
+        self.box("matters_label", width - PADDING, PADDING, 12, align="right")
+        self.add_rows(width / 2 + 8, width - PADDING, PADDING + 26, 22, height - PADDING)
+        self.static_texts = [("title", "今日生活", "text"), ("mood_label", "心情", "secondary"),
+                             ("matters_label", "事项", "secondary")]
+
+    def layout_large(self, width, height):
+        self.box("icon", PADDING, PADDING, width=22)
+        self.box("title", PADDING + 30, PADDING + 2, 17, width / 2)
+        self.box("date", width - PADDING, PADDING + 4, 12, align="right")
+        self.box("mood_panel", PADDING, 52, width=width - PADDING * 2)
+        self.panel_height = self.px(70)
+        self.box("mood_label", PADDING + 16, 64, 15)
+        self.box("mood", PADDING + 16, 88, 20, width - PADDING * 2 - 32)
+        self.box("matters_label", PADDING, 138, 15)
+        self.box("summary", PADDING, height - PADDING - 14, 12, width - PADDING * 2)
+        self.add_rows(PADDING, width - PADDING, 166, 26, height - PADDING - 22)
+        self.static_texts = [("title", "今日生活记录", "text"), ("mood_label", "今日心情", "text"),
+                             ("matters_label", "今日事项", "text")]
+
+    def add_rows(self, left, right, top, row_height, bottom):
+        """事项行位置，数量由可用高度决定"""
+        y = top
+        while y + row_height <= bottom:
+            self.rows.append((self.px(left), self.px(y), self.px(right), self.px(row_height)))
+            y += row_height
+
+
+@lru_cache(maxsize=None)
+def get_layout(family, scale):
+    """每个 (尺寸, 缩放) 只计算一次布局"""
+    return WidgetLayout(family, scale)
+
+
+def fit_text(text, font, max_width):
+    """超出宽度时截断并加省略号"""
+    if max_width is None or font.getlength(text) <= max_width:
+        return text
+    while text and font.getlength(text + "…") > max_width:
+        text = text[:-1]
+    return text + "…"
+
+
+def draw_text(draw, layout, name, text, color):
+    """按布局位置绘制文字"""
+    box = layout.boxes[name]
+    font = get_font(box["font"])
+    text = fit_text(text, font, box["width"])
+    x, y = box["xy"]
+    if box["align"] != "left":
+        text_width = font.getlength(text)
+        x = x - text_width / 2 if box["align"] == "center" else x - text_width
+    draw.text((x, y), text, font=font, fill=color)
+
+
+def draw_heart_icon(draw, layout):
+    """用圆形近似 heart.fill 图标"""
+    box = layout.boxes["icon"]
+    x, y = box["xy"]
+    draw.ellipse([x, y, x + box["width"], y + box["width"]], fill=COLORS["red"])
+
+
+@lru_cache(maxsize=None)
+def get_static_layer(family, scale):
+    """背景、固定文字和图标组成的静态图层（每个尺寸只绘制一次）"""
+    layout = get_layout(family, scale)
+    image = Image.new("RGB", layout.size, COLORS["background"])
+    draw = ImageDraw.Draw(image)
+    draw_heart_icon(draw, layout)
+    if "mood_panel" in layout.boxes:
+        box = layout.boxes["mood_panel"]
+        x, y = box["xy"]
+        draw.rounded_rectangle([x, y, x + box["width"], y + layout.panel_height],
+                               radius=layout.px(8), fill=COLORS["gray6"])
+    for name, text, color in layout.static_texts:
+        draw_text(draw, layout, name, text, COLORS[color])
+    return image
+
+
+def draw_matter_row(draw, layout, row, matter):
+    """绘制一行事项：彩色圆点、标题、完成数、完成标记"""
+    left, top, right, height = row
+    font = get_font(layout.px(12))
+    center_y = top + height // 2
+    dot = layout.px(10)
+    color = hex_to_rgb(matter.get("color"))
+    draw.ellipse([left, center_y - dot // 2, left + dot, center_y + dot // 2], fill=color)
+
+    mark = layout.px(14)
+    mark_left = right - mark
+    if matter.get("isCompleted"):
+        draw.ellipse([mark_left, center_y - mark // 2, right, center_y + mark // 2], fill=COLORS["green"])
+        line_width = max(layout.px(1.5), 1)
+        draw.line([(mark_left + mark * 0.28, center_y), (mark_left + mark * 0.45, center_y + mark * 0.18),
+                   (mark_left + mark * 0.74, center_y - mark * 0.18)], fill=COLORS["background"], width=line_width)
+    else:
+        draw.ellipse([mark_left, center_y - mark // 2, right, center_y + mark // 2],
+                     outline=COLORS["gray"], width=max(layout.px(1.5), 1))
+
+    count = f"{matter.get('completedCount', 0)}/{matter.get('totalCount', 0)}"
+    count_width = font.getlength(count)
+    count_x = mark_left - layout.px(6) - count_width
+    text_top = center_y - font.size * 0.6
+    draw.text((count_x, text_top), count, font=font, fill=COLORS["secondary"])
+
+    title_left = left + dot + layout.px(6)
+    title = fit_text(matter.get("title", ""), font, count_x - title_left - layout.px(4))
+    draw.text((title_left, text_top), title, font=font, fill=COLORS["text"])
+
+
+def render_widget(data, family, scale=3):
+    """渲染单个文档在指定尺寸下的预览"""
+    layout = get_layout(family, scale)
+    image = get_static_layer(family, scale).copy()
+    draw = ImageDraw.Draw(image)
+
+    mood = data.get("mood") or "—"
+    if family == "small":
+        # 小尺寸只显示表情
+        mood = mood.split(" ")[0]
+    draw_text(draw, layout, "mood", mood, COLORS["blue"] if family == "large" else COLORS["text"])
+    draw_text(draw, layout, "date", format_date(parse_date(data.get("date"))), COLORS["secondary"])
+
+    matters = data.get("matters") or []
+    for row, matter in zip(layout.rows, matters):
+        draw_matter_row(draw, layout, row, matter)
+
+    if "summary" in layout.boxes and data.get("summary"):
+        draw_text(draw, layout, "summary", data["summary"], COLORS["secondary"])
+    return image
+
+
+def render_batch(batch, families, scale, output_dir, compress_level=1):
+    """工作进程：渲染一批文档，返回生成的文件名"""
+    filenames = []
+    for name, data in batch:
+        for family in families:
+            image = render_widget(data, family, scale)
+            filename = f"{name}_{family}.png"
+            image.save(os.path.join(output_dir, filename), "PNG", compress_level=compress_level)
+            filenames.append(filename)
+    return filenames
+
+
+def load_documents(paths):
+    """读取 JSON/JSONL 文件，返回 [(名称, 文档), ...]"""
+    documents = []
+    for path in paths:
+        base = os.path.splitext(os.path.basename(path))[0]
+        with open(path, "r", encoding="utf-8") as f:
+            if path.endswith(".jsonl"):
+                items = [json.loads(line) for line in f if line.strip()]
+            else:
+                items = json.load(f)
+                if isinstance(items, dict):
+                    items = [items]
+        if len(items) == 1:
+            documents.append((base, items[0]))
+        else:
+            documents.extend((f"{base}_{i + 1:04d}", item) for i, item in enumerate(items))
+    return documents
+
+
+def sample_documents(count, seed=42):
+    """生成随机但确定的 TodayWidgetData 文档"""
+    from generate_test_data import MATTER_TEMPLATES
+
+    rng = random.Random(seed)
+    base_date = datetime(2025, 10, 15, tzinfo=timezone.utc)
+    mood_options = MATTER_TEMPLATES[0]["options"]
+    documents = []
+    for i in range(count):
+        matters = []
+        for template in rng.sample(MATTER_TEMPLATES, rng.randint(0, len(MATTER_TEMPLATES))):
+            total = len(template["options"])
+            completed = rng.randint(0, total)
+            matters.append({"id": f"{i}-{template['title']}", "title": template["title"],
+                            "icon": template["icon"], "color": template["color"],
+                            "completedCount": completed, "totalCount": total,
+                            "isCompleted": completed == total})
+        emoji, title = rng.choice(mood_options)
+        documents.append((f"sample_{i + 1:04d}", {
+            "date": (base_date - timedelta(days=i) - SWIFT_EPOCH).total_seconds(),
+            "matters": matters,
+            "summary": rng.choice([None, "今天很充实", "有点累了，早点休息", "继续保持"]),
+            "mood": rng.choice([None, f"{emoji} {title}"]),
+        }))
+    return documents
+
+
+def main():
+    parser = argparse.ArgumentParser(description="根据 TodayWidgetData JSON 批量渲染小组件预览")
+    parser.add_argument("inputs", nargs="*", help="TodayWidgetData JSON / JSONL 文件")
+    parser.add_argument("--sample", type=int, default=0, help="生成指定数量的随机文档")
+    parser.add_argument("--families", default="small,medium,large", help="要渲染的尺寸，逗号分隔")
+    parser.add_argument("--scale", type=int, default=3, help="像素缩放倍数")
+    parser.add_argument("--compress-level", type=int, default=1, choices=range(10), metavar="0-9",
+                        help="PNG压缩级别，预览默认用最快的1（编码占渲染时间的大部分）")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="进程数")
+    parser.add_argument("--output", default=os.path.join(PROJECT_ROOT, "WidgetPreviews"), help="输出目录")
+    args = parser.parse_args()
+
+    families = [f.strip() for f in args.families.split(",") if f.strip()]
+    unknown = [f for f in families if f not in FAMILY_SIZES]
+    if unknown:
+        print(f"❌ 未知尺寸: {', '.join(unknown)}，可选: {', '.join(FAMILY_SIZES)}")
+        return 2
+
+    documents = load_documents(args.inputs)
+    if args.sample:
+        documents.extend(sample_documents(args.sample))
+    if not documents:
+        print("❌ 没有输入文档，请指定 JSON 文件或 --sample N")
+        return 2
+
+    os.makedirs(args.output, exist_ok=True)
+    print(f"🧩 渲染 {len(documents)} 个文档 × {len(families)} 种尺寸，{args.workers} 个进程")
+
+    start = time.perf_counter()
+    workers = max(1, min(args.workers, len(documents)))
+    batch_size = max(1, len(documents) // (workers * 4))
+    batches = [documents[i:i + batch_size] for i in range(0, len(documents), batch_size)]
+    total = 0
+    if workers == 1:
+        for batch in batches:
+            total += len(render_batch(batch, families, args.scale, args.output, args.compress_level))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(render_batch, batch, families, args.scale, args.output,
+                                       args.compress_level) for batch in batches]
+            for future in futures:
+                total += len(future.result())
+
+    elapsed = time.perf_counter() - start
+    print(f"✅ 已生成 {total} 张预览到 {args.output} ({elapsed:.2f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())